@@ -2,12 +2,14 @@ from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
+# eventlet's green DNS resolver breaks with recent dnspython releases; the patched socket resolver is enough
+os.environ.setdefault('EVENTLET_NO_GREENDNS', 'yes')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
@@ -30,6 +32,16 @@ app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-chang
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Full rebuild interval for the incrementally maintained faculty analytics snapshot
+app.config['FACULTY_ANALYTICS_RECONCILE_SECONDS'] = int(os.getenv('FACULTY_ANALYTICS_RECONCILE_SECONDS', '900'))
+# How often buffered opportunity view counts are written (0 writes every view immediately)
+app.config['VIEW_COUNT_FLUSH_SECONDS'] = float(os.getenv('VIEW_COUNT_FLUSH_SECONDS', '5'))
+# How often recent daily views are compacted into the weekly/monthly rollups
+app.config['VIEW_ROLLUP_COMPACT_SECONDS'] = float(os.getenv('VIEW_ROLLUP_COMPACT_SECONDS', '300'))
+# How often sharded application counts are folded into Opportunity.applications_count
+app.config['APPLICATION_COUNT_FOLD_SECONDS'] = float(os.getenv('APPLICATION_COUNT_FOLD_SECONDS', '60'))
+# Message queue shared by Socket.IO worker processes, e.g. redis://localhost:6379/0 (empty: single process)
+app.config['SOCKETIO_MESSAGE_QUEUE'] = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
 
 # Create upload directories
 os.makedirs('uploads/resumes', exist_ok=True)
@@ -40,7 +52,7 @@ from models import db
 db.init_app(app)
 jwt = JWTManager(app)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'] or None)
 
 # Configure JWT error handlers
 @jwt.expired_token_loader
@@ -75,6 +87,7 @@ from routes.messages import messages_bp
 from routes.ai_features import ai_bp
 from routes.notifications import notifications_bp
 from routes.faculty import faculty_bp
+from routes.helpers import socket_user_id, user_room
 
 # Register blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -110,8 +123,13 @@ def get_socketio():
     return socketio
 
 @socketio.on('connect')
-def handle_connect():
-    emit('connected', {'message': 'Connected to server'})
+def handle_connect(auth=None):
+    # Only authenticated clients connect; each joins its user's room so events reach just that user
+    user_id = socket_user_id(auth)
+    if user_id is None:
+        raise ConnectionRefusedError('Authorization required')
+    join_room(user_room(user_id))
+    emit('connected', {'message': 'Connected to server', 'user_id': user_id})
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -120,4 +138,6 @@ def handle_disconnect():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+    from background_tasks import maintenance
+    maintenance.start(app)  # Rollup compaction, application count fold, faculty analytics reconcile
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
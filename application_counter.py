@@ -0,0 +1,128 @@
+"""
+Application Counter - contention-free Opportunity.applications_count
+
+Submitting an application no longer rewrites the opportunity row. Each
+submission adds to one of SHARDS counter rows for the opportunity with an
+atomic upsert (``applications = applications + n``) inside the submitting
+transaction, so concurrent applicants rarely touch the same row and no update
+is lost. Readers add the unfolded shard totals to ``applications_count``; a
+periodic fold moves them into the column with DELETE ... RETURNING, which keeps
+the sum exact while submissions continue.
+"""
+import random
+import time
+from typing import Dict, Iterable, List
+
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, select, update
+
+from models import db, Opportunity, OpportunityCounterShard
+from db_utils import dialect_insert, supports_on_conflict
+
+
+SHARDS = 16
+DEFAULT_FOLD_SECONDS = 60
+IN_CHUNK = 500
+
+_last_folded = {'at': 0.0}
+
+
+class ApplicationCounter:
+    """Sharded application counts per opportunity"""
+
+    @staticmethod
+    def increment(counts: Dict[int, int]):
+        """Add {opportunity id: applications} in the current session transaction (committed by the caller)"""
+        rows = [
+            {'opportunity_id': opportunity_id, 'shard': random.randrange(SHARDS), 'applications': count}
+            for opportunity_id, count in sorted(counts.items()) if count  # Fixed lock order
+        ]
+        if not rows:
+            return
+        table = OpportunityCounterShard.__table__
+        bind = db.session.connection()
+        if supports_on_conflict(bind):
+            stmt = dialect_insert(table, bind).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.opportunity_id, table.c.shard],
+                set_={'applications': table.c.applications + stmt.excluded.applications},
+            )
+            db.session.execute(stmt)
+            return
+        for row in rows:
+            updated = db.session.execute(
+                update(table)
+                .where(table.c.opportunity_id == row['opportunity_id'], table.c.shard == row['shard'])
+                .values(applications=table.c.applications + row['applications'])
+            ).rowcount
+            if not updated:
+                db.session.execute(table.insert().values(row))
+
+    @staticmethod
+    def pending(opportunity_ids: Iterable[int]) -> Dict[int, int]:
+        """Unfolded applications per opportunity (ids without shards are omitted)"""
+        opportunity_ids = list(opportunity_ids)
+        result = {}
+        for start in range(0, len(opportunity_ids), IN_CHUNK):
+            result.update(db.session.execute(
+                select(OpportunityCounterShard.opportunity_id, func.sum(OpportunityCounterShard.applications))
+                .where(OpportunityCounterShard.opportunity_id.in_(opportunity_ids[start:start + IN_CHUNK]))
+                .group_by(OpportunityCounterShard.opportunity_id)
+            ).all())
+        return result
+
+    @staticmethod
+    def add_pending(items: List[dict], id_key: str = 'id') -> List[dict]:
+        """Add unfolded shard counts to each item's applications_count in place (one query)"""
+        pending = ApplicationCounter.pending(item[id_key] for item in items)
+        for item in items:
+            if pending.get(item[id_key]):
+                item['applications_count'] = (item.get('applications_count') or 0) + pending[item[id_key]]
+        return items
+
+    @staticmethod
+    def fold() -> int:
+        """Move every shard total into applications_count; returns the number of applications folded"""
+        table = OpportunityCounterShard.__table__
+        with db.engine.begin() as connection:
+            if connection.dialect.delete_returning:
+                rows = connection.execute(
+                    delete(table).returning(table.c.opportunity_id, table.c.applications)
+                ).all()
+            else:
+                locked = connection.execute(
+                    select(table.c.id, table.c.opportunity_id, table.c.applications).with_for_update()
+                ).all()
+                connection.execute(delete(table).where(table.c.id.in_([row.id for row in locked])))
+                rows = [(row.opportunity_id, row.applications) for row in locked]
+
+            totals = {}
+            for opportunity_id, applications in rows:
+                totals[opportunity_id] = totals.get(opportunity_id, 0) + applications
+            if totals:
+                opportunities = Opportunity.__table__
+                connection.execute(
+                    update(opportunities)
+                    .where(opportunities.c.id == bindparam('opportunity_id'))
+                    .values(
+                        applications_count=func.coalesce(opportunities.c.applications_count, 0) + bindparam('delta'),
+                        updated_at=opportunities.c.updated_at,  # The visible total does not change
+                    ),
+                    [{'opportunity_id': opportunity_id, 'delta': delta} for opportunity_id, delta in totals.items()],
+                )
+        _last_folded['at'] = time.monotonic()
+        return sum(totals.values())
+
+    @staticmethod
+    def _fold_interval():
+        try:
+            return float(current_app.config.get('APPLICATION_COUNT_FOLD_SECONDS', DEFAULT_FOLD_SECONDS))
+        except (TypeError, ValueError):
+            return DEFAULT_FOLD_SECONDS
+
+    @staticmethod
+    def fold_if_due():
+        """fold() when the last fold in this process is older than the fold interval"""
+        if time.monotonic() - _last_folded['at'] < ApplicationCounter._fold_interval():
+            return None
+        return ApplicationCounter.fold()
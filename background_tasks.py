@@ -0,0 +1,120 @@
+"""
+Background Tasks - follow-up work (notifications, real-time emits) off the request path
+
+Request handlers commit their own rows, then hand slower fan-out to the
+dispatcher, which runs it on a worker thread inside an app context. Tasks are
+best effort: a failure is logged and rolled back, never surfaced to the caller.
+Set BACKGROUND_TASKS_INLINE to run tasks synchronously (tests, scripts).
+
+Periodic maintenance (view rollup compaction, the application counter fold,
+the faculty analytics reconcile) runs on its own thread, started once per
+serving process by ``maintenance.start(app)``. Every job checks whether it is
+due and fails independently of the others.
+"""
+import queue
+import threading
+
+from flask import current_app
+
+from models import db
+from view_analytics import ViewAnalyticsService
+from application_counter import ApplicationCounter
+from faculty_analytics import FacultyAnalyticsService
+
+
+WORKERS = 2
+MAINTENANCE_TICK_SECONDS = 5  # How often the maintenance thread asks each job whether it is due
+
+
+class BackgroundDispatcher:
+    """In-process task queue drained by a small pool of daemon threads"""
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` after the current request (requires an app context)"""
+        app = current_app._get_current_object()
+        if app.config.get('BACKGROUND_TASKS_INLINE'):
+            self._run(app, fn, args, kwargs)
+            return
+        self._ensure_workers()
+        self._queue.put((app, fn, args, kwargs))
+
+    def drain(self):
+        """Block until every submitted task has finished"""
+        self._queue.join()
+
+    def _ensure_workers(self):
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'background-tasks-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            app, fn, args, kwargs = self._queue.get()
+            try:
+                self._run(app, fn, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _run(app, fn, args, kwargs):
+        with app.app_context():
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.warning(f'Background task {getattr(fn, "__name__", fn)} failed: {e}')
+
+
+dispatcher = BackgroundDispatcher()
+
+
+class MaintenanceRunner:
+    """Daemon thread that runs each periodic ``*_if_due`` job on every tick, isolated from the others"""
+
+    def __init__(self, jobs, tick=MAINTENANCE_TICK_SECONDS):
+        self.jobs = list(jobs)
+        self.tick = tick
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, app):
+        """Start the thread for this process (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app,), name='maintenance', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self, app):
+        """Give every job one chance to run, each in its own app context and transaction"""
+        for fn in self.jobs:
+            BackgroundDispatcher._run(app, fn, (), {})
+
+    def _run(self, app):
+        while not self._stop.wait(self.tick):
+            self.run_once(app)
+
+
+maintenance = MaintenanceRunner([
+    ViewAnalyticsService.compact_if_due,
+    ApplicationCounter.fold_if_due,
+    FacultyAnalyticsService.reconcile_if_due,
+])
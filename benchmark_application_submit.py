@@ -0,0 +1,160 @@
+"""
+Benchmark for application submission latency during a placement drive
+Seeds a dedicated database with a company, a handful of openings and N students,
+then has concurrent clients submit applications (plus some double-clicked repeats)
+through POST /api/applications and prints p50/p95/p99 latency and throughput.
+Afterwards it waits for background work and checks every application produced
+exactly one company notification pointing at it.
+
+Usage: python benchmark_application_submit.py [--students 500] [--threads 8] [--openings 5] [--database-url URL]
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+parser = argparse.ArgumentParser(description='Application submission latency benchmark')
+parser.add_argument('--students', type=int, default=500)
+parser.add_argument('--threads', type=int, default=8)
+parser.add_argument('--openings', type=int, default=5)
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_application_submit.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app import app, db  # noqa: E402
+from models import User, StudentProfile, CompanyProfile, Opportunity, Application, Notification  # noqa: E402
+
+DUPLICATE_RATE = 0.1
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(students, openings):
+    """Company, openings and students; returns (opening ids, student user ids)"""
+    db.drop_all()
+    db.create_all()
+
+    company_user = User(email='bench-company@example.com', role='company', is_approved=True)
+    company_user.set_password('benchmark')
+    db.session.add(company_user)
+    db.session.flush()
+    company = CompanyProfile(user_id=company_user.id, name='Benchmark Corp')
+    db.session.add(company)
+    db.session.flush()
+    db.session.execute(Opportunity.__table__.insert(), [
+        {'company_id': company.id, 'title': f'Drive Opening {i}', 'description': 'Benchmark', 'domain': 'Web',
+         'is_active': True, 'is_approved': True, 'views_count': 0, 'applications_count': 0}
+        for i in range(openings)
+    ])
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'bench-student{i}@example.edu', 'password_hash': 'x', 'role': 'student', 'is_approved': True}
+        for i in range(students)
+    ])
+    user_ids = db.session.execute(select(User.id).where(User.role == 'student').order_by(User.id)).scalars().all()
+    db.session.execute(StudentProfile.__table__.insert(), [
+        {'user_id': user_id, 'first_name': f'Student{i}', 'last_name': 'Bench'}
+        for i, user_id in enumerate(user_ids)
+    ])
+    db.session.commit()
+    return db.session.execute(select(Opportunity.id)).scalars().all(), user_ids
+
+
+def wait_for_background_tasks():
+    """Drain the background dispatcher when this tree has one"""
+    try:
+        from background_tasks import dispatcher
+    except ImportError:
+        return
+    dispatcher.drain()
+
+
+def main():
+    with app.app_context():
+        print_section(f"Seeding {args.students} students, {args.openings} openings")
+        opening_ids, user_ids = seed(args.students, args.openings)
+        tokens = {user_id: db.session.get(User, user_id).generate_token() for user_id in user_ids}
+
+    # Every student applies to 1-3 openings (most to the first one); some double-click
+    rng = random.Random(7)
+    submissions = []
+    for user_id in user_ids:
+        for opening in rng.sample(opening_ids, rng.randint(1, min(3, len(opening_ids)))):
+            submissions.append((user_id, opening))
+            if rng.random() < DUPLICATE_RATE:
+                submissions.append((user_id, opening))
+    expected = len(set(submissions))
+    print(f"✅ {len(submissions)} submissions queued ({len(submissions) - expected} repeats), {args.threads} clients")
+
+    print_section("Submitting")
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(chunk):
+        client = app.test_client()
+        samples = []
+        codes = {}
+        for user_id, opening in chunk:
+            start = time.perf_counter()
+            response = client.post('/api/applications', json={'opportunity_id': opening},
+                                   headers={'Authorization': f'Bearer {tokens[user_id]}'})
+            samples.append((time.perf_counter() - start) * 1000)
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        with lock:
+            latencies.extend(samples)
+            for code, count in codes.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    # Keep each student's submissions on one client so repeats arrive after the original
+    chunks = [[] for _ in range(args.threads)]
+    for user_id, opening in submissions:
+        chunks[user_id % args.threads].append((user_id, opening))
+    threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(f"⏱️  {len(latencies) / seconds:.0f} submissions/s")
+    print(f"⏱️  p50 {percentile(0.50):.1f} ms, p95 {percentile(0.95):.1f} ms, p99 {percentile(0.99):.1f} ms, "
+          f"max {latencies[-1]:.1f} ms")
+    print(f"📊 status codes {dict(sorted(statuses.items()))}")
+
+    print_section("Checking results")
+    wait_for_background_tasks()
+    with app.app_context():
+        applications = db.session.execute(select(func.count(Application.id))).scalar()
+        notifications = db.session.execute(
+            select(func.count(Notification.id)).where(Notification.notification_type == 'new_application')
+        ).scalar()
+        linked = db.session.execute(
+            select(func.count(Notification.id))
+            .join(Application, Application.id == Notification.related_id)
+            .where(Notification.notification_type == 'new_application')
+        ).scalar()
+    ok = applications == expected == statuses.get(201, 0) and notifications == expected
+    print(f"{'✅' if ok else '❌'} {applications}/{expected} applications, {notifications} notifications")
+    print(f"{'✅' if linked == notifications else '❌'} {linked}/{notifications} notifications link to their application")
+    return 0 if ok and linked == notifications else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
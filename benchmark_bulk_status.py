@@ -0,0 +1,130 @@
+"""
+Benchmark for bulk application status updates - one bulk request vs one request per application
+Seeds a dedicated database with a company, an opportunity and N applicants, then
+changes every application's status both ways and prints latency and SQL statement counts.
+
+Usage: python benchmark_bulk_status.py [--applications 1000] [--repeat 5] [--database-url URL]
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description='Bulk application status benchmark')
+parser.add_argument('--applications', type=int, default=1000)
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_bulk_status.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+from sqlalchemy import event, select  # noqa: E402
+
+from app import app, db  # noqa: E402
+from models import User, StudentProfile, CompanyProfile, Opportunity, Application, Notification  # noqa: E402
+
+STATUSES = ['shortlisted', 'interview', 'rejected', 'pending']
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(count):
+    """Bulk insert one company posting with ``count`` applicants; returns (token, application ids)"""
+    db.drop_all()
+    db.create_all()
+
+    company_user = User(email='bench-company@example.com', role='company', is_approved=True)
+    company_user.set_password('benchmark')
+    db.session.add(company_user)
+    db.session.flush()
+    company = CompanyProfile(user_id=company_user.id, name='Benchmark Corp')
+    db.session.add(company)
+    db.session.flush()
+    opportunity = Opportunity(company_id=company.id, title='Benchmark Intern', description='Benchmark',
+                              domain='Web', is_active=True, is_approved=True)
+    db.session.add(opportunity)
+    db.session.flush()
+
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'bench-student{i}@example.edu', 'password_hash': 'x', 'role': 'student', 'is_approved': True}
+        for i in range(count)
+    ])
+    user_ids = db.session.execute(select(User.id).where(User.role == 'student').order_by(User.id)).scalars().all()
+    db.session.execute(StudentProfile.__table__.insert(), [
+        {'user_id': user_id, 'first_name': f'Student{i}', 'last_name': 'Bench'}
+        for i, user_id in enumerate(user_ids)
+    ])
+    profile_ids = db.session.execute(select(StudentProfile.id).order_by(StudentProfile.id)).scalars().all()
+    db.session.execute(Application.__table__.insert(), [
+        {'student_id': profile_id, 'opportunity_id': opportunity.id, 'status': 'pending'}
+        for profile_id in profile_ids
+    ])
+    db.session.commit()
+
+    application_ids = db.session.execute(select(Application.id).order_by(Application.id)).scalars().all()
+    return company_user.generate_token(), application_ids
+
+
+class StatementCounter:
+    """Counts SQL statements sent to the database while active"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def main():
+    client = app.test_client()
+    with app.app_context():
+        print_section(f"Seeding {args.applications} applications")
+        token, application_ids = seed(args.applications)
+        counter = StatementCounter(db.engine)
+    headers = {'Authorization': f'Bearer {token}'}
+    print(f"✅ {len(application_ids)} applications ready")
+
+    print_section("One request per application")
+    counter.count = 0
+    start = time.perf_counter()
+    for app_id in application_ids:
+        response = client.put(f'/api/company/applications/{app_id}/status', json={'status': 'shortlisted'}, headers=headers)
+        assert response.status_code == 200, response.get_json()
+    single_seconds = time.perf_counter() - start
+    print(f"⏱️  {single_seconds * 1000:.0f} ms total, {counter.count} SQL statements")
+
+    print_section(f"Bulk request ({args.repeat} runs)")
+    samples = []
+    statements = 0
+    for run in range(args.repeat):
+        counter.count = 0
+        status = STATUSES[(run + 1) % len(STATUSES)]
+        start = time.perf_counter()
+        response = client.put('/api/company/applications/status',
+                              json={'application_ids': application_ids, 'status': status}, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        statements = counter.count
+        body = response.get_json()
+        assert response.status_code == 200 and body['updated'] == len(application_ids), body
+    print(f"⏱️  median {statistics.median(samples):.0f} ms, best {min(samples):.0f} ms, {statements} SQL statements per run")
+    print(f"🚀 {single_seconds * 1000 / statistics.median(samples):.1f}x faster than individual requests")
+
+    with app.app_context():
+        statuses = set(db.session.execute(select(Application.status)).scalars())
+        notifications = db.session.execute(select(db.func.count(Notification.id))).scalar()
+    expected_notifications = len(application_ids) * (args.repeat + 1)
+    ok = statuses == {status} and notifications == expected_notifications
+    print(f"\n{'✅' if ok else '❌'} final statuses {sorted(statuses)}, {notifications}/{expected_notifications} notifications")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Benchmark for the placement cube - compares cube rollups against scanning the base tables
+Seeds a dedicated database with synthetic students/offers, then answers a set of
+faculty filter combinations both ways, checks the answers agree and prints latencies.
+
+Usage: python benchmark_placement_cube.py [--students 5000] [--repeat 20] [--database-url URL]
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+parser = argparse.ArgumentParser(description='Placement cube benchmark')
+parser.add_argument('--students', type=int, default=5000)
+parser.add_argument('--repeat', type=int, default=20)
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_placement_cube.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app import app, db  # noqa: E402
+from models import User, StudentProfile, StudentOffer  # noqa: E402
+from company_resolver import CompanyResolver  # noqa: E402
+from faculty_analytics import FacultyAnalyticsService, package_bucket, offer_year, parse_ctc_to_lpa  # noqa: E402
+
+BRANCHES = ['CSE', 'IT', 'ENTC', 'MECH', 'CIVIL', 'AI&DS']
+COMPANIES = ['Infosys', 'Infosys Ltd', 'TCS', 'Tata Consultancy Services', 'Google', 'Microsoft',
+             'Amazon', 'Accenture', 'Wipro Limited', 'Capgemini', 'Deloitte', 'ZS Associates']
+CTCS = ['3.6 LPA', '4.5', '6 LPA', '7.5 LPA', '12', '18 LPA', '650000', '44 LPA', None, 'Not disclosed']
+
+# (filters, group_by) combinations a faculty user might ask for
+QUERIES = [
+    ({}, ()),
+    ({}, ('branch',)),
+    ({}, ('company',)),
+    ({'branch': 'cse'}, ()),
+    ({'branch': 'cse'}, ('company',)),
+    ({'company': 'Infosys'}, ('branch',)),
+    ({'batch': 2024, 'gender': 'F'}, ('branch',)),
+    ({'ctc_bucket': '10+'}, ('company', 'batch')),
+    ({'branch': 'it', 'gender': 'M', 'batch': 2023}, ('ctc_bucket',)),
+    ({}, ('branch', 'company', 'batch', 'gender', 'ctc_bucket')),
+]
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(students):
+    """Bulk insert synthetic students and offers (bypassing the ORM hooks)"""
+    random.seed(42)
+    db.drop_all()
+    db.create_all()
+
+    users = [{'email': f'bench{i}@example.edu', 'password_hash': 'x', 'role': 'student', 'is_approved': True}
+             for i in range(students)]
+    db.session.execute(User.__table__.insert(), users)
+    user_ids = [row[0] for row in db.session.execute(select(User.id).order_by(User.id))]
+
+    db.session.execute(StudentProfile.__table__.insert(), [
+        {'user_id': user_id, 'first_name': f'Student{i}', 'last_name': 'Bench', 'prn_number': f'B{i:06d}',
+         'course': random.choice(BRANCHES), 'gender': random.choice(['M', 'F', None])}
+        for i, user_id in enumerate(user_ids)
+    ])
+    profile_ids = [row[0] for row in db.session.execute(select(StudentProfile.id))]
+
+    offers = []
+    for profile_id in profile_ids:
+        for _ in range(random.choice([0, 1, 1, 2])):
+            ctc = random.choice(CTCS)
+            offers.append({
+                'student_id': profile_id,
+                'company_name': random.choice(COMPANIES),
+                'ctc': ctc,
+                'ctc_lpa': parse_ctc_to_lpa(ctc),
+                'role': random.choice(['SDE', 'Analyst', 'Consultant']),
+                'status': random.choice(['accepted', 'accepted', 'pending', 'declined']),
+                'joining_date': random.choice([date(2023, 7, 1), date(2024, 7, 1), date(2025, 7, 1), None]),
+            })
+    db.session.execute(StudentOffer.__table__.insert(), offers)
+    db.session.commit()
+    return len(offers)
+
+
+def scan_base_tables(filters, group_by):
+    """Answer a query the way the endpoints did before the cube: load rows, bucket in Python"""
+    branch_expr = func.coalesce(func.nullif(StudentProfile.course, ''), func.nullif(StudentProfile.specialization, ''))
+    stmt = (
+        select(branch_expr, StudentOffer.company_id, StudentOffer.ctc, StudentOffer.joining_date,
+               StudentOffer.offer_date, StudentProfile.gender)
+        .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
+        .where(StudentOffer.status == 'accepted')
+    )
+    if 'branch' in filters:
+        stmt = stmt.where(func.lower(branch_expr) == filters['branch'].lower())
+    if 'company' in filters:
+        stmt = stmt.where(StudentOffer.company_id == CompanyResolver.lookup(filters['company']))
+    if 'gender' in filters:
+        stmt = stmt.where(func.lower(StudentProfile.gender) == filters['gender'].lower())
+
+    groups = {}
+    for branch, company_id, ctc, joining_date, offer_date, gender in db.session.execute(stmt):
+        value = parse_ctc_to_lpa(ctc)
+        row = {
+            'branch': branch or 'Unknown',
+            'company': company_id or None,
+            'batch': offer_year(joining_date, offer_date),
+            'gender': gender or None,
+            'ctc_bucket': package_bucket(value) if value is not None else None,
+        }
+        if 'batch' in filters and row['batch'] != filters['batch']:
+            continue
+        if 'ctc_bucket' in filters and row['ctc_bucket'] != filters['ctc_bucket']:
+            continue
+        groups.setdefault(tuple(row[dim] for dim in group_by), []).append(value)
+
+    answers = {}
+    for key, values in groups.items():
+        packages = [value for value in values if value is not None]
+        answers[key] = (
+            len(values),
+            min(packages) if packages else None,
+            max(packages) if packages else None,
+            round(sum(packages) / len(packages), 2) if packages else None,
+        )
+    return answers
+
+
+def cube_answers(filters, group_by):
+    answers = {}
+    for row in FacultyAnalyticsService.cube_rollup(filters, group_by):
+        key = tuple(row['company_id'] if dim == 'company' else row[dim] for dim in group_by)
+        answers[key] = (row['offers'], row['min_package_lpa'], row['max_package_lpa'], row['avg_package_lpa'])
+    return answers
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    with app.app_context():
+        print_section(f"Seeding {args.students} students")
+        start = time.perf_counter()
+        offers = seed(args.students)
+        print(f"✅ {offers} offers inserted in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        CompanyResolver.backfill()
+        FacultyAnalyticsService.reconcile()
+        print(f"✅ Companies resolved and cube built in {time.perf_counter() - start:.1f}s")
+
+        print_section("Cube rollup vs base-table scan (median ms)")
+        print(f"{'query':<58}{'scan':>9}{'cube':>9}{'speedup':>9}  ok")
+        mismatches = 0
+        for filters, group_by in QUERIES:
+            expected, scan_ms = timed(lambda: scan_base_tables(filters, group_by), args.repeat)
+            actual, cube_ms = timed(lambda: cube_answers(filters, group_by), args.repeat)
+            ok = expected == actual
+            mismatches += not ok
+            label = f"{filters or 'all'} by {','.join(group_by) or '-'}"
+            print(f"{label[:57]:<58}{scan_ms:>9.2f}{cube_ms:>9.2f}{scan_ms / cube_ms:>8.1f}x  {'✅' if ok else '❌'}")
+
+        if mismatches:
+            print(f"\n❌ {mismatches} queries disagree with the base tables")
+            return 1
+        print("\n✅ Every cube answer matches the base tables")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
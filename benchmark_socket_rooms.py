@@ -0,0 +1,145 @@
+"""
+Load test for real-time event fan-out over Socket.IO
+Seeds a dedicated database with N users, opens C authenticated Socket.IO
+connections in process (some users hold two, like a second browser tab), then
+sends messages through POST /api/messages and compares how many events each one
+delivers when emitted to everyone (the old global broadcast) and when emitted to
+the receiver's user room. Also checks that no client receives another user's event.
+
+Usage: python benchmark_socket_rooms.py [--connections 5000] [--users 4000] [--messages 100] [--database-url URL]
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser(description='Socket.IO per-user room fan-out load test')
+parser.add_argument('--connections', type=int, default=5000)
+parser.add_argument('--users', type=int, default=4000)
+parser.add_argument('--messages', type=int, default=100)
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_socket_rooms.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app import app, db, socketio  # noqa: E402
+from models import User  # noqa: E402
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(users):
+    """``users`` student accounts; returns their ids"""
+    db.drop_all()
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'bench-user{i}@example.edu', 'password_hash': 'x', 'role': 'student', 'is_approved': True}
+        for i in range(users)
+    ])
+    db.session.commit()
+    return db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+
+
+def collect(clients):
+    """Drain every client's queue; returns (deliveries, events that reached the wrong user)"""
+    delivered = 0
+    leaked = 0
+    for user_id, client in clients:
+        for event in client.get_received():
+            if event['name'] != 'new_message':
+                continue
+            delivered += 1
+            if event['args'][0]['receiver_id'] != user_id:
+                leaked += 1
+    return delivered, leaked
+
+
+def report(label, messages, seconds, delivered, leaked, expected, private=True):
+    """Print fan-out per message and emit cost"""
+    print(f"⏱️  {label}: {seconds / messages * 1000:.2f} ms per message, "
+          f"{delivered / messages:.1f} events delivered per message")
+    if private:
+        print(f"{'✅' if leaked == 0 else '❌'} {leaked} events delivered to a user other than the receiver")
+    else:
+        print(f"⚠️  {leaked} events delivered to a user other than the receiver (clients filtered them)")
+    exact = delivered == expected
+    print(f"{'✅' if exact else '❌'} {delivered} deliveries, {expected} expected")
+    return delivered / messages, leaked == 0 and exact
+
+
+def main():
+    rng = random.Random(11)
+    with app.app_context():
+        print_section(f"Seeding {args.users} users, opening {args.connections} connections")
+        user_ids = seed(args.users)
+        tokens = {user_id: create_access_token(identity=str(user_id)) for user_id in user_ids}
+
+    # Every user connects once, the rest of the connections are second tabs
+    owners = list(user_ids[:args.connections])
+    owners += [rng.choice(user_ids) for _ in range(args.connections - len(owners))]
+    start = time.perf_counter()
+    clients = [(user_id, socketio.test_client(app, auth={'token': tokens[user_id]})) for user_id in owners]
+    connected = sum(client.is_connected() for _, client in clients)
+    print(f"{'✅' if connected == len(clients) else '❌'} {connected}/{len(clients)} connections authenticated "
+          f"in {time.perf_counter() - start:.1f}s")
+    refused = not socketio.test_client(app).is_connected()
+    print(f"{'✅' if refused else '❌'} Connection without a token refused")
+    for _, client in clients:
+        client.get_received()
+    connections_per_user = {}
+    for user_id in owners:
+        connections_per_user[user_id] = connections_per_user.get(user_id, 0) + 1
+
+    pairs = [tuple(rng.sample(user_ids, 2)) for _ in range(args.messages)]
+
+    print_section("Global broadcast (previous behaviour)")
+    delivered = leaked = 0
+    seconds = 0.0
+    with app.app_context():
+        for sender_id, receiver_id in pairs:
+            start = time.perf_counter()
+            socketio.emit('new_message', {'message': {'sender_id': sender_id, 'content': 'Benchmark'},
+                                          'receiver_id': receiver_id})
+            seconds += time.perf_counter() - start
+            counts = collect(clients)
+            delivered += counts[0]
+            leaked += counts[1]
+    broadcast, _ = report("Broadcast", len(pairs), seconds, delivered, leaked, len(pairs) * len(clients),
+                          private=False)
+
+    print_section("Per-user rooms: POST /api/messages")
+    http = app.test_client()
+    delivered = leaked = 0
+    seconds = 0.0
+    for sender_id, receiver_id in pairs:
+        start = time.perf_counter()
+        response = http.post('/api/messages', json={'receiver_id': receiver_id, 'content': 'Benchmark'},
+                             headers={'Authorization': f'Bearer {tokens[sender_id]}'})
+        seconds += time.perf_counter() - start
+        if response.status_code != 201:
+            print(f"❌ Send failed: {response.get_json()}")
+            return 1
+        counts = collect(clients)
+        delivered += counts[0]
+        leaked += counts[1]
+    expected = sum(connections_per_user.get(receiver_id, 0) for _, receiver_id in pairs)
+    targeted, ok = report("Room", len(pairs), seconds, delivered, leaked, expected)
+
+    for _, client in clients:
+        client.disconnect()
+    print(f"\n🚀 {broadcast / targeted:.0f}x fewer events per message at {len(clients)} connections")
+    return 0 if ok and refused and connected == len(clients) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
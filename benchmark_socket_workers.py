@@ -0,0 +1,202 @@
+"""
+Benchmark for Socket.IO delivery across worker processes
+Seeds a dedicated database, starts several eventlet workers (serve.py worker
+mode), connects Socket.IO clients to every worker but the first and sends
+messages through POST /api/messages on the first worker, so every new_message
+event has to cross workers. Runs once without a message queue (events are lost)
+and once with one, printing delivery, latency percentiles and throughput.
+
+Usage: python benchmark_socket_workers.py [--workers 3] [--clients 200] [--messages 1000] [--senders 4]
+                                          [--port 5700] [--message-queue URL] [--database-url URL]
+Without --message-queue the local Redis-compatible stand-in (socket_queue) is used.
+Needs the Socket.IO client extras: pip install "python-socketio[client]".
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+parser = argparse.ArgumentParser(description='Cross-worker Socket.IO delivery benchmark')
+parser.add_argument('--workers', type=int, default=3)
+parser.add_argument('--clients', type=int, default=200)
+parser.add_argument('--messages', type=int, default=1000)
+parser.add_argument('--senders', type=int, default=4)
+parser.add_argument('--port', type=int, default=5700, help='Port of the first worker')
+parser.add_argument('--message-queue', default='', help='Queue URL, e.g. redis://localhost:6379/0')
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_socket_workers.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+import requests  # noqa: E402
+import socketio  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app import app, db  # noqa: E402
+from models import User  # noqa: E402
+from socket_queue import LocalMessageQueue  # noqa: E402
+
+SERVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve.py')
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(users):
+    """``users`` accounts; returns {user id: token}"""
+    db.drop_all()
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'bench-user{i}@example.edu', 'password_hash': 'x', 'role': 'student', 'is_approved': True}
+        for i in range(users)
+    ])
+    db.session.commit()
+    user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    return {user_id: create_access_token(identity=str(user_id)) for user_id in user_ids}
+
+
+def start_workers(queue_url, log):
+    """Spawn the workers and wait until each answers; returns the processes"""
+    env = dict(os.environ, SOCKETIO_MESSAGE_QUEUE=queue_url)
+    workers = [
+        subprocess.Popen([sys.executable, SERVE, '--host', '127.0.0.1', '--worker-port', str(args.port + index)],
+                         env=env, stdout=log, stderr=subprocess.STDOUT)
+        for index in range(args.workers)
+    ]
+    deadline = time.monotonic() + 60
+    for index in range(args.workers):
+        while True:
+            try:
+                requests.get(f'http://127.0.0.1:{args.port + index}/socket.io/?EIO=4&transport=polling', timeout=1)
+                break
+            except requests.RequestException:
+                if time.monotonic() > deadline or workers[index].poll() is not None:
+                    raise RuntimeError(f'Worker {index} did not start (see {log.name})')
+                time.sleep(0.2)
+    return workers
+
+
+def stop_workers(workers):
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        try:
+            worker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def run(label, queue_url, tokens, receivers, senders, messages, log):
+    """One phase; returns (delivered, latencies in ms, seconds from first send to last delivery)"""
+    print_section(label)
+    workers = start_workers(queue_url, log)
+    clients = []
+    received = {}
+    lock = threading.Lock()
+    try:
+        # Receivers connect to every worker except the first one, which handles all sends
+        for index, user_id in enumerate(receivers):
+            client = socketio.Client(reconnection=False)
+
+            def on_message(data):
+                arrived = time.perf_counter()
+                with lock:
+                    received.setdefault(data['message']['content'], arrived)
+
+            client.on('new_message', on_message)
+            port = args.port + 1 + index % (args.workers - 1)
+            client.connect(f'http://127.0.0.1:{port}', auth={'token': tokens[user_id]},
+                           transports=['websocket'], wait_timeout=10)
+            clients.append(client)
+        print(f"✅ {len(clients)} clients connected to workers 1-{args.workers - 1}, "
+              f"sending {messages} messages to worker 0")
+
+        sent = {}
+        errors = []
+
+        def sender(index):
+            session = requests.Session()
+            headers = {'Authorization': f'Bearer {tokens[senders[index]]}'}
+            for sequence in range(index, messages, len(senders)):
+                content = f'Benchmark {sequence}'
+                start = time.perf_counter()
+                response = session.post(f'http://127.0.0.1:{args.port}/api/messages', headers=headers, timeout=30,
+                                        json={'receiver_id': receivers[sequence % len(receivers)], 'content': content})
+                with lock:
+                    sent[content] = start
+                    if response.status_code != 201:
+                        errors.append(response.text)
+
+        threads = [threading.Thread(target=sender, args=(index,)) for index in range(len(senders))]
+        first_send = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Wait for stragglers, giving up after a quiet period
+        deadline = time.perf_counter() + 5
+        while len(received) < messages and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        if errors:
+            print(f"❌ {len(errors)} sends failed, e.g. {errors[0][:200]}")
+        with lock:
+            latencies = sorted((arrived - sent[content]) * 1000 for content, arrived in received.items() if content in sent)
+            last = max(received.values(), default=first_send)
+        return len(received), latencies, last - first_send
+    finally:
+        for client in clients:
+            client.disconnect()
+        stop_workers(workers)
+
+
+def main():
+    if args.workers < 2:
+        print("❌ Cross-worker delivery needs at least 2 workers")
+        return 1
+    with app.app_context():
+        print_section(f"Seeding {args.clients + args.senders} users")
+        tokens = seed(args.clients + args.senders)
+    user_ids = sorted(tokens)
+    receivers, senders = user_ids[:args.clients], user_ids[args.clients:]
+    log = tempfile.NamedTemporaryFile('w', prefix='benchmark_socket_workers_', suffix='.log', delete=False)
+
+    control = min(args.messages, 100)
+    delivered, _, _ = run("Without a message queue", '', tokens, receivers, senders, control, log)
+    print(f"⚠️  {delivered}/{control} events reached clients on other workers")
+
+    local_queue = None
+    queue_url = args.message_queue
+    if not queue_url:
+        local_queue = LocalMessageQueue(port=0).start()
+        queue_url = local_queue.url
+    try:
+        delivered, latencies, seconds = run(f"With message queue {queue_url}", queue_url, tokens, receivers, senders,
+                                            args.messages, log)
+    finally:
+        if local_queue:
+            local_queue.stop()
+    log.close()
+
+    ok = delivered == args.messages
+    print(f"{'✅' if ok else '❌'} {delivered}/{args.messages} events delivered across workers")
+    if latencies:
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        print(f"⏱️  send-to-delivery p50 {percentile(0.50):.1f} ms, p95 {percentile(0.95):.1f} ms, "
+              f"p99 {percentile(0.99):.1f} ms, max {latencies[-1]:.1f} ms")
+        print(f"🚀 {delivered / seconds:.0f} messages/s delivered across {args.workers} workers "
+              f"({args.senders} concurrent senders)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
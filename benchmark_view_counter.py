@@ -0,0 +1,139 @@
+"""
+Benchmark for buffered opportunity view counts - write-per-view vs the batched view counter
+Seeds a dedicated database with opportunities, then has concurrent clients hit the
+detail endpoint (most traffic on a few hot postings) in both modes and prints
+throughput, latency and whether every view was counted.
+
+Usage: python benchmark_view_counter.py [--threads 8] [--views 4000] [--opportunities 50] [--database-url URL]
+The database is dropped and re-seeded, so never point --database-url at real data.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+parser = argparse.ArgumentParser(description='Buffered view counter benchmark')
+parser.add_argument('--threads', type=int, default=8)
+parser.add_argument('--views', type=int, default=4000, help='Total detail page views per mode')
+parser.add_argument('--opportunities', type=int, default=50)
+parser.add_argument('--database-url', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'benchmark_view_counter.db'))
+args = parser.parse_args()
+os.environ['DATABASE_URL'] = args.database_url  # Must be set before the app is imported
+
+from sqlalchemy import func, select, update  # noqa: E402
+
+from app import app, db  # noqa: E402
+from models import User, CompanyProfile, Opportunity  # noqa: E402
+from view_counter import opportunity_views  # noqa: E402
+
+
+def print_section(title):
+    """Print a formatted section header"""
+    print("\n" + "="*70)
+    print(f"  {title}")
+    print("="*70 + "\n")
+
+
+def seed(count):
+    """Create one company with ``count`` approved, active opportunities; returns their ids"""
+    db.drop_all()
+    db.create_all()
+
+    company_user = User(email='bench-company@example.com', role='company', is_approved=True)
+    company_user.set_password('benchmark')
+    db.session.add(company_user)
+    db.session.flush()
+    company = CompanyProfile(user_id=company_user.id, name='Benchmark Corp')
+    db.session.add(company)
+    db.session.flush()
+    db.session.execute(Opportunity.__table__.insert(), [
+        {'company_id': company.id, 'title': f'Benchmark Intern {i}', 'description': 'Benchmark', 'domain': 'Web',
+         'is_active': True, 'is_approved': True, 'views_count': 0, 'applications_count': 0}
+        for i in range(count)
+    ])
+    db.session.commit()
+    return db.session.execute(select(Opportunity.id).order_by(Opportunity.id)).scalars().all()
+
+
+def run(opportunity_ids, flush_seconds):
+    """Fire args.views detail requests from args.threads clients; returns (seconds, latencies, errors)"""
+    app.config['VIEW_COUNT_FLUSH_SECONDS'] = flush_seconds
+    hot = opportunity_ids[:3]
+    per_thread = args.views // args.threads
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        samples = []
+        for _ in range(per_thread):
+            opp_id = rng.choice(hot) if rng.random() < 0.8 else rng.choice(opportunity_ids)
+            start = time.perf_counter()
+            response = client.get(f'/api/opportunities/{opp_id}')
+            samples.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                with lock:
+                    errors.append(response.get_json())
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    with app.app_context():
+        opportunity_views.flush()
+    return seconds, latencies, errors
+
+
+def total_views():
+    with app.app_context():
+        return db.session.execute(select(func.sum(Opportunity.views_count))).scalar() or 0
+
+
+def reset_views():
+    with app.app_context():
+        db.session.execute(update(Opportunity).values(views_count=0))
+        db.session.commit()
+
+
+def main():
+    with app.app_context():
+        print_section(f"Seeding {args.opportunities} opportunities")
+        opportunity_ids = seed(args.opportunities)
+    print(f"✅ {len(opportunity_ids)} opportunities ready, {args.threads} concurrent clients")
+
+    expected = (args.views // args.threads) * args.threads
+    ok = True
+    results = {}
+    for label, flush_seconds in (("Write per view", 0), ("Buffered view counter", 5)):
+        print_section(label)
+        reset_views()
+        seconds, latencies, errors = run(opportunity_ids, flush_seconds)
+        latencies.sort()
+        counted = total_views()
+        results[label] = expected / seconds
+        print(f"⏱️  {expected / seconds:.0f} views/s, median {statistics.median(latencies):.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms")
+        if errors:
+            print(f"❌ {len(errors)} failed requests, e.g. {errors[0]}")
+        print(f"{'✅' if counted == expected and not errors else '❌'} {counted}/{expected} views counted")
+        ok = ok and counted == expected and not errors
+
+    opportunity_views.stop()
+    print(f"\n🚀 {results['Buffered view counter'] / results['Write per view']:.1f}x the throughput of writing every view")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Company Resolver - maps free-text offer/internship company names onto canonical companies
+
+"Infosys Ltd", "INFOSYS" and "Infosys Limited." all normalize to the token string
+"infosys" and resolve to the same ``companies`` row. Names that do not normalize
+identically are compared against existing companies sharing their first token
+with a string/token similarity score. Resolution runs at write time (before each
+flush) and as a batch backfill for existing rows; a batch of names costs a fixed
+number of queries (exact match, fuzzy candidates, one insert, one re-read)
+whatever its size.
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from models import db, CanonicalCompany, StudentOffer, StudentInternship
+from db_utils import dialect_insert, supports_on_conflict
+
+
+# Tokens dropped from the end of a name before matching
+LEGAL_SUFFIXES = {
+    'ltd', 'limited', 'pvt', 'private', 'inc', 'incorporated', 'llp', 'llc',
+    'corp', 'corporation', 'co', 'company', 'plc', 'gmbh', 'pte',
+}
+SIMILARITY_THRESHOLD = 0.88
+IN_CHUNK = 500
+
+# Model -> free-text column holding the company name
+_NAME_COLUMNS = {
+    StudentOffer: 'company_name',
+    StudentInternship: 'organization',
+}
+
+
+class CompanyResolver:
+    """Resolves company names to canonical company ids"""
+
+    @staticmethod
+    def tokens(name: str):
+        """Lowercase alphanumeric tokens with trailing legal suffixes removed"""
+        if not name:
+            return []
+        text = name.lower().replace('&', ' and ')
+        tokens = re.findall(r'[a-z0-9]+', text)
+        while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+            tokens.pop()
+        return tokens
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return ' '.join(CompanyResolver.tokens(name))
+
+    @staticmethod
+    def similarity(a: str, b: str) -> float:
+        """Best of character-level ratio and token-set overlap between two normalized names"""
+        if not a or not b:
+            return 0.0
+        ratio = SequenceMatcher(None, a, b).ratio()
+        tokens_a, tokens_b = set(a.split()), set(b.split())
+        jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+        return max(ratio, jaccard)
+
+    @staticmethod
+    def lookup(name: str, connection=None) -> Optional[int]:
+        """Canonical company id for a name, or None when nothing matches closely enough"""
+        normalized = CompanyResolver.normalize(name)
+        if not normalized:
+            return None
+        execute = (connection or db.session).execute
+
+        company_id = execute(
+            select(CanonicalCompany.id).where(CanonicalCompany.normalized_name == normalized)
+        ).scalar()
+        if company_id:
+            return company_id
+
+        first_token = normalized.split()[0]
+        best_id, best_score = None, 0.0
+        for candidate_id, candidate_name in execute(
+            select(CanonicalCompany.id, CanonicalCompany.normalized_name)
+            .where(CanonicalCompany.first_token == first_token)
+        ):
+            score = CompanyResolver.similarity(normalized, candidate_name)
+            if score > best_score:
+                best_id, best_score = candidate_id, score
+        return best_id if best_score >= SIMILARITY_THRESHOLD else None
+
+    @staticmethod
+    def resolve(name: str, connection=None) -> Optional[int]:
+        """Canonical company id for a name, creating the company when no match exists"""
+        return CompanyResolver.resolve_many([name], connection).get(name)
+
+    @staticmethod
+    def _in_chunks(connection, stmt_for, values):
+        """Rows of ``stmt_for(chunk)`` over ``values`` split into IN-list sized chunks"""
+        values = sorted(values)
+        for start in range(0, len(values), IN_CHUNK):
+            yield from connection.execute(stmt_for(values[start:start + IN_CHUNK]))
+
+    @staticmethod
+    def resolve_many(names: Iterable[str], connection=None) -> Dict[str, Optional[int]]:
+        """
+        Resolve many names at once, creating companies for the ones nothing matches.
+        Matching follows lookup(); a name may also match a company created earlier
+        in the same batch, as it would when resolved one by one.
+        """
+        connection = connection or db.session.connection()
+        resolved = {}
+        normalized = {}
+        for name in names:
+            if name in resolved or name in normalized:
+                continue
+            key = CompanyResolver.normalize(name)
+            if key:
+                normalized[name] = key
+            else:
+                resolved[name] = None
+        if not normalized:
+            return resolved
+
+        table = CanonicalCompany.__table__
+        by_key = dict(CompanyResolver._in_chunks(
+            connection,
+            lambda keys: select(table.c.normalized_name, table.c.id).where(table.c.normalized_name.in_(keys)),
+            set(normalized.values()),
+        ))
+        unmatched = [name for name, key in normalized.items() if key not in by_key]
+
+        # Fuzzy candidates for every unmatched name, bucketed by first token
+        candidates = {}
+        for candidate_id, candidate_name, first_token in CompanyResolver._in_chunks(
+            connection,
+            lambda tokens: select(table.c.id, table.c.normalized_name, table.c.first_token)
+            .where(table.c.first_token.in_(tokens)),
+            {normalized[name].split()[0] for name in unmatched},
+        ):
+            candidates.setdefault(first_token, []).append((candidate_id, candidate_name))
+
+        new_companies = {}  # normalized name -> display name, in first-seen order
+        aliases = {}  # normalized name -> new company it fuzzy-matched
+        for name in unmatched:
+            key = normalized[name]
+            if key in by_key or key in new_companies:
+                continue
+            first_token = key.split()[0]
+            best, best_score = None, 0.0
+            for candidate in candidates.get(first_token, []):
+                score = CompanyResolver.similarity(key, candidate[1])
+                if score > best_score:
+                    best, best_score = candidate, score
+            if best_score >= SIMILARITY_THRESHOLD:
+                if best[0] is None:
+                    aliases[key] = best[1]
+                else:
+                    by_key[key] = best[0]
+                continue
+            # Later names in the batch may match this company, as in lookup() after a resolve()
+            new_companies[key] = name.strip()
+            candidates.setdefault(first_token, []).append((None, key))
+
+        if new_companies:
+            rows = [
+                {'name': display, 'normalized_name': key, 'first_token': key.split()[0][:100]}
+                for key, display in new_companies.items()
+            ]
+            if supports_on_conflict(connection):
+                # Concurrent writers may create the same company; the loser re-reads it below
+                connection.execute(
+                    dialect_insert(table, connection).values(rows)
+                    .on_conflict_do_nothing(index_elements=[table.c.normalized_name])
+                )
+            else:
+                connection.execute(table.insert(), rows)
+            by_key.update(CompanyResolver._in_chunks(
+                connection,
+                lambda keys: select(table.c.normalized_name, table.c.id).where(table.c.normalized_name.in_(keys)),
+                set(new_companies),
+            ))
+
+        for name, key in normalized.items():
+            resolved[name] = by_key.get(aliases.get(key, key))
+        return resolved
+
+    @staticmethod
+    def backfill(batch_size: int = 500) -> int:
+        """
+        Assign company_id to every offer/internship that does not have one yet.
+        Each distinct name is resolved once and applied with one UPDATE per name,
+        committing every ``batch_size`` names. Returns the number of rows updated.
+        """
+        updated = 0
+        for model, column_name in _NAME_COLUMNS.items():
+            column = getattr(model, column_name)
+            names = [
+                name for (name,) in db.session.execute(
+                    select(column).where(model.company_id.is_(None), column.isnot(None)).distinct()
+                )
+            ]
+            for start in range(0, len(names), batch_size):
+                connection = db.session.connection()
+                for name, company_id in CompanyResolver.resolve_many(names[start:start + batch_size], connection).items():
+                    if not company_id:
+                        continue
+                    result = db.session.execute(
+                        update(model)
+                        .where(model.company_id.is_(None), column == name)
+                        .values(company_id=company_id)
+                        .execution_options(synchronize_session=False)
+                    )
+                    updated += result.rowcount or 0
+                db.session.commit()
+        return updated
+
+
+@event.listens_for(Session, 'before_flush')
+def _resolve_companies_before_flush(session, flush_context, instances):
+    """Keep company_id in step with the free-text name on every ORM write"""
+    targets = []
+    for obj in list(session.new) + list(session.dirty):
+        column_name = _NAME_COLUMNS.get(type(obj))
+        if not column_name:
+            continue
+        if obj in session.new or db.inspect(obj).attrs[column_name].history.has_changes():
+            targets.append((obj, getattr(obj, column_name)))
+    if not targets:
+        return
+
+    with session.no_autoflush:
+        resolved = CompanyResolver.resolve_many(
+            [name for _, name in targets if name], session.connection()
+        )
+    for obj, name in targets:
+        obj.company_id = resolved.get(name) if name else None
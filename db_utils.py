@@ -0,0 +1,26 @@
+"""
+Database helpers shared by services that need dialect-specific SQL
+"""
+from sqlalchemy import insert
+
+
+def dialect_insert(table, bind):
+    """
+    Return an INSERT construct for the bound dialect.
+
+    PostgreSQL and SQLite constructs support ``on_conflict_do_update`` /
+    ``on_conflict_do_nothing``; other dialects get a plain INSERT.
+    """
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return insert(table)
+
+
+def supports_on_conflict(bind):
+    """True when the bound dialect understands INSERT ... ON CONFLICT"""
+    return bind.dialect.name in ('postgresql', 'sqlite')
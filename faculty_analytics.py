@@ -0,0 +1,757 @@
+"""
+Faculty Analytics Snapshot - incrementally maintained placement/internship statistics
+
+Every faculty stats endpoint reads the materialized counters in ``analytics_counters``
+instead of re-aggregating the student tables. Counters are kept current by ORM flush
+hooks: the contribution of each affected student is computed before and after the
+flush and only the difference is applied (atomic ``value = value + delta`` upserts in
+the same transaction). A full reconcile rebuilds the counters periodically to absorb
+bulk writes that bypass the ORM; it runs in the maintenance thread of each
+serving process (background_tasks.py) and in migrate_db.py, never in a request,
+so the stats endpoints only read. Totals derived from a whole metric (companies
+with placements, highest package) are kept as scalar counters, and the dashboard
+reads only its bounded metrics plus the top companies.
+
+The same hooks maintain ``placement_cube``: accepted offers pre-aggregated per
+branch x company x batch year x gender x CTC bucket with count/sum/min/max
+measures, so any combination of faculty filters is answered by a rollup over a
+few hundred cells. Additions are folded in with upserts; a cell that loses a
+value is recomputed from its base rows, since min/max cannot be decremented.
+"""
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, select, delete, update, func, cast, Float
+from sqlalchemy.orm import Session
+
+from models import (
+    db, StudentProfile, StudentOffer, StudentInternship, AnalyticsCounter, CanonicalCompany,
+    PlacementCubeCell,
+)
+from db_utils import dialect_insert, supports_on_conflict
+from company_resolver import CompanyResolver
+
+
+PACKAGE_BUCKETS = ['0-3', '3-5', '5-7', '7-10', '10+']
+TOP_COMPANIES = 15
+DEFAULT_RECONCILE_SECONDS = 900
+UNKNOWN = 'Unknown'
+
+# Metric names stored in analytics_counters.metric
+TOTALS = 'totals'
+BRANCH_TOTAL = 'branch_total'
+BRANCH_PLACED = 'branch_placed'
+COMPANY_PLACED = 'company_placed'
+CTC_VALUE = 'ctc_value'
+PACKAGE_BUCKET = 'package_bucket'
+BATCH_YEAR = 'batch_year'
+INTERNSHIP_DOMAIN = 'internship_domain'
+META = 'meta'
+
+# Metrics with a bounded number of dimensions, read whole by the dashboard
+DASHBOARD_METRICS = (TOTALS, BRANCH_TOTAL, BRANCH_PLACED, PACKAGE_BUCKET, BATCH_YEAR)
+
+_PENDING_KEY = 'faculty_analytics_pending'
+_TRACKED_MODELS = (StudentProfile, StudentOffer, StudentInternship)
+_PROFILE_FIELDS = ('course', 'specialization', 'gender')  # Profile columns the snapshot/cube depend on
+
+
+# Kept under its historical name for callers in routes.faculty
+parse_ctc_to_lpa = StudentOffer.parse_ctc_to_lpa
+
+
+def package_bucket(value):
+    """Map an LPA value onto the package distribution bucket label"""
+    if value < 3:
+        return '0-3'
+    if value < 5:
+        return '3-5'
+    if value < 7:
+        return '5-7'
+    if value < 10:
+        return '7-10'
+    return '10+'
+
+
+def offer_year(joining_date, offer_date):
+    """Batch year of an offer: joining date year, falling back to the offer date year"""
+    if joining_date:
+        return joining_date.year
+    if offer_date:
+        return offer_date.year
+    return None
+
+
+def is_paid_stipend(stipend):
+    return bool(stipend and stipend.strip())
+
+
+# Rollup dimension name -> placement_cube column
+CUBE_DIMENSIONS = {
+    'branch': PlacementCubeCell.branch,
+    'company': PlacementCubeCell.company_id,
+    'batch': PlacementCubeCell.batch_year,
+    'gender': PlacementCubeCell.gender,
+    'ctc_bucket': PlacementCubeCell.ctc_bucket,
+}
+_CUBE_KEY = ('branch', 'company_id', 'batch_year', 'gender', 'ctc_bucket')
+
+# Same branch label as the Python side of the cube: course, then specialization
+_CUBE_BRANCH_EXPR = func.coalesce(
+    func.nullif(StudentProfile.course, ''), func.nullif(StudentProfile.specialization, ''), UNKNOWN
+)
+
+
+def _cube_key(branch, company_id, ctc_value, joining_date, offer_date, gender):
+    return (
+        branch,
+        company_id or 0,
+        offer_year(joining_date, offer_date) or 0,
+        gender or '',
+        package_bucket(ctc_value) if ctc_value is not None else '',
+    )
+
+
+def _student_contributions(connection, student_ids=None):
+    """
+    Contribution of the given students as ``(counters, cube)``: a Counter of
+    (metric, dimension) -> value, and a dict of cube cell key -> list of the
+    CTC values (None when unparseable) of the accepted offers in that cell.
+
+    ``student_ids=None`` computes the contribution of every student (full reconcile).
+    All metrics are student-scoped, so the snapshot is the sum of these contributions.
+    """
+    contributions = Counter()
+    cube = {}
+    if student_ids is not None and not student_ids:
+        return contributions, cube
+
+    profiles = select(StudentProfile.id, StudentProfile.course, StudentProfile.specialization,
+                      StudentProfile.gender)
+    offers = (
+        select(StudentOffer.student_id, func.coalesce(CanonicalCompany.name, StudentOffer.company_name),
+               StudentOffer.ctc, StudentOffer.joining_date, StudentOffer.offer_date, StudentOffer.company_id)
+        .outerjoin(CanonicalCompany, CanonicalCompany.id == StudentOffer.company_id)
+        .where(StudentOffer.status == 'accepted')
+    )
+    internships = select(StudentInternship.student_id, StudentInternship.industry_sector,
+                         StudentInternship.stipend)
+    if student_ids is not None:
+        ids = list(student_ids)
+        profiles = profiles.where(StudentProfile.id.in_(ids))
+        offers = offers.where(StudentOffer.student_id.in_(ids))
+        internships = internships.where(StudentInternship.student_id.in_(ids))
+
+    branches = {}
+    cube_profiles = {}
+    for student_id, course, specialization, gender in connection.execute(profiles):
+        branch = course or UNKNOWN
+        branches[student_id] = branch
+        cube_profiles[student_id] = (course or specialization or UNKNOWN, gender)
+        contributions[(TOTALS, 'students')] += 1
+        contributions[(BRANCH_TOTAL, branch)] += 1
+
+    placed = set()
+    for student_id, company_name, ctc, joining_date, offer_date, company_id in connection.execute(offers):
+        if student_id not in branches:
+            continue
+        placed.add(student_id)
+        if company_name:
+            contributions[(COMPANY_PLACED, company_name)] += 1
+        value = parse_ctc_to_lpa(ctc)
+        cube_branch, gender = cube_profiles[student_id]
+        key = _cube_key(cube_branch, company_id, value, joining_date, offer_date, gender)
+        cube.setdefault(key, []).append(value)
+        if value is not None:
+            contributions[(TOTALS, 'ctc_sum')] += value
+            contributions[(TOTALS, 'ctc_count')] += 1
+            contributions[(CTC_VALUE, f'{value:.2f}')] += 1
+            contributions[(PACKAGE_BUCKET, package_bucket(value))] += 1
+        year = offer_year(joining_date, offer_date)
+        if year:
+            contributions[(BATCH_YEAR, str(year))] += 1
+
+    for student_id in placed:
+        contributions[(TOTALS, 'placed')] += 1
+        contributions[(BRANCH_PLACED, branches[student_id])] += 1
+
+    for student_id, industry_sector, stipend in connection.execute(internships):
+        if student_id not in branches:
+            continue
+        contributions[(TOTALS, 'internships')] += 1
+        contributions[(INTERNSHIP_DOMAIN, industry_sector or UNKNOWN)] += 1
+        if is_paid_stipend(stipend):
+            contributions[(TOTALS, 'paid_internships')] += 1
+
+    return contributions, cube
+
+
+def _apply_deltas(connection, deltas, now=None):
+    """Add each delta onto its counter row with a single multi-row upsert"""
+    rows = [
+        {'metric': metric, 'dimension': dimension, 'value': value, 'updated_at': now or datetime.utcnow()}
+        for (metric, dimension), value in deltas.items()
+        if value
+    ]
+    if not rows:
+        return
+
+    table = AnalyticsCounter.__table__
+    if supports_on_conflict(connection):
+        stmt = dialect_insert(table, connection).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.dimension],
+            set_={'value': table.c.value + stmt.excluded.value, 'updated_at': stmt.excluded.updated_at},
+        )
+        connection.execute(stmt)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(table.c.metric == row['metric'], table.c.dimension == row['dimension'])
+            .values(value=table.c.value + row['value'], updated_at=row['updated_at'])
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def _set_counters(connection, values, now=None):
+    """Overwrite counters with absolute values (one upsert), unlike the additive _apply_deltas"""
+    rows = [
+        {'metric': metric, 'dimension': dimension, 'value': value, 'updated_at': now or datetime.utcnow()}
+        for (metric, dimension), value in values.items()
+    ]
+    if not rows:
+        return
+
+    table = AnalyticsCounter.__table__
+    if supports_on_conflict(connection):
+        stmt = dialect_insert(table, connection).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.dimension],
+            set_={'value': stmt.excluded.value, 'updated_at': stmt.excluded.updated_at},
+        )
+        connection.execute(stmt)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(table.c.metric == row['metric'], table.c.dimension == row['dimension'])
+            .values(value=row['value'], updated_at=row['updated_at'])
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def _aggregates(connection, metrics):
+    """
+    Scalar totals derived from whole metrics, which deltas cannot maintain: the
+    number of companies with placements and the highest package. Recomputed on
+    writes that touch those metrics, so dashboard reads stay a fixed set of rows.
+    """
+    table = AnalyticsCounter.__table__
+    values = {}
+    if COMPANY_PLACED in metrics:
+        values[(TOTALS, 'companies')] = connection.execute(
+            select(func.count()).select_from(table).where(table.c.metric == COMPANY_PLACED, table.c.value >= 0.5)
+        ).scalar() or 0
+    if CTC_VALUE in metrics:
+        values[(TOTALS, 'ctc_max')] = connection.execute(
+            select(func.max(cast(table.c.dimension, Float))).where(table.c.metric == CTC_VALUE, table.c.value >= 0.5)
+        ).scalar() or 0
+    return values
+
+
+def _cell_measures(values):
+    ctc_values = [value for value in values if value is not None]
+    return {
+        'offers_count': len(values),
+        'ctc_count': len(ctc_values),
+        'ctc_sum': sum(ctc_values),
+        'ctc_min': min(ctc_values) if ctc_values else None,
+        'ctc_max': max(ctc_values) if ctc_values else None,
+    }
+
+
+def _extreme(connection, current, incoming, largest):
+    """Dialect-specific scalar greatest()/least() that ignores NULL on either side"""
+    if connection.dialect.name == 'sqlite':
+        pick = func.max if largest else func.min
+    else:
+        pick = func.greatest if largest else func.least
+    return pick(func.coalesce(current, incoming), func.coalesce(incoming, current))
+
+
+def _cube_deltas(before, after):
+    """
+    Split the before/after cube contributions into values to add per cell and
+    cells that lost at least one value (and must be recomputed from base rows).
+    """
+    additions = {}
+    recompute = set()
+    for key in set(before) | set(after):
+        old, new = Counter(before.get(key, [])), Counter(after.get(key, []))
+        if old - new:
+            recompute.add(key)
+        else:
+            added = list((new - old).elements())
+            if added:
+                additions[key] = added
+    return additions, recompute
+
+
+def _apply_cube_additions(connection, additions, now=None):
+    """Fold added offers into their cells with one multi-row upsert"""
+    now = now or datetime.utcnow()
+    rows = [
+        dict(zip(_CUBE_KEY, key), updated_at=now, **_cell_measures(values))
+        for key, values in additions.items()
+    ]
+    if not rows:
+        return
+
+    table = PlacementCubeCell.__table__
+    if supports_on_conflict(connection):
+        stmt = dialect_insert(table, connection).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in _CUBE_KEY],
+            set_={
+                'offers_count': table.c.offers_count + stmt.excluded.offers_count,
+                'ctc_count': table.c.ctc_count + stmt.excluded.ctc_count,
+                'ctc_sum': table.c.ctc_sum + stmt.excluded.ctc_sum,
+                'ctc_min': _extreme(connection, table.c.ctc_min, stmt.excluded.ctc_min, largest=False),
+                'ctc_max': _extreme(connection, table.c.ctc_max, stmt.excluded.ctc_max, largest=True),
+                'updated_at': stmt.excluded.updated_at,
+            },
+        )
+        connection.execute(stmt)
+        return
+
+    for row in rows:
+        result = connection.execute(
+            table.update()
+            .where(*[table.c[name] == row[name] for name in _CUBE_KEY])
+            .values(
+                offers_count=table.c.offers_count + row['offers_count'],
+                ctc_count=table.c.ctc_count + row['ctc_count'],
+                ctc_sum=table.c.ctc_sum + row['ctc_sum'],
+                ctc_min=_extreme(connection, table.c.ctc_min, row['ctc_min'], largest=False),
+                ctc_max=_extreme(connection, table.c.ctc_max, row['ctc_max'], largest=True),
+                updated_at=row['updated_at'],
+            )
+        )
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def _recompute_cube_cells(connection, keys, now=None):
+    """Rewrite the given cells from the base tables (dropping cells left empty)"""
+    now = now or datetime.utcnow()
+    table = PlacementCubeCell.__table__
+    by_slice = {}
+    for key in keys:
+        branch, company_id, _, gender, _ = key
+        by_slice.setdefault((branch, company_id, gender), set()).add(key)
+
+    for (branch, company_id, gender), slice_keys in by_slice.items():
+        # Year and bucket are derived in Python, so load the whole branch/company/gender slice
+        offers = (
+            select(StudentOffer.ctc, StudentOffer.joining_date, StudentOffer.offer_date)
+            .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
+            .where(
+                StudentOffer.status == 'accepted',
+                _CUBE_BRANCH_EXPR == branch,
+                func.coalesce(StudentOffer.company_id, 0) == company_id,
+                func.coalesce(StudentProfile.gender, '') == gender,
+            )
+        )
+        cells = {key: [] for key in slice_keys}
+        for ctc, joining_date, offer_date in connection.execute(offers):
+            value = parse_ctc_to_lpa(ctc)
+            key = _cube_key(branch, company_id, value, joining_date, offer_date, gender)
+            if key in cells:
+                cells[key].append(value)
+
+        for key, values in cells.items():
+            match = [table.c[name] == part for name, part in zip(_CUBE_KEY, key)]
+            if not values:
+                connection.execute(table.delete().where(*match))
+                continue
+            measures = dict(_cell_measures(values), updated_at=now)
+            result = connection.execute(table.update().where(*match).values(**measures))
+            if not result.rowcount:
+                connection.execute(table.insert().values(**dict(zip(_CUBE_KEY, key)), **measures))
+
+
+def _affected_students(session):
+    """Student ids (and still-pending rows) touched by the objects in this flush"""
+    student_ids = set()
+    pending = []
+
+    def track(obj):
+        if isinstance(obj, StudentProfile):
+            if obj.id is not None:
+                student_ids.add(obj.id)
+            else:
+                pending.append(obj)
+            return
+        student = obj.__dict__.get('student')
+        if obj.student_id is not None:
+            student_ids.add(obj.student_id)
+        elif student is not None and student.id is not None:
+            student_ids.add(student.id)
+        else:
+            pending.append(obj)
+        history = db.inspect(obj).attrs.student_id.history
+        student_ids.update(value for value in history.deleted if value is not None)
+
+    for obj in session.new:
+        if isinstance(obj, _TRACKED_MODELS):
+            track(obj)
+    for obj in session.deleted:
+        if isinstance(obj, _TRACKED_MODELS):
+            track(obj)
+    for obj in session.dirty:
+        if isinstance(obj, StudentProfile):
+            state = db.inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _PROFILE_FIELDS):
+                track(obj)
+        elif isinstance(obj, _TRACKED_MODELS) and session.is_modified(obj):
+            track(obj)
+    return student_ids, pending
+
+
+@event.listens_for(Session, 'before_flush')
+def _capture_before_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        student_ids, pending = _affected_students(session)
+        if not student_ids and not pending:
+            return
+        before = _student_contributions(session.connection(), student_ids)
+    session.info.setdefault(_PENDING_KEY, []).append((student_ids, pending, before))
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _apply_after_flush(session, flush_context):
+    batches = session.info.pop(_PENDING_KEY, None)
+    if not batches:
+        return
+
+    connection = session.connection()
+    touched = set()
+    for student_ids, pending, (before, cube_before) in batches:
+        ids = set(student_ids)
+        for obj in pending:
+            student_id = obj.id if isinstance(obj, StudentProfile) else obj.student_id
+            if student_id is not None:
+                ids.add(student_id)
+        after, cube_after = _student_contributions(connection, ids)
+        deltas = Counter(after)
+        deltas.subtract(before)
+        _apply_deltas(connection, deltas)
+        touched.update(metric for (metric, _), value in deltas.items() if value)
+
+        additions, recompute = _cube_deltas(cube_before, cube_after)
+        _apply_cube_additions(connection, additions)
+        _recompute_cube_cells(connection, recompute)
+
+    if touched:
+        values = _aggregates(connection, touched)
+        values[(META, 'updated')] = 1
+        _set_counters(connection, values)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class FacultyAnalyticsService:
+    """Reads and maintains the faculty analytics snapshot"""
+
+    @staticmethod
+    def reconcile():
+        """Rebuild every counter and cube cell from the base tables in one transaction"""
+        now = datetime.utcnow()
+        connection = db.session.connection()
+        totals, cube = _student_contributions(connection)
+        totals[(META, 'reconciled')] = 1
+
+        table = AnalyticsCounter.__table__
+        db.session.execute(delete(table))
+        db.session.execute(
+            table.insert(),
+            [
+                {'metric': metric, 'dimension': dimension, 'value': value, 'updated_at': now}
+                for (metric, dimension), value in totals.items()
+            ],
+        )
+        values = _aggregates(connection, (COMPANY_PLACED, CTC_VALUE))
+        values[(META, 'updated')] = 1
+        _set_counters(connection, values, now)
+
+        cube_table = PlacementCubeCell.__table__
+        db.session.execute(delete(cube_table))
+        if cube:
+            db.session.execute(
+                cube_table.insert(),
+                [
+                    dict(zip(_CUBE_KEY, key), updated_at=now, **_cell_measures(values))
+                    for key, values in cube.items()
+                ],
+            )
+        db.session.commit()
+        return now
+
+    @staticmethod
+    def _reconcile_interval():
+        try:
+            return int(current_app.config.get('FACULTY_ANALYTICS_RECONCILE_SECONDS', DEFAULT_RECONCILE_SECONDS))
+        except (TypeError, ValueError):
+            return DEFAULT_RECONCILE_SECONDS
+
+    @staticmethod
+    def _load_counters(metrics):
+        """Counters of the given metrics plus the META timestamps (never the per-company or per-CTC rows)"""
+        rows = db.session.execute(
+            select(AnalyticsCounter.metric, AnalyticsCounter.dimension,
+                   AnalyticsCounter.value, AnalyticsCounter.updated_at)
+            .where(AnalyticsCounter.metric.in_(tuple(metrics) + (META,)))
+        ).all()
+        counters = {}
+        timestamps = {}
+        for metric, dimension, value, updated_at in rows:
+            if metric == META:
+                timestamps[dimension] = updated_at
+                continue
+            counters.setdefault(metric, {})[dimension] = value
+        reconciled_at = timestamps.get('reconciled')
+        as_of = max(filter(None, (timestamps.get('updated'), reconciled_at)), default=None)
+        return counters, as_of, reconciled_at
+
+    @staticmethod
+    def _reconciled_at():
+        return db.session.execute(
+            select(AnalyticsCounter.updated_at)
+            .where(AnalyticsCounter.metric == META, AnalyticsCounter.dimension == 'reconciled')
+        ).scalar()
+
+    @staticmethod
+    def reconcile_if_due():
+        """
+        Reconcile when the snapshot has never been built or the last reconcile is
+        older than the interval; returns the reconcile time, or None when not due.
+        Safe to call from several workers at once: each first tries to advance the
+        META 'reconciled' timestamp it read, and only the one that succeeds rebuilds.
+        """
+        now = datetime.utcnow()
+        reconciled_at = FacultyAnalyticsService._reconciled_at()
+        if reconciled_at is not None and \
+                (now - reconciled_at).total_seconds() <= FacultyAnalyticsService._reconcile_interval():
+            return None
+
+        table = AnalyticsCounter.__table__
+        if reconciled_at is not None:
+            claim = (
+                update(table)
+                .where(table.c.metric == META, table.c.dimension == 'reconciled', table.c.updated_at == reconciled_at)
+                .values(updated_at=now)
+            )
+            claimed = db.session.execute(claim).rowcount == 1
+        elif supports_on_conflict(db.session.connection()):
+            claim = dialect_insert(table, db.session.connection()).values(
+                metric=META, dimension='reconciled', value=1, updated_at=now
+            ).on_conflict_do_nothing(index_elements=['metric', 'dimension'])
+            claimed = db.session.execute(claim).rowcount == 1
+        else:
+            claimed = True
+        db.session.commit()
+        if not claimed:
+            return None
+        return FacultyAnalyticsService.reconcile()
+
+    @staticmethod
+    def get_snapshot(metrics=DASHBOARD_METRICS):
+        """Return (counters, as_of, reconciled_at) for ``metrics`` from the snapshot"""
+        return FacultyAnalyticsService._load_counters(metrics)
+
+    @staticmethod
+    def top_counters(metric, limit):
+        """The ``limit`` largest positive counters of a metric as [(dimension, value)]"""
+        return db.session.execute(
+            select(AnalyticsCounter.dimension, AnalyticsCounter.value)
+            .where(AnalyticsCounter.metric == metric, AnalyticsCounter.value >= 0.5)
+            .order_by(AnalyticsCounter.value.desc(), AnalyticsCounter.dimension)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def cube_rollup(filters=None, group_by=()):
+        """
+        Roll the placement cube up to the requested dimensions.
+
+        ``filters`` maps cube dimensions (see CUBE_DIMENSIONS) to values; ``group_by``
+        lists the dimensions to break down by. Returns one dict per group with the
+        offer count and min/avg/max package in LPA, largest groups first.
+        Raises ValueError for unknown dimensions or a non-numeric batch.
+        """
+        filters = {dim: value for dim, value in (filters or {}).items() if value not in (None, '')}
+        unknown = [dim for dim in list(filters) + list(group_by) if dim not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s): {', '.join(unknown)}")
+
+        cell = PlacementCubeCell
+        group_columns = [CUBE_DIMENSIONS[dim] for dim in group_by]
+        stmt = select(
+            *[CUBE_DIMENSIONS[dim].label(dim) for dim in group_by],
+            func.sum(cell.offers_count).label('offers'),
+            func.sum(cell.ctc_count).label('ctc_count'),
+            func.sum(cell.ctc_sum).label('ctc_sum'),
+            func.min(cell.ctc_min).label('ctc_min'),
+            func.max(cell.ctc_max).label('ctc_max'),
+        ).select_from(cell)
+        if 'company' in group_by:
+            stmt = stmt.add_columns(CanonicalCompany.name.label('company_name')).outerjoin(
+                CanonicalCompany, CanonicalCompany.id == cell.company_id
+            )
+            group_columns.append(CanonicalCompany.name)
+
+        for dim, value in filters.items():
+            column = CUBE_DIMENSIONS[dim]
+            if dim == 'company':
+                company_id = value if isinstance(value, int) else CompanyResolver.lookup(str(value))
+                if not company_id:
+                    return []
+                stmt = stmt.where(column == company_id)
+            elif dim == 'batch':
+                stmt = stmt.where(column == int(value))
+            elif dim in ('branch', 'gender'):
+                stmt = stmt.where(func.lower(column) == str(value).strip().lower())
+            else:
+                stmt = stmt.where(column == value)
+
+        if group_columns:
+            stmt = stmt.group_by(*group_columns)
+        stmt = stmt.order_by(func.sum(cell.offers_count).desc(), *group_columns)
+
+        results = []
+        for row in db.session.execute(stmt):
+            values = row._mapping
+            if not values['offers']:
+                continue
+            item = {}
+            for dim in group_by:
+                if dim == 'company':
+                    item['company_id'] = values['company'] or None
+                    item['company'] = values['company_name'] or UNKNOWN
+                else:
+                    item[dim] = values[dim] or None
+            ctc_count = int(values['ctc_count'] or 0)
+            item.update({
+                'offers': int(values['offers']),
+                'ctc_count': ctc_count,
+                'min_package_lpa': values['ctc_min'],
+                'max_package_lpa': values['ctc_max'],
+                'avg_package_lpa': round(values['ctc_sum'] / ctc_count, 2) if ctc_count else None,
+            })
+            results.append(item)
+        return results
+
+    @staticmethod
+    def _freshness(as_of, reconciled_at):
+        return {
+            'as_of': as_of.isoformat() if as_of else None,
+            'reconciled_at': reconciled_at.isoformat() if reconciled_at else None,
+        }
+
+    @staticmethod
+    def get_dashboard_payload():
+        """Dashboard statistics + chart series served from the snapshot"""
+        counters, as_of, reconciled_at = FacultyAnalyticsService.get_snapshot()
+
+        def count(metric, dimension):
+            return int(round(counters.get(metric, {}).get(dimension, 0)))
+
+        def positive(metric):
+            return {
+                dimension: int(round(value))
+                for dimension, value in counters.get(metric, {}).items()
+                if round(value) > 0
+            }
+
+        total_students = count(TOTALS, 'students')
+        total_placed = count(TOTALS, 'placed')
+        ctc_count = count(TOTALS, 'ctc_count')
+        ctc_sum = counters.get(TOTALS, {}).get('ctc_sum', 0.0)
+        ctc_max = counters.get(TOTALS, {}).get('ctc_max', 0.0)
+
+        company_wise = [
+            {'company': name, 'placed': int(round(placed))}
+            for name, placed in FacultyAnalyticsService.top_counters(COMPANY_PLACED, TOP_COMPANIES)
+        ]
+
+        branch_placed = positive(BRANCH_PLACED)
+        branch_wise = []
+        for branch, total in sorted(positive(BRANCH_TOTAL).items()):
+            placed = branch_placed.get(branch, 0)
+            branch_wise.append({
+                'branch': branch,
+                'placed': placed,
+                'total': total,
+                'percentage': round(placed / total * 100, 1) if total else 0,
+            })
+
+        buckets = positive(PACKAGE_BUCKET)
+        package_distribution = [{'range': key, 'count': buckets.get(key, 0)} for key in PACKAGE_BUCKETS]
+
+        batch_trends = [
+            {'year': year, 'placed': placed}
+            for year, placed in sorted(positive(BATCH_YEAR).items())
+        ]
+
+        payload = {
+            'stats': {
+                'total_students': total_students,
+                'placed_students': total_placed,
+                'unplaced_students': max(total_students - total_placed, 0),
+                'total_internships': count(TOTALS, 'internships'),
+                'highest_package_lpa': round(ctc_max, 2) if ctc_max else 0,
+                'average_package_lpa': round(ctc_sum / ctc_count, 2) if ctc_count else 0,
+                'total_companies': count(TOTALS, 'companies'),
+            },
+            'charts': {
+                'company_wise': company_wise,
+                'branch_wise': branch_wise,
+                'package_distribution': package_distribution,
+                'batch_trends': batch_trends,
+            },
+        }
+        payload.update(FacultyAnalyticsService._freshness(as_of, reconciled_at))
+        return payload
+
+    @staticmethod
+    def get_internship_stats_payload():
+        """Internship statistics served from the snapshot"""
+        counters, as_of, reconciled_at = FacultyAnalyticsService.get_snapshot((TOTALS, INTERNSHIP_DOMAIN))
+        totals = counters.get(TOTALS, {})
+        total_internships = int(round(totals.get('internships', 0)))
+        paid_count = int(round(totals.get('paid_internships', 0)))
+
+        domain_wise = [
+            {'domain': domain, 'count': int(round(value))}
+            for domain, value in sorted(counters.get(INTERNSHIP_DOMAIN, {}).items())
+            if round(value) > 0
+        ]
+
+        payload = {
+            'total_internships': total_internships,
+            'domain_wise': domain_wise,
+            'paid': paid_count,
+            'unpaid': total_internships - paid_count,
+        }
+        payload.update(FacultyAnalyticsService._freshness(as_of, reconciled_at))
+        return payload
+
@@ -32,7 +32,7 @@ const Messages: React.FC = () => {
 
   const loadMessages = async (userId: number) => {
     try {
-      const data = await messageService.getAll(userId);
+      const data = await messageService.getConversation(userId);
       setMessages(data);
     } catch (error) {
       console.error('Error loading messages:', error);
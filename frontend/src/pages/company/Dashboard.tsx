@@ -25,7 +25,7 @@ const CompanyDashboard: React.FC = () => {
 
   const loadDashboard = async () => {
     try {
-      const data = await companyService.getDashboard();
+      const data = await companyService.getDashboard({ limit: 6 });
       setDashboard(data);
     } catch (error) {
       console.error('Error loading dashboard:', error);
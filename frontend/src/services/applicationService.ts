@@ -10,6 +10,21 @@ export const applicationService = {
     return response.data.application;
   },
 
+  bulkApply: async (
+    opportunityIds: number[],
+    coverLetter?: string
+  ): Promise<{
+    applied: number;
+    failed: number;
+    results: { opportunity_id: number; success: boolean; application_id?: number; error?: string }[];
+  }> => {
+    const response = await api.post('/applications/bulk', {
+      opportunity_ids: opportunityIds,
+      cover_letter: coverLetter,
+    });
+    return response.data;
+  },
+
   getById: async (id: number): Promise<Application> => {
     const response = await api.get(`/applications/${id}`);
     return response.data;
@@ -17,6 +17,16 @@ export const companyService = {
     return response.data.opportunity;
   },
 
+  importOpportunities: async (file: File, dryRun = false) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await api.post('/company/opportunities/import', formData, {
+      params: { dry_run: dryRun },
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response.data;
+  },
+
   getOpportunities: async (): Promise<Opportunity[]> => {
     const response = await api.get('/company/opportunities');
     return response.data;
@@ -27,9 +37,13 @@ export const companyService = {
     return response.data.opportunity;
   },
 
-  getApplicants: async (opportunityId: number, status?: string): Promise<Application[]> => {
+  getApplicants: async (
+    opportunityId: number,
+    status?: string,
+    sort?: 'applied_at' | 'match_score' | 'status'
+  ): Promise<Application[]> => {
     const response = await api.get(`/company/opportunities/${opportunityId}/applicants`, {
-      params: { status },
+      params: { status, sort },
     });
     return response.data;
   },
@@ -46,8 +60,17 @@ export const companyService = {
     return response.data.application;
   },
 
-  getDashboard: async () => {
-    const response = await api.get('/company/dashboard');
+  bulkUpdateApplicationStatus: async (applicationIds: number[], status: string, notes?: string) => {
+    const response = await api.put('/company/applications/status', {
+      application_ids: applicationIds,
+      status,
+      notes,
+    });
+    return response.data;
+  },
+
+  getDashboard: async (params?: { limit?: number; after?: number }) => {
+    const response = await api.get('/company/dashboard', { params });
     return response.data;
   },
 
@@ -56,6 +56,11 @@ export const facultyService = {
     return response.data;
   },
 
+  getFacets: async (): Promise<Record<string, { value: string | number; count: number }[]>> => {
+    const response = await api.get('/faculty/filters');
+    return response.data;
+  },
+
   getFilterBranches: async () => {
     const response = await api.get('/faculty/filters/branches');
     return response.data;
@@ -103,11 +108,11 @@ export const facultyService = {
 
   downloadReport: async (
     type: 'placement' | 'internship' | 'branch' | 'company' | 'yearly',
-    format: 'json' | 'csv' = 'json'
+    format: 'json' | 'csv' | 'csv.gz' = 'json'
   ): Promise<FacultyReportPayload | Blob> => {
     const response = await api.get(`/faculty/reports/${type}`, {
       params: { format },
-      responseType: format === 'csv' ? 'blob' : 'json',
+      responseType: format === 'json' ? 'json' : 'blob',
     });
     return response.data;
   },
@@ -2,13 +2,31 @@ import api from './api';
 import { Message } from '../types';
 
 export const messageService = {
-  getAll: async (conversationWith?: number, type?: string): Promise<Message[]> => {
+  getAll: async (
+    conversationWith?: number,
+    type?: string,
+    page?: { limit?: number; before?: number; after?: number; since?: string }
+  ): Promise<Message[]> => {
     const response = await api.get('/messages', {
-      params: { conversation_with: conversationWith, type },
+      params: { conversation_with: conversationWith, type, ...page },
     });
     return response.data;
   },
 
+  // Whole conversation with one user, oldest first: pages back with before= until a short page
+  getConversation: async (conversationWith: number, pageSize: number = 100): Promise<Message[]> => {
+    let messages: Message[] = [];
+    let before: number | undefined;
+    for (;;) {
+      const page = await messageService.getAll(conversationWith, undefined, { limit: pageSize, before });
+      messages = [...page, ...messages];
+      if (page.length < pageSize) {
+        return messages;
+      }
+      before = page[0].id;
+    }
+  },
+
   send: async (
     receiverId: number,
     content: string,
@@ -30,8 +48,10 @@ export const messageService = {
     await api.put(`/messages/${id}/read`);
   },
 
-  getConversations: async (): Promise<any[]> => {
-    const response = await api.get('/messages/conversations');
+  getConversations: async (limit?: number, before?: number): Promise<any[]> => {
+    const response = await api.get('/messages/conversations', {
+      params: { limit, before },
+    });
     return response.data;
   },
 };
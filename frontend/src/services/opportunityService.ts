@@ -6,8 +6,11 @@ export const opportunityService = {
     domain?: string;
     work_type?: string;
     search?: string;
+    sort?: 'relevance' | 'newest';
     page?: number;
     per_page?: number;
+    limit?: number;
+    after?: number;
   }): Promise<{ opportunities: Opportunity[]; pagination: any }> => {
     const response = await api.get('/opportunities', { params: filters });
     return response.data;
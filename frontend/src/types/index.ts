@@ -83,6 +83,7 @@ export interface Opportunity {
   applications_count: number;
   created_at?: string;
   has_applied?: boolean;
+  status_counts?: Record<string, number>;
 }
 
 export interface Application {
@@ -0,0 +1,75 @@
+"""
+Script to bulk import opportunities for a company from CSV, JSON or JSON Lines.
+Usage: python import_opportunities.py openings.csv --company-email hr@company.com [--dry-run]
+
+CSV columns: title, description, domain, required_skills (comma-separated), duration,
+stipend, location, work_type, prerequisites, application_deadline, start_date, is_active
+"""
+import argparse
+import sys
+
+from app import app
+from models import User, CompanyProfile
+from opportunity_import import OpportunityImportService, DEFAULT_CHUNK_SIZE
+
+
+def find_company(company_id=None, company_email=None):
+    if company_id:
+        return CompanyProfile.query.get(company_id)
+    user = User.query.filter_by(email=company_email.strip().lower()).first()
+    return user.company_profile if user else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import opportunities for a company')
+    parser.add_argument('file', help='Path to a .csv, .json or .jsonl file')
+    company = parser.add_mutually_exclusive_group(required=True)
+    company.add_argument('--company-id', type=int, help='Company profile id')
+    company.add_argument('--company-email', help='Email of the company user')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl'], help='Override format detection')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='Validate only, do not insert')
+    args = parser.parse_args()
+
+    fmt = args.format or OpportunityImportService.detect_format(args.file)
+    if not fmt:
+        print(f"✗ Cannot detect the format of {args.file}; pass --format")
+        return 1
+
+    with app.app_context():
+        profile = find_company(args.company_id, args.company_email)
+        if not profile:
+            print("✗ Company not found")
+            return 1
+
+        print(f"Importing {args.file} ({fmt}) for {profile.name}{' [dry run]' if args.dry_run else ''}...")
+        with open(args.file, 'rb') as stream:
+            try:
+                report = OpportunityImportService.import_records(
+                    profile.id,
+                    OpportunityImportService.iter_records(stream, fmt),
+                    chunk_size=args.chunk_size,
+                    dry_run=args.dry_run,
+                )
+            except ValueError as e:
+                print(f"✗ {e}")
+                return 1
+
+    print(f"  Rows read: {report['total_rows']}")
+    print(f"  Valid rows: {report['valid_rows']}")
+    print(f"  ✓ Imported: {report['imported']}")
+    print(f"  Skills resolved: {report['skills_resolved']}")
+    print(f"  Throughput: {report['rows_per_second']} rows/s ({report['elapsed_seconds']}s)")
+    if report['errors']:
+        print(f"  ✗ Failed rows: {report['failed']}")
+        for error in report['errors']:
+            print(f"    row {error['row']}: {'; '.join(error['errors'])}")
+        if report['errors_truncated']:
+            print("    ...")
+    for chunk_error in report['chunk_errors']:
+        print(f"  ✗ Rows {chunk_error['first_row']}-{chunk_error['last_row']} not written: {chunk_error['error']}")
+    return 0 if not report['failed'] else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
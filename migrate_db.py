@@ -3,7 +3,7 @@ Database migration script to add missing columns to existing tables.
 This script safely adds new columns without dropping existing data.
 """
 from app import app, db
-from sqlalchemy import text, inspect
+from sqlalchemy import text, inspect, select, update, bindparam
 
 def migrate_database():
     """Add missing columns to existing tables."""
@@ -64,6 +64,171 @@ def migrate_database():
             else:
                 print(f"  ✓ Table {table_name} already exists")
         
+        # Parsed CTC column used by SQL range filters on placements
+        if 'student_offers' in inspector.get_table_names():
+            offer_columns = [col['name'] for col in inspector.get_columns('student_offers')]
+            if 'ctc_lpa' not in offer_columns:
+                try:
+                    print("\nAdding column: student_offers.ctc_lpa (FLOAT)")
+                    db.session.execute(text("ALTER TABLE student_offers ADD COLUMN ctc_lpa FLOAT"))
+                    db.session.commit()
+                except Exception as e:
+                    print(f"  ✗ Error adding ctc_lpa: {e}")
+                    db.session.rollback()
+            
+            # Core statements on id/ctc/ctc_lpa only: the mapped model may have columns this schema lacks yet
+            from models import StudentOffer
+            try:
+                offers = StudentOffer.__table__
+                rows = [
+                    {'offer_id': offer_id, 'lpa': StudentOffer.parse_ctc_to_lpa(ctc)}
+                    for offer_id, ctc in db.session.execute(
+                        select(offers.c.id, offers.c.ctc).where(offers.c.ctc_lpa.is_(None), offers.c.ctc.isnot(None))
+                    )
+                ]
+                stmt = update(offers).where(offers.c.id == bindparam('offer_id')).values(ctc_lpa=bindparam('lpa'))
+                for start in range(0, len(rows), 1000):
+                    db.session.execute(stmt, rows[start:start + 1000])
+                db.session.commit()
+                print(f"  ✓ Backfilled ctc_lpa for {len(rows)} offers")
+            except Exception as e:
+                print(f"  ✗ Error backfilling ctc_lpa: {e}")
+                db.session.rollback()
+        
+        # Canonical company ids on offers/internships
+        db.create_all()  # Creates the companies table when missing
+        inspector = inspect(db.engine)
+        for table_name in ['student_offers', 'student_internships']:
+            if table_name in inspector.get_table_names():
+                columns = [col['name'] for col in inspector.get_columns(table_name)]
+                if 'company_id' not in columns:
+                    try:
+                        print(f"\nAdding column: {table_name}.company_id (INTEGER REFERENCES companies)")
+                        db.session.execute(text(f"ALTER TABLE {table_name} ADD COLUMN company_id INTEGER REFERENCES companies(id)"))
+                        db.session.commit()
+                    except Exception as e:
+                        print(f"  ✗ Error adding company_id to {table_name}: {e}")
+                        db.session.rollback()
+        
+        print("\nResolving company names to canonical companies...")
+        try:
+            from company_resolver import CompanyResolver
+            updated = CompanyResolver.backfill()
+            print(f"  ✓ Linked {updated} offers/internships to canonical companies")
+        except Exception as e:
+            print(f"  ✗ Error backfilling companies: {e}")
+            db.session.rollback()
+        
+        # Indexes added to existing tables (db.create_all only indexes new tables)
+        new_indexes = {
+            'ix_student_offers_student_id': 'student_offers (student_id)',
+            'ix_student_internships_student_id': 'student_internships (student_id)',
+            'ix_student_offers_ctc_lpa': 'student_offers (ctc_lpa)',
+            'ix_student_offers_lower_company_name': 'student_offers (lower(company_name))',
+            'ix_student_profiles_lower_course': 'student_profiles (lower(course))',
+            'ix_student_profiles_lower_specialization': 'student_profiles (lower(specialization))',
+            'ix_student_profiles_lower_branch': "student_profiles (lower(coalesce(nullif(course, ''), specialization)))",
+            'ix_student_internships_lower_industry_sector': 'student_internships (lower(industry_sector))',
+            'ix_student_internships_lower_organization': 'student_internships (lower(organization))',
+            'ix_student_internships_lower_internship_type': 'student_internships (lower(internship_type))',
+            'ix_student_offers_company_id': 'student_offers (company_id)',
+            'ix_student_internships_company_id': 'student_internships (company_id)',
+            'ix_opportunities_company_id': 'opportunities (company_id)',
+            'ix_applications_opportunity_status': 'applications (opportunity_id, status)',
+            'ix_applications_opportunity_applied': 'applications (opportunity_id, applied_at)',
+            'ix_users_role_approved': 'users (role, is_approved)',
+            'ix_users_created_at_id': 'users (created_at, id)',
+            'ix_opportunities_listing': 'opportunities (is_active, is_approved, created_at, id)',
+            'ix_messages_sender_receiver_created': 'messages (sender_id, receiver_id, created_at, id)',
+            'ix_messages_receiver_sender_created': 'messages (receiver_id, sender_id, created_at, id)',
+            'ix_analytics_counters_metric_value': 'analytics_counters (metric, value)',
+        }
+        
+        print("\nChecking indexes...")
+        for index_name, target in new_indexes.items():
+            try:
+                db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}"))
+                db.session.commit()
+                print(f"  ✓ Index {index_name} ready")
+            except Exception as e:
+                print(f"  ✗ Error creating {index_name}: {e}")
+                db.session.rollback()
+        
+        # Trigram indexes for the admin directory's substring search (PostgreSQL only)
+        if db.engine.dialect.name == 'postgresql':
+            print("\nChecking search indexes...")
+            trigram_indexes = {
+                'ix_users_email_trgm': 'users USING gin (lower(email) gin_trgm_ops)',
+                'ix_student_profiles_first_name_trgm': 'student_profiles USING gin (lower(first_name) gin_trgm_ops)',
+                'ix_student_profiles_last_name_trgm': 'student_profiles USING gin (lower(last_name) gin_trgm_ops)',
+                'ix_company_profiles_name_trgm': 'company_profiles USING gin (lower(name) gin_trgm_ops)',
+            }
+            try:
+                db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                db.session.commit()
+                for index_name, target in trigram_indexes.items():
+                    db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}"))
+                    db.session.commit()
+                    print(f"  ✓ Index {index_name} ready")
+            except Exception as e:
+                print(f"  ✗ Error creating trigram indexes: {e}")
+                db.session.rollback()
+        
+        # Full-text search index for opportunities (tsvector + GIN on PostgreSQL, FTS5 on SQLite)
+        print("\nChecking opportunity full-text index...")
+        try:
+            from opportunity_search import OpportunitySearchService
+            with db.engine.begin() as connection:
+                installed = OpportunitySearchService.install(connection)
+            if installed:
+                print("  ✓ Opportunity search index ready")
+            else:
+                print(f"  ✗ No full-text index for {db.engine.dialect.name}; search uses LIKE")
+        except Exception as e:
+            print(f"  ✗ Error creating opportunity search index: {e}")
+        
+        # Normalized skills for opportunities that predate the skills tables
+        print("\nBackfilling opportunity skills...")
+        try:
+            from skills_matching import SkillsMatchingService
+            backfilled = SkillsMatchingService.backfill_opportunity_skills()
+            print(f"  ✓ Linked skills for {backfilled} opportunities")
+        except Exception as e:
+            print(f"  ✗ Error backfilling opportunity skills: {e}")
+            db.session.rollback()
+        
+        # Build the faculty analytics snapshot and placement cube from scratch
+        print("\nReconciling faculty analytics snapshot and placement cube...")
+        try:
+            from faculty_analytics import FacultyAnalyticsService
+            db.create_all()
+            reconciled_at = FacultyAnalyticsService.reconcile()
+            print(f"  ✓ Snapshot reconciled at {reconciled_at.isoformat()}")
+        except Exception as e:
+            print(f"  ✗ Error reconciling analytics snapshot: {e}")
+            db.session.rollback()
+        
+        # Fold sharded application counts into Opportunity.applications_count
+        print("\nFolding application counter shards...")
+        try:
+            from application_counter import ApplicationCounter
+            db.create_all()
+            folded = ApplicationCounter.fold()
+            print(f"  ✓ Folded {folded} applications")
+        except Exception as e:
+            print(f"  ✗ Error folding application counters: {e}")
+        
+        # Weekly / monthly view and application rollups for company analytics
+        print("\nCompacting opportunity view rollups...")
+        try:
+            from view_analytics import ViewAnalyticsService
+            db.create_all()
+            written = ViewAnalyticsService.compact(full=True)
+            print(f"  ✓ {written} rollup rows written")
+        except Exception as e:
+            print(f"  ✗ Error compacting view rollups: {e}")
+            db.session.rollback()
+        
         print("\n✓ Migration complete!")
 
 if __name__ == '__main__':
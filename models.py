@@ -2,7 +2,9 @@ from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
+from sqlalchemy.orm import validates
 import json
+import re
 
 # db will be initialized in app.py
 db = SQLAlchemy()
@@ -26,6 +28,12 @@ class User(db.Model):
     sent_messages = db.relationship('Message', foreign_keys='Message.sender_id', backref='sender', lazy='dynamic')
     received_messages = db.relationship('Message', foreign_keys='Message.receiver_id', backref='receiver', lazy='dynamic')
     
+    # Admin directory: role/approval filters and (created_at, id) keyset pagination
+    __table_args__ = (
+        db.Index('ix_users_role_approved', 'role', 'is_approved'),
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
     
@@ -85,6 +93,13 @@ class StudentProfile(db.Model):
     offers = db.relationship('StudentOffer', backref='student', lazy='dynamic', cascade='all, delete-orphan')
     skills_rel = db.relationship('StudentSkill', backref='student', lazy='dynamic', cascade='all, delete-orphan')
     
+    # Functional indexes backing case-insensitive faculty branch filters
+    __table_args__ = (
+        db.Index('ix_student_profiles_lower_course', db.func.lower(course)),
+        db.Index('ix_student_profiles_lower_specialization', db.func.lower(specialization)),
+        db.Index('ix_student_profiles_lower_branch', db.func.lower(db.func.coalesce(db.func.nullif(course, ''), specialization))),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -178,7 +193,7 @@ class StudentInternship(db.Model):
     __tablename__ = 'student_internships'
 
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id'), nullable=False, index=True)
     designation = db.Column(db.String(255), nullable=False)
     organization = db.Column(db.String(255), nullable=False)
     industry_sector = db.Column(db.String(150))
@@ -195,6 +210,14 @@ class StudentInternship(db.Model):
     mentor_designation = db.Column(db.String(150))
     description = db.Column(db.Text)
     technologies = db.Column(db.Text)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), index=True)  # Canonical organization (company_resolver.py)
+
+    # Functional indexes backing case-insensitive faculty internship filters
+    __table_args__ = (
+        db.Index('ix_student_internships_lower_industry_sector', db.func.lower(industry_sector)),
+        db.Index('ix_student_internships_lower_organization', db.func.lower(organization)),
+        db.Index('ix_student_internships_lower_internship_type', db.func.lower(internship_type)),
+    )
 
     def to_dict(self):
         return {
@@ -202,6 +225,7 @@ class StudentInternship(db.Model):
             'student_id': self.student_id,
             'designation': self.designation,
             'organization': self.organization,
+            'company_id': self.company_id,
             'industry_sector': self.industry_sector,
             'stipend': self.stipend,
             'internship_type': self.internship_type,
@@ -366,21 +390,56 @@ class StudentOffer(db.Model):
     __tablename__ = 'student_offers'
 
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student_profiles.id'), nullable=False, index=True)
     company_name = db.Column(db.String(255), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), index=True)  # Canonical company (company_resolver.py)
     role = db.Column(db.String(255))
     ctc = db.Column(db.String(100))
+    ctc_lpa = db.Column(db.Float, index=True)  # Parsed from ctc on write, used for SQL range filters
     status = db.Column(db.String(50), default='pending')  # pending, accepted, declined
     offer_date = db.Column(db.Date)
     joining_date = db.Column(db.Date)
     location = db.Column(db.String(255))
     notes = db.Column(db.Text)
 
+    __table_args__ = (
+        db.Index('ix_student_offers_lower_company_name', db.func.lower(company_name)),
+    )
+
+    @validates('ctc')
+    def _sync_ctc_lpa(self, key, value):
+        self.ctc_lpa = self.parse_ctc_to_lpa(value)
+        return value
+
+    @staticmethod
+    def parse_ctc_to_lpa(ctc_value):
+        """
+        Best-effort parsing of CTC strings to numeric LPA for analytics.
+        Accepts formats like '6', '6 LPA', '6.5 LPA', '600000', etc.
+        Returns a float in LPA or None if parsing fails.
+        """
+        if not ctc_value:
+            return None
+
+        try:
+            text = str(ctc_value).lower().replace("lpa", "").strip()
+            # If looks like a big number (e.g. 600000), convert to LPA assuming per annum INR
+            if text.isdigit() and len(text) >= 6:
+                return float(text) / 100000.0
+            # Extract first float-like segment
+            match = re.search(r"\d+(?:\.\d+)?", text)
+            if not match:
+                return None
+            return float(match.group(0))
+        except Exception:
+            return None
+
     def to_dict(self):
         return {
             'id': self.id,
             'student_id': self.student_id,
             'company_name': self.company_name,
+            'company_id': self.company_id,
             'role': self.role,
             'ctc': self.ctc,
             'status': self.status,
@@ -390,6 +449,24 @@ class StudentOffer(db.Model):
             'notes': self.notes
         }
 
+class CanonicalCompany(db.Model):
+    """Canonical company entity that free-text offer/internship company names resolve to"""
+    __tablename__ = 'companies'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255), nullable=False)  # Display name (first spelling seen)
+    normalized_name = db.Column(db.String(255), unique=True, nullable=False, index=True)  # Lowercase tokens without legal suffixes
+    first_token = db.Column(db.String(100), index=True)  # Candidate bucket for fuzzy matching
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'normalized_name': self.normalized_name,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class CompanyProfile(db.Model):
     __tablename__ = 'company_profiles'
     
@@ -431,7 +508,7 @@ class Opportunity(db.Model):
     __tablename__ = 'opportunities'
     
     id = db.Column(db.Integer, primary_key=True)
-    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), nullable=False)
+    company_id = db.Column(db.Integer, db.ForeignKey('company_profiles.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     domain = db.Column(db.String(100), nullable=False)
@@ -453,6 +530,10 @@ class Opportunity(db.Model):
     applications = db.relationship('Application', backref='opportunity', lazy='dynamic', cascade='all, delete-orphan')
     skills_rel = db.relationship('OpportunitySkill', backref='opportunity', lazy='dynamic', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_opportunities_listing', 'is_active', 'is_approved', 'created_at', 'id'),  # Public listing keyset
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -491,7 +572,11 @@ class Application(db.Model):
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('student_id', 'opportunity_id', name='unique_application'),)
+    __table_args__ = (
+        db.UniqueConstraint('student_id', 'opportunity_id', name='unique_application'),
+        db.Index('ix_applications_opportunity_status', 'opportunity_id', 'status'),  # Per-posting status counts
+        db.Index('ix_applications_opportunity_applied', 'opportunity_id', 'applied_at'),  # Applicant list keyset
+    )
     
     def to_dict(self):
         return {
@@ -522,6 +607,12 @@ class Message(db.Model):
     related_application_id = db.Column(db.Integer, db.ForeignKey('applications.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        # One per direction: each serves a participant's side of the inbox and a conversation's history
+        db.Index('ix_messages_sender_receiver_created', 'sender_id', 'receiver_id', 'created_at', 'id'),
+        db.Index('ix_messages_receiver_sender_created', 'receiver_id', 'sender_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -730,3 +821,131 @@ class ExternalJobSkill(db.Model):
             'skill_name': self.skill.name if self.skill else None,
             'confidence': self.confidence
         }
+
+
+# ==================== ANALYTICS ====================
+
+class AnalyticsCounter(db.Model):
+    """Materialized faculty analytics counters, maintained incrementally (see faculty_analytics.py)"""
+    __tablename__ = 'analytics_counters'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)  # 'students', 'branch_total', 'company_placed', 'ctc', ...
+    dimension = db.Column(db.String(255), nullable=False, default='')  # Branch/company/year/bucket the value belongs to
+    value = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('metric', 'dimension', name='unique_analytics_counter'),
+        db.Index('ix_analytics_counters_metric_value', 'metric', 'value'),  # Top-N reads (e.g. companies)
+    )
+    
+    def to_dict(self):
+        return {
+            'metric': self.metric,
+            'dimension': self.dimension,
+            'value': self.value,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class PlacementCubeCell(db.Model):
+    """Pre-aggregated accepted offers per branch x company x batch year x gender x CTC bucket (see faculty_analytics.py)"""
+    __tablename__ = 'placement_cube'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    branch = db.Column(db.String(150), nullable=False, default='Unknown')
+    company_id = db.Column(db.Integer, nullable=False, default=0)  # companies.id, 0 when the name is unresolved
+    batch_year = db.Column(db.Integer, nullable=False, default=0)  # 0 when the offer has no dates
+    gender = db.Column(db.String(20), nullable=False, default='')
+    ctc_bucket = db.Column(db.String(10), nullable=False, default='')  # package bucket label, '' when CTC is unparseable
+    offers_count = db.Column(db.Integer, nullable=False, default=0)
+    ctc_count = db.Column(db.Integer, nullable=False, default=0)
+    ctc_sum = db.Column(db.Float, nullable=False, default=0.0)
+    ctc_min = db.Column(db.Float)
+    ctc_max = db.Column(db.Float)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('branch', 'company_id', 'batch_year', 'gender', 'ctc_bucket', name='unique_placement_cube_cell'),
+    )
+    
+    def to_dict(self):
+        return {
+            'branch': self.branch,
+            'company_id': self.company_id or None,
+            'batch_year': self.batch_year or None,
+            'gender': self.gender or None,
+            'ctc_bucket': self.ctc_bucket or None,
+            'offers_count': self.offers_count,
+            'ctc_count': self.ctc_count,
+            'ctc_sum': self.ctc_sum,
+            'ctc_min': self.ctc_min,
+            'ctc_max': self.ctc_max,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class OpportunityViewDaily(db.Model):
+    """Detail page views per opportunity per UTC day, written in batches by view_counter.py"""
+    __tablename__ = 'opportunity_views_daily'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    opportunity_id = db.Column(db.Integer, db.ForeignKey('opportunities.id', ondelete='CASCADE'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('opportunity_id', 'day', name='unique_opportunity_view_day'),
+    )
+    
+    def to_dict(self):
+        return {
+            'opportunity_id': self.opportunity_id,
+            'day': self.day.isoformat() if self.day else None,
+            'views': self.views
+        }
+
+
+class OpportunityViewRollup(db.Model):
+    """Weekly / monthly views and applications per opportunity, compacted from the daily table (see view_analytics.py)"""
+    __tablename__ = 'opportunity_view_rollups'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    opportunity_id = db.Column(db.Integer, db.ForeignKey('opportunities.id', ondelete='CASCADE'), nullable=False)
+    company_id = db.Column(db.Integer, nullable=False)  # Denormalized so company series are one index range
+    period = db.Column(db.String(10), nullable=False)  # week (starting Monday), month
+    period_start = db.Column(db.Date, nullable=False)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('opportunity_id', 'period', 'period_start', name='unique_opportunity_view_rollup'),
+        db.Index('ix_opportunity_view_rollups_company_period', 'company_id', 'period', 'period_start'),
+    )
+    
+    def to_dict(self):
+        return {
+            'opportunity_id': self.opportunity_id,
+            'company_id': self.company_id,
+            'period': self.period,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'views': self.views,
+            'applications': self.applications,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class OpportunityCounterShard(db.Model):
+    """Unfolded application count deltas, spread over a few rows per opportunity (see application_counter.py)"""
+    __tablename__ = 'opportunity_counter_shards'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    opportunity_id = db.Column(db.Integer, db.ForeignKey('opportunities.id', ondelete='CASCADE'), nullable=False)
+    shard = db.Column(db.Integer, nullable=False)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('opportunity_id', 'shard', name='unique_opportunity_counter_shard'),
+    )
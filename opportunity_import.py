@@ -0,0 +1,278 @@
+"""
+Opportunity Import - bulk creation of opportunities from CSV / JSON / JSON Lines
+
+Records are validated and written in one streaming pass: valid rows collect in
+a chunk of fixed size, and each full chunk resolves its new skill names in one
+batch and writes its opportunities and OpportunitySkill rows with multi-row
+INSERTs in its own transaction before the next rows are read. Memory stays
+bounded by the chunk size, and a failing chunk only loses its own rows. The
+report lists per-row and per-chunk errors and the achieved rows/second.
+"""
+import csv
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from models import db, Opportunity, OpportunitySkill
+from skills_matching import SkillsMatchingService
+
+
+REQUIRED_FIELDS = ('title', 'description', 'domain')
+WORK_TYPES = ('remote', 'onsite', 'hybrid')
+MAX_LENGTHS = {'title': 200, 'domain': 100, 'duration': 50, 'stipend': 100, 'location': 200}
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+FORMATS = ('csv', 'json', 'jsonl')
+
+
+class OpportunityImportService:
+    """Validates and bulk-inserts opportunity records for one company"""
+
+    @staticmethod
+    def detect_format(filename: str = None, content_type: str = None) -> Optional[str]:
+        """Import format from a file name or content type, or None when unsupported"""
+        name = (filename or '').lower()
+        if name.endswith('.csv'):
+            return 'csv'
+        if name.endswith(('.jsonl', '.ndjson')):
+            return 'jsonl'
+        if name.endswith('.json'):
+            return 'json'
+        content_type = (content_type or '').lower()
+        if 'csv' in content_type:
+            return 'csv'
+        if 'ndjson' in content_type or 'jsonl' in content_type:
+            return 'jsonl'
+        if 'json' in content_type:
+            return 'json'
+        return None
+
+    @staticmethod
+    def _text_lines(stream) -> Iterator[str]:
+        """Decode a binary or text stream line by line"""
+        for index, line in enumerate(stream):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8-sig' if index == 0 else 'utf-8')
+            yield line
+
+    @staticmethod
+    def iter_records(stream, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+        """
+        Yield (row number, record, parse error) from a binary or text stream.
+        CSV and JSON Lines are read incrementally; a JSON document must be an
+        array of objects (or {"opportunities": [...]}) and is parsed whole.
+        """
+        if fmt == 'csv':
+            lines = OpportunityImportService._text_lines(stream)
+            for row_number, record in enumerate(csv.DictReader(lines), start=2):  # Line 1 is the header
+                yield row_number, record, None
+        elif fmt == 'jsonl':
+            for row_number, line in enumerate(OpportunityImportService._text_lines(stream), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield row_number, None, f'Invalid JSON: {e}'
+                    continue
+                yield row_number, record, None
+        elif fmt == 'json':
+            content = stream.read()
+            if isinstance(content, bytes):
+                content = content.decode('utf-8-sig')
+            document = json.loads(content)
+            if isinstance(document, dict):
+                document = document.get('opportunities')
+            if not isinstance(document, list):
+                raise ValueError('JSON import must be an array of opportunities')
+            for row_number, record in enumerate(document, start=1):
+                yield row_number, record, None
+        else:
+            raise ValueError(f"Unsupported import format, expected one of: {', '.join(FORMATS)}")
+
+    @staticmethod
+    def _parse_date(value, field, errors):
+        if value in (None, ''):
+            return None
+        try:
+            return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+        except ValueError:
+            errors.append(f'{field} must be YYYY-MM-DD')
+            return None
+
+    @staticmethod
+    def _parse_skills(value) -> List[str]:
+        if value in (None, ''):
+            return []
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith('['):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            if isinstance(value, str):
+                value = re.split(r'[,;|]', value)
+        return [str(skill).strip() for skill in value if skill and str(skill).strip()]
+
+    @staticmethod
+    def _parse_bool(value) -> bool:
+        if isinstance(value, bool):
+            return value
+        return str(value or '').strip().lower() in ('1', 'true', 'yes', 'y')
+
+    @staticmethod
+    def validate(record) -> Tuple[dict, List[str]]:
+        """Opportunity column values for one record, plus its validation errors"""
+        if not isinstance(record, dict):
+            return {}, ['Record must be an object']
+        errors = []
+        values = {}
+
+        def text(field):
+            value = record.get(field)
+            return str(value).strip() if value is not None else ''
+
+        for field in REQUIRED_FIELDS:
+            if not text(field):
+                errors.append(f'{field} is required')
+        for field, max_length in MAX_LENGTHS.items():
+            if len(text(field)) > max_length:
+                errors.append(f'{field} must be at most {max_length} characters')
+
+        work_type = text('work_type').lower() or 'remote'
+        if work_type not in WORK_TYPES:
+            errors.append(f"work_type must be one of: {', '.join(WORK_TYPES)}")
+
+        try:
+            skills = OpportunityImportService._parse_skills(record.get('required_skills'))
+        except TypeError:
+            skills = []
+            errors.append('required_skills must be a list or a comma-separated string')
+
+        is_active = OpportunityImportService._parse_bool(record.get('is_active', False))
+        values.update({
+            'title': text('title'),
+            'description': text('description'),
+            'domain': text('domain'),
+            'required_skills': skills,
+            'duration': text('duration'),
+            'stipend': text('stipend'),
+            'location': text('location'),
+            'work_type': work_type,
+            'prerequisites': text('prerequisites'),
+            'application_deadline': OpportunityImportService._parse_date(
+                record.get('application_deadline'), 'application_deadline', errors),
+            'start_date': OpportunityImportService._parse_date(record.get('start_date'), 'start_date', errors),
+            'is_active': is_active,
+            'is_approved': is_active,  # Auto-approve when published, as in create_opportunity
+        })
+        return values, errors
+
+    @staticmethod
+    def _insert_chunk(company_id: int, chunk: List[dict], skill_ids: Dict[str, int]) -> List[int]:
+        now = datetime.utcnow()
+        rows = [
+            dict(values, company_id=company_id, required_skills=json.dumps(values['required_skills']),
+                 views_count=0, applications_count=0, created_at=now, updated_at=now)
+            for values in chunk
+        ]
+        opportunity_ids = db.session.execute(
+            insert(Opportunity).returning(Opportunity.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+        skill_rows = []
+        for opportunity_id, values in zip(opportunity_ids, chunk):
+            seen = set()
+            for name in values['required_skills']:
+                skill_id = skill_ids.get(name)
+                if skill_id and skill_id not in seen:
+                    seen.add(skill_id)
+                    skill_rows.append({'opportunity_id': opportunity_id, 'skill_id': skill_id,
+                                       'is_required': True, 'priority': 1, 'created_at': now})
+        if skill_rows:
+            db.session.execute(insert(OpportunitySkill), skill_rows)
+        return opportunity_ids
+
+    @staticmethod
+    def import_records(company_id: int, records: Iterable[Tuple[int, Optional[dict], Optional[str]]],
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False) -> dict:
+        """
+        Validate and insert (row number, record, parse error) tuples for a company.
+        Returns a report with counts, throughput, created ids and per-row errors.
+        """
+        started = time.perf_counter()
+        chunk_size = max(1, chunk_size)
+        total_rows = 0
+        valid_rows = 0
+        failed = 0
+        errors = []
+        chunk_errors = []
+        opportunity_ids = []
+        skill_ids = {}  # Skill name -> id, resolved once per name for the whole import
+        chunk = []  # (row number, values) not yet written
+
+        def fail(row_number, messages):
+            nonlocal failed
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': row_number, 'errors': messages})
+
+        def write_chunk():
+            """Insert the pending chunk in its own transaction; a failure is reported for its rows only"""
+            names = {name for _, values in chunk for name in values['required_skills']} - set(skill_ids)
+            try:
+                if names:
+                    skill_ids.update(SkillsMatchingService.resolve_skills(names))
+                opportunity_ids.extend(
+                    OpportunityImportService._insert_chunk(company_id, [values for _, values in chunk], skill_ids)
+                )
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                for name in names:
+                    skill_ids.pop(name, None)  # Skills created in the rolled-back transaction are gone
+                chunk_errors.append({'first_row': chunk[0][0], 'last_row': chunk[-1][0], 'rows': len(chunk),
+                                     'error': str(e)})
+                for row_number, _ in chunk:
+                    fail(row_number, [f'Database error: {e}'])
+            chunk.clear()
+
+        for row_number, record, parse_error in records:
+            total_rows += 1
+            if parse_error:
+                fail(row_number, [parse_error])
+                continue
+            values, row_errors = OpportunityImportService.validate(record)
+            if row_errors:
+                fail(row_number, row_errors)
+                continue
+            valid_rows += 1
+            if dry_run:
+                continue
+            chunk.append((row_number, values))
+            if len(chunk) >= chunk_size:
+                write_chunk()
+        if chunk:
+            write_chunk()
+
+        elapsed = time.perf_counter() - started
+        errors.sort(key=lambda error: error['row'])
+        return {
+            'dry_run': dry_run,
+            'total_rows': total_rows,
+            'valid_rows': valid_rows,
+            'imported': len(opportunity_ids),
+            'failed': failed,
+            'skills_resolved': len(skill_ids),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(total_rows / elapsed, 1) if elapsed > 0 else None,
+            'opportunity_ids': opportunity_ids,
+            'errors': errors,
+            'errors_truncated': failed > len(errors),
+            'chunk_errors': chunk_errors,
+        }
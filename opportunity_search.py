@@ -0,0 +1,157 @@
+"""
+Opportunity Search - full-text index over opportunity title, domain and description
+
+PostgreSQL keeps a weighted ``search_vector`` tsvector as a stored generated column
+with a GIN index. SQLite keeps an external-content FTS5 table synced by triggers.
+Both are maintained by the database on every write (ORM or bulk Core inserts), are
+created with the opportunities table and can be installed on an existing database
+with ``install()``. Other dialects, or a database without the index, fall back to
+LIKE matching.
+"""
+import re
+from typing import List, Optional
+
+from sqlalchemy import and_, event, func, literal_column, select, text, or_, table, column
+
+from models import db, Opportunity
+
+
+MAX_TERMS = 8
+TS_CONFIG = 'english'
+FTS_TABLE = 'opportunities_fts'
+FTS_WEIGHTS = (10.0, 5.0, 1.0)  # title, domain, description
+
+POSTGRES_DDL = [
+    f"""
+    ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(domain, '')), 'B') ||
+        setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_opportunities_search_vector ON opportunities USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, domain, description,
+        content='opportunities', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, domain, description)
+        VALUES (new.id, new.title, new.domain, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, domain, description)
+        VALUES ('delete', old.id, old.title, old.domain, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, domain, description ON opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, domain, description)
+        VALUES ('delete', old.id, old.title, old.domain, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, domain, description)
+        VALUES (new.id, new.title, new.domain, new.description);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_fts = table(FTS_TABLE, column('rowid'), column(FTS_TABLE))
+_search_vector = literal_column('opportunities.search_vector')
+
+# Engine URL -> whether the full-text index exists there
+_index_ready = {}
+
+
+class OpportunitySearchService:
+    """Builds full-text search clauses for opportunity listings"""
+
+    @staticmethod
+    def parse_terms(search: str) -> List[str]:
+        """Lower-cased word terms from free text (punctuation and operators are dropped)"""
+        return re.findall(r'\w+', (search or '').lower())[:MAX_TERMS]
+
+    @staticmethod
+    def install(connection) -> bool:
+        """Create the full-text column/table, index and triggers if missing; True when available"""
+        dialect = connection.dialect.name
+        statements = POSTGRES_DDL if dialect == 'postgresql' else SQLITE_DDL if dialect == 'sqlite' else []
+        for statement in statements:
+            connection.execute(text(statement))
+        _index_ready[str(connection.engine.url)] = bool(statements)
+        return bool(statements)
+
+    @staticmethod
+    def index_ready() -> bool:
+        """True when the current database has the full-text index installed"""
+        key = str(db.engine.url)
+        if key not in _index_ready:
+            dialect = db.engine.dialect.name
+            if dialect == 'postgresql':
+                probe = text(
+                    "SELECT 1 FROM information_schema.columns "
+                    "WHERE table_name = 'opportunities' AND column_name = 'search_vector'"
+                )
+            elif dialect == 'sqlite':
+                probe = text(f"SELECT 1 FROM sqlite_master WHERE name = '{FTS_TABLE}'")
+            else:
+                probe = None
+            _index_ready[key] = bool(probe is not None and db.session.execute(probe).first())
+        return _index_ready[key]
+
+    @staticmethod
+    def matches(search: str, ranked: bool = False):
+        """
+        Subquery of (id, rank) for opportunities matching every term of ``search``,
+        each term matched as a prefix. Higher rank is more relevant. Returns None
+        when the search has no terms or the full-text index is unavailable.
+        """
+        terms = OpportunitySearchService.parse_terms(search)
+        if not terms or not OpportunitySearchService.index_ready():
+            return None
+
+        if db.engine.dialect.name == 'postgresql':
+            query = func.to_tsquery(TS_CONFIG, ' & '.join(f'{term}:*' for term in terms))
+            rank = func.ts_rank_cd(_search_vector, query) if ranked else literal_column('0')
+            stmt = select(Opportunity.id.label('id'), rank.label('rank')).where(_search_vector.op('@@')(query))
+        else:
+            query = ' AND '.join(f'"{term}"*' for term in terms)
+            rank = -func.bm25(literal_column(FTS_TABLE), *FTS_WEIGHTS) if ranked else literal_column('0')
+            stmt = select(_fts.c.rowid.label('id'), rank.label('rank')).where(_fts.c[FTS_TABLE].match(query))
+        return stmt.subquery('search_matches')
+
+    @staticmethod
+    def like_condition(search: str) -> Optional[object]:
+        """Substring fallback: every term must appear in the title or description"""
+        terms = OpportunitySearchService.parse_terms(search)
+        if not terms:
+            return None
+        return and_(*[
+            or_(Opportunity.title.ilike(f'%{term}%'), Opportunity.description.ilike(f'%{term}%'))
+            for term in terms
+        ])
+
+
+@event.listens_for(Opportunity.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    # A database without FTS5 / generated columns still gets its tables; search falls back to LIKE
+    try:
+        with connection.begin_nested():
+            OpportunitySearchService.install(connection)
+    except Exception:
+        _index_ready[str(connection.engine.url)] = False
+
+
+@event.listens_for(Opportunity.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    _index_ready.pop(str(connection.engine.url), None)
@@ -0,0 +1,112 @@
+"""
+Query Cache - in-process result cache with TTL expiry and table-version invalidation
+
+Every committed ORM write bumps a version counter for the tables it touched.
+Cached entries are keyed on the versions of the tables they were computed from,
+so a write to any of those tables makes the old entry unreachable immediately in
+this process; the TTL bounds staleness for writes made by other processes.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+_versions = {}
+_versions_lock = threading.Lock()
+_WRITTEN_TABLES_KEY = 'query_cache_written_tables'
+
+
+def table_versions(tables):
+    """Current version tuple for the given table names"""
+    with _versions_lock:
+        return tuple(_versions.get(table, 0) for table in tables)
+
+
+def bump_tables(tables):
+    """Mark tables as changed, invalidating every cache entry that depends on them"""
+    with _versions_lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def _written_tables(session):
+    return session.info.setdefault(_WRITTEN_TABLES_KEY, set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_tables(session, flush_context):
+    written = _written_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is not None:
+            written.add(table.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_statements(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None:
+            _written_tables(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed_tables(session):
+    written = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if written:
+        bump_tables(written)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written_tables(session):
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
+
+
+class QueryCache:
+    """Small thread-safe TTL cache for query results"""
+
+    def __init__(self, default_ttl=60, max_entries=1024):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key, producer, ttl=None, tables=()):
+        """
+        Return the cached value for ``key`` or compute it with ``producer()``.
+        ``tables`` lists the table names the value depends on.
+        """
+        full_key = (key, table_versions(tables))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        value = producer()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._evict(now)
+            self._entries[full_key] = (expires_at, value)
+        return value
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only the entries whose key matches ``predicate(key)``"""
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for full_key in [k for k in self._entries if predicate(k[0])]:
+                del self._entries[full_key]
+
+    def _evict(self, now):
+        expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for full_key in expired:
+            del self._entries[full_key]
+        if len(self._entries) >= self.max_entries:
+            # Still full: drop the entries closest to expiry
+            for full_key, _ in sorted(self._entries.items(), key=lambda item: item[1][0])[: self.max_entries // 4 or 1]:
+                del self._entries[full_key]
@@ -0,0 +1,69 @@
+"""
+Response Cache - HTTP validators and an in-process body cache for read endpoints
+
+``cached_response`` wraps a GET view. A validator callable returns the
+Last-Modified time and a version token for the data behind the endpoint; the
+ETag is derived from the path, normalized query string, variant (anonymous or a
+user id) and that token. Matching If-None-Match / If-Modified-Since requests get
+a 304 without running the view, and successful bodies are cached per ETag, so
+any change to the version token invalidates both.
+"""
+import hashlib
+from functools import wraps
+
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+from query_cache import QueryCache
+
+
+ANONYMOUS = 'anon'
+
+_bodies = QueryCache(default_ttl=300, max_entries=2048)
+
+
+def _normalized_query():
+    return '&'.join(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+
+
+def cached_response(validator, variant=None, tables=()):
+    """
+    Decorator for GET views.
+    ``validator(variant) -> (last_modified datetime or None, token str)``;
+    ``variant() -> ANONYMOUS or a per-user key`` (all requests are anonymous when omitted).
+    ``tables`` also drop this process's cached bodies when they change (see query_cache).
+    Anonymous responses are public, per-user ones private; both must revalidate.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            current_variant = variant() if variant else ANONYMOUS
+            last_modified, token = validator(current_variant)
+            key = f'{request.path}?{_normalized_query()}|{current_variant}'
+            etag = hashlib.sha1(f'{key}|{token}'.encode()).hexdigest()
+
+            def finish(response):
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                response.headers['Cache-Control'] = (
+                    'public, no-cache' if current_variant == ANONYMOUS else 'private, no-cache'
+                )
+                response.vary.add('Authorization')
+                return response
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                return finish(make_response('', 304))
+
+            def produce():
+                response = make_response(view(*args, **kwargs))
+                return response.status_code, response.get_data(), response.mimetype
+
+            status, body, mimetype = _bodies.get_or_set(etag, produce, tables=tables)
+            if status != 200:
+                # Errors are not cached
+                _bodies.invalidate(lambda cached_key: cached_key == etag)
+                return make_response(body, status, {'Content-Type': mimetype})
+            return finish(make_response(body, status, {'Content-Type': mimetype}))
+        return wrapper
+    return decorator
@@ -1,44 +1,225 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db, User, StudentProfile, CompanyProfile, Opportunity, Application, Blacklist
+from models import Skill, OpportunitySkill
 from datetime import datetime
-from sqlalchemy import func
-from routes.helpers import get_user_id
+from sqlalchemy import func, select, update, case, true, or_, tuple_
+from sqlalchemy.orm import contains_eager
+from routes.helpers import get_user_id, insert_notifications
+from query_cache import QueryCache
+from db_utils import dialect_insert, supports_on_conflict
+from application_counter import ApplicationCounter
 
 admin_bp = Blueprint('admin', __name__)
 
+# Admin analytics payload; table versions drop it on any committed write to these tables
+ANALYTICS_TABLES = (
+    User.__tablename__, Opportunity.__tablename__, Application.__tablename__,
+    OpportunitySkill.__tablename__, Skill.__tablename__,
+)
+_analytics_cache = QueryCache(default_ttl=30, max_entries=4)
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BULK_IDS = 10000
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
 def is_admin():
     user_id = get_user_id()
     user = User.query.get(user_id)
     return user and user.role == 'admin'
 
+def _as_bool(value):
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).lower() == 'true'
+
+def _created_before(params, column, conditions):
+    value = params.get('created_before')
+    if value:
+        try:
+            conditions.append(column < datetime.fromisoformat(str(value)))
+        except ValueError:
+            raise ValueError('created_before must be an ISO date')
+
+def _user_directory_conditions(params):
+    """
+    SQL predicates for user filters (role, approved, active, q, created_before).
+    ``params`` is request.args or a JSON filter object. Queries using the name
+    search must outer-join StudentProfile and CompanyProfile.
+    """
+    conditions = []
+    role_filter = params.get('role', None)
+    if role_filter:
+        conditions.append(User.role == role_filter)
+    for name, column in (('approved', User.is_approved), ('active', User.is_active)):
+        value = _as_bool(params.get(name, None))
+        if value is not None:
+            conditions.append(column.is_(value))
+    _created_before(params, User.created_at, conditions)
+    
+    # Every search term must match the email or a name (trigram-indexed on PostgreSQL)
+    for term in (params.get('q') or '').lower().split():
+        pattern = f"%{term.replace('%', '').replace('_', '')}%"
+        conditions.append(or_(
+            func.lower(User.email).like(pattern),
+            func.lower(StudentProfile.first_name).like(pattern),
+            func.lower(StudentProfile.last_name).like(pattern),
+            func.lower(CompanyProfile.name).like(pattern),
+        ))
+    return conditions
+
 @admin_bp.route('/users', methods=['GET'])
 @jwt_required()
 def get_users():
+    """
+    Admin user directory, newest first.
+    
+    Query params: role, approved, active, q (search on email and name),
+    view=summary for a table projection without profiles, and limit= / after=
+    (the last user id of the previous page) for keyset pagination. Without
+    limit/after the full list is returned as a plain array.
+    """
     if not is_admin():
         return jsonify({'error': 'Unauthorized'}), 403
     
-    role_filter = request.args.get('role', None)
-    approval_filter = request.args.get('approved', None)
-    
-    query = User.query
-    if role_filter:
-        query = query.filter_by(role=role_filter)
-    if approval_filter is not None:
-        query = query.filter_by(is_approved=approval_filter == 'true')
-    
-    users = query.order_by(User.created_at.desc()).all()
+    summary = request.args.get('view') == 'summary'
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+    paginated = after is not None or limit is not None
+    try:
+        conditions = _user_directory_conditions(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if after is not None:
+        anchor = db.session.execute(select(User.created_at).where(User.id == after)).first()
+        if not anchor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        conditions.append(tuple_(User.created_at, User.id) < tuple_(anchor[0], after))
+    
+    if summary:
+        query = select(
+            User.id, User.email, User.role, User.is_approved, User.is_active, User.created_at,
+            User.last_login, StudentProfile.first_name, StudentProfile.last_name,
+            CompanyProfile.name.label('company_name'),
+        )
+    else:
+        query = select(User).options(contains_eager(User.student_profile), contains_eager(User.company_profile))
+    query = (
+        query.select_from(User)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(CompanyProfile, CompanyProfile.user_id == User.id)
+        .where(*conditions)
+        .order_by(User.created_at.desc(), User.id.desc())
+    )
+    if paginated:
+        limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+        query = query.limit(limit)
     
     result = []
-    for user in users:
-        user_dict = user.to_dict()
-        if user.role == 'student' and user.student_profile:
-            user_dict['profile'] = user.student_profile.to_dict()
-        elif user.role in ['company', 'faculty'] and user.company_profile:
-            user_dict['profile'] = user.company_profile.to_dict()
-        result.append(user_dict)
-    
-    return jsonify(result), 200
+    if summary:
+        for row in db.session.execute(query):
+            if row.first_name or row.last_name:
+                name = f"{row.first_name or ''} {row.last_name or ''}".strip()
+            else:
+                name = row.company_name
+            result.append({
+                'id': row.id,
+                'email': row.email,
+                'role': row.role,
+                'name': name,
+                'is_approved': row.is_approved,
+                'is_active': row.is_active,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'last_login': row.last_login.isoformat() if row.last_login else None
+            })
+    else:
+        for user in db.session.execute(query).unique().scalars():
+            user_dict = user.to_dict()
+            if user.role == 'student' and user.student_profile:
+                user_dict['profile'] = user.student_profile.to_dict()
+            elif user.role in ['company', 'faculty'] and user.company_profile:
+                user_dict['profile'] = user.company_profile.to_dict()
+            result.append(user_dict)
+    
+    if not paginated:
+        return jsonify(result), 200
+    
+    total = db.session.execute(
+        select(func.count(User.id))
+        .select_from(User)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(CompanyProfile, CompanyProfile.user_id == User.id)
+        .where(*_user_directory_conditions(request.args))
+    ).scalar()
+    return jsonify({
+        'rows': result,
+        'total': total,
+        'limit': limit,
+        'next_cursor': result[-1]['id'] if len(result) == limit else None
+    }), 200
+
+def _bulk_selection(data, id_column, filter_query):
+    """
+    WHERE clause for a bulk action: an explicit "ids" list, or a non-empty "filter"
+    object turned into an id subquery by ``filter_query(filter) -> select or None``.
+    Raises ValueError when neither is usable.
+    """
+    ids = data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError('ids must be a non-empty list of integers')
+        if len(ids) > MAX_BULK_IDS:
+            raise ValueError(f'At most {MAX_BULK_IDS} ids per request')
+        return id_column.in_(ids)
+    
+    filters = data.get('filter')
+    query = filter_query(filters) if isinstance(filters, dict) and filters else None
+    if query is None:
+        raise ValueError('Provide ids or a non-empty filter')
+    return id_column.in_(query.scalar_subquery())
+
+def _bulk_update(model, conditions, values):
+    """Apply one UPDATE to the matching rows and return the ids it changed"""
+    stmt = update(model).where(*conditions).values(**values).execution_options(synchronize_session=False)
+    if db.engine.dialect.update_returning:
+        return db.session.execute(stmt.returning(model.id)).scalars().all()
+    ids = db.session.execute(select(model.id).where(*conditions)).scalars().all()
+    if ids:
+        db.session.execute(
+            update(model).where(model.id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+        )
+    return ids
+
+def _user_filter_query(filters):
+    conditions = _user_directory_conditions(filters)
+    if not conditions:
+        return None
+    return (
+        select(User.id)
+        .select_from(User)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(CompanyProfile, CompanyProfile.user_id == User.id)
+        .where(*conditions)
+    )
+
+def _opportunity_filter_query(filters):
+    conditions = []
+    for name, column in (('approved', Opportunity.is_approved), ('active', Opportunity.is_active)):
+        value = _as_bool(filters.get(name))
+        if value is not None:
+            conditions.append(column.is_(value))
+    if filters.get('company_id') is not None:
+        conditions.append(Opportunity.company_id == int(filters['company_id']))
+    if filters.get('domain'):
+        conditions.append(Opportunity.domain == filters['domain'])
+    _created_before(filters, Opportunity.created_at, conditions)
+    return select(Opportunity.id).where(*conditions) if conditions else None
 
 @admin_bp.route('/users/<int:user_id>/approve', methods=['PUT'])
 @jwt_required()
@@ -70,6 +251,59 @@ def deactivate_user(user_id):
     
     return jsonify({'message': 'User deactivated successfully'}), 200
 
+@admin_bp.route('/users/bulk', methods=['PUT'])
+@jwt_required()
+def bulk_moderate_users():
+    """
+    Approve or deactivate many users in one transaction.
+    Body: {"action": "approve" | "deactivate", "ids": [...]} or
+    {"action": ..., "filter": {"role": "student", "approved": false, "q": "...", "created_before": "..."}}
+    """
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action not in ('approve', 'deactivate'):
+        return jsonify({'error': 'action must be "approve" or "deactivate"'}), 400
+    
+    try:
+        selection = _bulk_selection(data, User.id, _user_filter_query)
+        if action == 'approve':
+            ids = _bulk_update(User, [selection, User.is_approved.isnot(True)], {'is_approved': True})
+            now = datetime.utcnow()
+            notifications = insert_notifications([
+                {
+                    'user_id': user_id,
+                    'title': 'Account Approved',
+                    'message': 'Your account has been approved. Welcome aboard!',
+                    'notification_type': 'account',
+                    'is_read': False,
+                    'created_at': now,
+                }
+                for user_id in ids
+            ])
+        else:
+            # Never lock the acting admin out
+            ids = _bulk_update(User, [selection, User.is_active.isnot(False), User.id != get_user_id()],
+                               {'is_active': False})
+            notifications = []
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'message': f'{len(ids)} user(s) updated',
+        'action': action,
+        'updated': len(ids),
+        'ids': ids,
+        'notified': len(notifications)
+    }), 200
+
 @admin_bp.route('/opportunities', methods=['GET'])
 @jwt_required()
 def get_opportunities():
@@ -84,7 +318,7 @@ def get_opportunities():
     
     opportunities = query.order_by(Opportunity.created_at.desc()).all()
     
-    return jsonify([opp.to_dict() for opp in opportunities]), 200
+    return jsonify(ApplicationCounter.add_pending([opp.to_dict() for opp in opportunities])), 200
 
 @admin_bp.route('/opportunities/<int:opp_id>/approve', methods=['PUT'])
 @jwt_required()
@@ -99,7 +333,8 @@ def approve_opportunity(opp_id):
     opportunity.is_approved = True
     db.session.commit()
     
-    return jsonify({'message': 'Opportunity approved successfully', 'opportunity': opportunity.to_dict()}), 200
+    opp_dict = ApplicationCounter.add_pending([opportunity.to_dict()])[0]
+    return jsonify({'message': 'Opportunity approved successfully', 'opportunity': opp_dict}), 200
 
 @admin_bp.route('/opportunities/<int:opp_id>/reject', methods=['PUT'])
 @jwt_required()
@@ -117,6 +352,72 @@ def reject_opportunity(opp_id):
     
     return jsonify({'message': 'Opportunity rejected'}), 200
 
+@admin_bp.route('/opportunities/bulk', methods=['PUT'])
+@jwt_required()
+def bulk_moderate_opportunities():
+    """
+    Approve or reject many opportunities in one transaction, notifying each posting company.
+    Body: {"action": "approve" | "reject", "ids": [...]} or
+    {"action": ..., "filter": {"approved": false, "active": true, "company_id": 1, "domain": "...", "created_before": "..."}}
+    """
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    data = request.get_json() or {}
+    action = data.get('action')
+    if action not in ('approve', 'reject'):
+        return jsonify({'error': 'action must be "approve" or "reject"'}), 400
+    
+    try:
+        selection = _bulk_selection(data, Opportunity.id, _opportunity_filter_query)
+        now = datetime.utcnow()
+        if action == 'approve':
+            ids = _bulk_update(Opportunity, [selection, Opportunity.is_approved.isnot(True)],
+                               {'is_approved': True, 'updated_at': now})
+            title, verb = 'Opportunity Approved', 'approved'
+        else:
+            ids = _bulk_update(
+                Opportunity,
+                [selection, or_(Opportunity.is_approved.isnot(False), Opportunity.is_active.isnot(False))],
+                {'is_approved': False, 'is_active': False, 'updated_at': now},
+            )
+            title, verb = 'Opportunity Rejected', 'rejected'
+        
+        rows = []
+        for start in range(0, len(ids), MAX_PAGE_SIZE):
+            rows.extend(db.session.execute(
+                select(Opportunity.id, Opportunity.title, CompanyProfile.user_id)
+                .join(CompanyProfile, CompanyProfile.id == Opportunity.company_id)
+                .where(Opportunity.id.in_(ids[start:start + MAX_PAGE_SIZE]))
+            ).all())
+        notifications = insert_notifications([
+            {
+                'user_id': user_id,
+                'title': title,
+                'message': f'Your opportunity "{opportunity_title}" has been {verb}',
+                'notification_type': 'opportunity_status',
+                'related_id': opportunity_id,
+                'is_read': False,
+                'created_at': now,
+            }
+            for opportunity_id, opportunity_title, user_id in rows
+        ])
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'message': f'{len(ids)} opportunit{"y" if len(ids) == 1 else "ies"} updated',
+        'action': action,
+        'updated': len(ids),
+        'ids': ids,
+        'notified': len(notifications)
+    }), 200
+
 @admin_bp.route('/blacklist', methods=['POST'])
 @jwt_required()
 def add_to_blacklist():
@@ -146,38 +447,118 @@ def add_to_blacklist():
     
     return jsonify({'message': 'Email added to blacklist', 'entry': blacklist_entry.to_dict()}), 201
 
-@admin_bp.route('/blacklist', methods=['GET'])
+@admin_bp.route('/blacklist/bulk', methods=['POST'])
 @jwt_required()
-def get_blacklist():
+def bulk_add_to_blacklist():
+    """
+    Blacklist many emails in one transaction and deactivate their accounts.
+    Body: {"entries": [{"email": "...", "reason": "..."}]} or {"emails": [...], "reason": "..."}.
+    Returns a result per email: added, already_blacklisted or invalid.
+    """
     if not is_admin():
         return jsonify({'error': 'Unauthorized'}), 403
     
-    entries = Blacklist.query.order_by(Blacklist.created_at.desc()).all()
-    return jsonify([entry.to_dict() for entry in entries]), 200
+    data = request.get_json() or {}
+    if 'entries' in data:
+        entries = data['entries']
+    else:
+        entries = [{'email': email, 'reason': data.get('reason', '')} for email in data.get('emails') or []]
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'No emails provided'}), 400
+    if len(entries) > MAX_BULK_IDS:
+        return jsonify({'error': f'At most {MAX_BULK_IDS} emails per request'}), 400
+    
+    results = {}
+    rows = {}
+    now = datetime.utcnow()
+    for entry in entries:
+        email = str((entry.get('email') if isinstance(entry, dict) else entry) or '').strip().lower()
+        if not email or '@' not in email:
+            results[email] = 'invalid'
+        elif email not in rows:
+            rows[email] = {'email': email, 'reason': (entry.get('reason') if isinstance(entry, dict) else '') or '', 'created_at': now}
+    
+    try:
+        added = set()
+        if rows:
+            table = Blacklist.__table__
+            bind = db.session.connection()
+            if supports_on_conflict(bind):
+                stmt = (
+                    dialect_insert(table, bind).values(list(rows.values()))
+                    .on_conflict_do_nothing(index_elements=[table.c.email])
+                )
+                if db.engine.dialect.insert_returning:
+                    added = set(db.session.execute(stmt.returning(table.c.email)).scalars())
+                else:
+                    existing = set(db.session.execute(select(table.c.email).where(table.c.email.in_(list(rows)))).scalars())
+                    db.session.execute(stmt)
+                    added = set(rows) - existing
+            else:
+                existing = set(db.session.execute(select(table.c.email).where(table.c.email.in_(list(rows)))).scalars())
+                new_rows = [row for email, row in rows.items() if email not in existing]
+                if new_rows:
+                    db.session.execute(table.insert().values(new_rows))
+                added = {row['email'] for row in new_rows}
+            
+            # Deactivate every matching account, including ones blacklisted earlier but still active,
+            # never the acting admin's own
+            deactivated = _bulk_update(
+                User,
+                [func.lower(User.email).in_(list(rows)), User.is_active.isnot(False), User.id != get_user_id()],
+                {'is_active': False},
+            )
+        else:
+            deactivated = []
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    for email in rows:
+        results[email] = 'added' if email in added else 'already_blacklisted'
+    return jsonify({
+        'message': f'{len(added)} email(s) added to blacklist',
+        'added': len(added),
+        'deactivated_users': len(deactivated),
+        'results': [{'email': email, 'result': result} for email, result in results.items()]
+    }), 201
 
-@admin_bp.route('/analytics', methods=['GET'])
+@admin_bp.route('/blacklist', methods=['GET'])
 @jwt_required()
-def get_analytics():
+def get_blacklist():
     if not is_admin():
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # User statistics
-    total_users = User.query.count()
-    students = User.query.filter_by(role='student').count()
-    companies = User.query.filter_by(role='company').count()
-    faculty = User.query.filter_by(role='faculty').count()
-    pending_approvals = User.query.filter_by(is_approved=False).count()
-    
-    # Opportunity statistics
-    total_opportunities = Opportunity.query.count()
-    active_opportunities = Opportunity.query.filter_by(is_active=True, is_approved=True).count()
-    pending_opportunities = Opportunity.query.filter_by(is_approved=False).count()
-    
-    # Application statistics
-    total_applications = Application.query.count()
-    pending_applications = Application.query.filter_by(status='pending').count()
-    shortlisted = Application.query.filter_by(status='shortlisted').count()
-    accepted = Application.query.filter_by(status='accepted').count()
+    entries = Blacklist.query.order_by(Blacklist.created_at.desc()).all()
+    return jsonify([entry.to_dict() for entry in entries]), 200
+
+def _build_analytics():
+    """All admin counters in one round trip, plus the popular domain/skill rankings"""
+    users = select(
+        func.count(User.id).label('total'),
+        _count_if(User.role == 'student').label('students'),
+        _count_if(User.role == 'company').label('companies'),
+        _count_if(User.role == 'faculty').label('faculty'),
+        _count_if(User.is_approved.is_(False)).label('pending_approvals'),
+    ).subquery()
+    opportunities = select(
+        func.count(Opportunity.id).label('total'),
+        _count_if(Opportunity.is_active.is_(True) & Opportunity.is_approved.is_(True)).label('active'),
+        _count_if(Opportunity.is_approved.is_(False)).label('pending'),
+    ).subquery()
+    applications = select(
+        func.count(Application.id).label('total'),
+        _count_if(Application.status == 'pending').label('pending'),
+        _count_if(Application.status == 'shortlisted').label('shortlisted'),
+        _count_if(Application.status == 'accepted').label('accepted'),
+    ).subquery()
+    counts = db.session.execute(
+        select(users, opportunities, applications)
+        .select_from(users.join(opportunities, true()).join(applications, true()))
+    ).one()
+    u_total, students, companies, faculty, pending_approvals, o_total, o_active, o_pending, \
+        a_total, a_pending, shortlisted, accepted = counts
     
     # Popular domains
     domain_counts = db.session.query(
@@ -187,38 +568,46 @@ def get_analytics():
     
     popular_domains = [{'domain': domain, 'count': count} for domain, count in domain_counts]
     
-    # Popular skills (from opportunities)
-    all_skills = {}
-    opportunities = Opportunity.query.filter_by(is_approved=True).all()
-    for opp in opportunities:
-        if opp.required_skills:
-            import json
-            skills = json.loads(opp.required_skills)
-            for skill in skills:
-                all_skills[skill] = all_skills.get(skill, 0) + 1
+    # Popular skills (from the normalized opportunity skills of approved opportunities)
+    skill_counts = db.session.execute(
+        select(Skill.name, func.count(OpportunitySkill.id).label('count'))
+        .join(OpportunitySkill, OpportunitySkill.skill_id == Skill.id)
+        .join(Opportunity, Opportunity.id == OpportunitySkill.opportunity_id)
+        .where(Opportunity.is_approved.is_(True))
+        .group_by(Skill.id, Skill.name)
+        .order_by(func.count(OpportunitySkill.id).desc(), Skill.name)
+        .limit(10)
+    ).all()
     
-    popular_skills = [{'skill': skill, 'count': count} for skill, count in sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10]]
+    popular_skills = [{'skill': skill, 'count': count} for skill, count in skill_counts]
     
-    return jsonify({
+    return {
         'users': {
-            'total': total_users,
+            'total': u_total,
             'students': students,
             'companies': companies,
             'faculty': faculty,
             'pending_approvals': pending_approvals
         },
         'opportunities': {
-            'total': total_opportunities,
-            'active': active_opportunities,
-            'pending': pending_opportunities
+            'total': o_total,
+            'active': o_active,
+            'pending': o_pending
         },
         'applications': {
-            'total': total_applications,
-            'pending': pending_applications,
+            'total': a_total,
+            'pending': a_pending,
             'shortlisted': shortlisted,
             'accepted': accepted
         },
         'popular_domains': popular_domains,
         'popular_skills': popular_skills
-    }), 200
+    }
 
+@admin_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    if not is_admin():
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify(_analytics_cache.get_or_set('analytics', _build_analytics, tables=ANALYTICS_TABLES)), 200
@@ -6,6 +6,7 @@ from sklearn.metrics.pairwise import cosine_similarity
 import json
 import re
 from routes.helpers import get_user_id
+from application_counter import ApplicationCounter
 
 ai_bp = Blueprint('ai', __name__)
 
@@ -96,7 +97,9 @@ def get_recommendations():
         scored_opportunities.sort(key=lambda x: x['score'], reverse=True)
         
         # Return top 20
-        return jsonify(scored_opportunities[:20]), 200
+        top = scored_opportunities[:20]
+        ApplicationCounter.add_pending([item['opportunity'] for item in top])
+        return jsonify(top), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1,83 +1,339 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from models import db, Application, Opportunity, StudentProfile, User, Notification
+from models import db, Application, Opportunity, StudentProfile, User, CompanyProfile
 from datetime import datetime
 import os
-from routes.helpers import get_user_id
+from sqlalchemy import select, literal, or_
+from routes.helpers import get_user_id, insert_notifications, user_room
+from application_counter import ApplicationCounter
+from background_tasks import dispatcher
+from db_utils import dialect_insert, supports_on_conflict
+from query_cache import QueryCache
 
 applications_bp = Blueprint('applications', __name__)
 
+MAX_BULK_APPLICATIONS = 50
+
+# Opportunity eligibility per id (invalidated when opportunities or company profiles change in
+# this process). Only a fast-path rejection: the INSERT re-checks eligibility itself.
+_eligibility_cache = QueryCache(default_ttl=30)
+
+def _eligibility_rows(opportunity_ids):
+    """What submission needs to know about each opportunity, read from the database"""
+    return {
+        row.id: dict(row._mapping) for row in db.session.execute(
+            select(Opportunity.id, Opportunity.title, Opportunity.is_active, Opportunity.is_approved,
+                   Opportunity.application_deadline, CompanyProfile.user_id.label('company_user_id'))
+            .join(CompanyProfile, CompanyProfile.id == Opportunity.company_id)
+            .where(Opportunity.id.in_(list(opportunity_ids)))
+        )
+    }
+
+def _opportunity_eligibility(opportunity_id, fresh=False):
+    """Eligibility of one opportunity, cached until opportunities change (``fresh`` rereads it)"""
+    key = ('eligibility', opportunity_id)
+    if fresh:
+        _eligibility_cache.invalidate(lambda cached_key: cached_key == key)
+    return _eligibility_cache.get_or_set(
+        key, lambda: _eligibility_rows([opportunity_id]).get(opportunity_id),
+        tables=('opportunities', 'company_profiles')
+    )
+
+def _ineligible_reason(opportunity, today):
+    """Why an opportunity does not accept applications, or None when it does"""
+    if not opportunity:
+        return 'Opportunity not found'
+    if not opportunity['is_active'] or not opportunity['is_approved']:
+        return 'Opportunity is not available'
+    if opportunity['application_deadline'] and opportunity['application_deadline'] < today:
+        return 'Application deadline has passed'
+    return None
+
+def _accepting_applications(today):
+    """The same checks as _ineligible_reason, as predicates on the opportunities table"""
+    return [
+        Opportunity.is_active.is_(True),
+        Opportunity.is_approved.is_(True),
+        or_(Opportunity.application_deadline.is_(None), Opportunity.application_deadline >= today),
+    ]
+
+def _notify_companies_of_applications(applications):
+    """
+    Background task: one company notification per new application plus its real-time event.
+    ``applications`` holds (company user id, application id, student name, opportunity title).
+    """
+    now = datetime.utcnow()
+    notifications = insert_notifications([
+        {
+            'user_id': company_user_id,
+            'title': 'New Application',
+            'message': f'{student_name} applied for "{opportunity_title}"',
+            'notification_type': 'new_application',
+            'related_id': application_id,
+            'is_read': False,
+            'created_at': now,
+        }
+        for company_user_id, application_id, student_name, opportunity_title in applications
+    ])
+    db.session.commit()
+    
+    # Emit real-time notifications (lazy import to avoid circular dependency)
+    try:
+        from app import get_socketio
+        socketio = get_socketio()
+        for notification in notifications:
+            socketio.emit('new_notification', {
+                'user_id': notification['user_id'],
+                'notification': {
+                    'id': notification.get('id'),
+                    'title': notification['title'],
+                    'message': notification['message'],
+                    'notification_type': notification['notification_type'],
+                    'related_id': notification['related_id'],
+                    'is_read': False,
+                    'created_at': now.isoformat()
+                }
+            }, to=user_room(notification['user_id']))
+    except Exception:
+        pass  # SocketIO not available, continue without real-time update
+
+def _student_for_user(user_id):
+    """Role plus student profile columns for a user in one query (profile columns are None without a profile)"""
+    return db.session.execute(
+        select(User.role, StudentProfile.id, StudentProfile.first_name, StudentProfile.last_name,
+               StudentProfile.resume_path)
+        .select_from(User)
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .where(User.id == user_id)
+    ).first()
+
+def _insert_applications(rows, today):
+    """
+    Insert application rows with INSERT ... SELECT from opportunities that still
+    accept applications, so a posting closed by another worker since any cached
+    check gets no row; rows that hit unique_application are skipped too.
+    Rows share everything but opportunity_id and cover_letter.
+    Returns {opportunity_id: application_id} for the rows actually inserted.
+    """
+    table = Application.__table__
+    bind = db.session.connection()
+    student_id = rows[0]['student_id']
+    columns = ['student_id', 'opportunity_id', 'resume_path', 'cover_letter', 'status', 'applied_at', 'updated_at']
+    by_cover_letter = {}
+    for row in rows:
+        by_cover_letter.setdefault(row['cover_letter'], []).append(row['opportunity_id'])
+
+    def source(cover_letter, opportunity_ids):
+        values = dict(rows[0], cover_letter=cover_letter)
+        return select(*[
+            Opportunity.id if name == 'opportunity_id' else literal(values[name], table.c[name].type)
+            for name in columns
+        ]).where(Opportunity.id.in_(opportunity_ids), *_accepting_applications(today))
+
+    created = {}
+    for cover_letter, opportunity_ids in by_cover_letter.items():
+        if supports_on_conflict(bind) and db.engine.dialect.insert_returning:
+            created.update(db.session.execute(
+                dialect_insert(table, bind).from_select(columns, source(cover_letter, opportunity_ids))
+                .on_conflict_do_nothing(index_elements=[table.c.student_id, table.c.opportunity_id])
+                .returning(table.c.opportunity_id, table.c.id)
+            ).all())
+            continue
+        existing = set(db.session.execute(
+            select(table.c.opportunity_id).where(
+                table.c.student_id == student_id, table.c.opportunity_id.in_(opportunity_ids)
+            )
+        ).scalars())
+        new_ids = [opportunity_id for opportunity_id in opportunity_ids if opportunity_id not in existing]
+        if not new_ids:
+            continue
+        db.session.execute(table.insert().from_select(columns, source(cover_letter, new_ids)))
+        created.update(db.session.execute(
+            select(table.c.opportunity_id, table.c.id).where(
+                table.c.student_id == student_id, table.c.opportunity_id.in_(new_ids)
+            )
+        ).all())
+    return created
+
 @applications_bp.route('', methods=['POST'])
 @jwt_required()
 def create_application():
     try:
-        user_id = get_user_id()
-        user = User.query.get(user_id)
+        student = _student_for_user(get_user_id())
         
-        if not user or user.role != 'student':
+        if not student or student.role != 'student':
             return jsonify({'error': 'Only students can apply'}), 403
         
-        profile = user.student_profile
-        if not profile:
+        if student.id is None:
             return jsonify({'error': 'Profile not found. Please complete your profile first'}), 404
         
-        data = request.get_json()
+        data = request.get_json() or {}
         opportunity_id = data.get('opportunity_id')
         
         if not opportunity_id:
             return jsonify({'error': 'opportunity_id is required'}), 400
+        try:
+            opportunity_id = int(opportunity_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'opportunity_id must be an integer'}), 400
         
-        opportunity = Opportunity.query.get(opportunity_id)
-        if not opportunity:
-            return jsonify({'error': 'Opportunity not found'}), 404
+        # Cached fast-path rejection; the insert below re-checks eligibility in SQL
+        today = datetime.now().date()
+        opportunity = _opportunity_eligibility(opportunity_id)
+        error = _ineligible_reason(opportunity, today)
+        if error:
+            return jsonify({'error': error}), 404 if not opportunity else 400
         
-        if not opportunity.is_active or not opportunity.is_approved:
-            return jsonify({'error': 'Opportunity is not available'}), 400
+        # Create application; unique_application turns a repeat into a no-op instead of a lookup first
+        now = datetime.utcnow()
+        values = {
+            'student_id': student.id,
+            'opportunity_id': opportunity_id,
+            'resume_path': student.resume_path,
+            'cover_letter': data.get('cover_letter', ''),
+            'status': 'pending',
+            'applied_at': now,
+            'updated_at': now,
+        }
+        application_id = _insert_applications([values], today).get(opportunity_id)
+        if application_id is None:
+            db.session.rollback()
+            # Closed since it was cached, or a repeat application
+            opportunity = _opportunity_eligibility(opportunity_id, fresh=True)
+            error = _ineligible_reason(opportunity, today)
+            if error:
+                return jsonify({'error': error}), 404 if not opportunity else 400
+            return jsonify({'error': 'You have already applied for this opportunity'}), 409
         
-        # Check if already applied
-        existing = Application.query.filter_by(
-            student_id=profile.id,
-            opportunity_id=opportunity_id
-        ).first()
+        # Count the application on a counter shard instead of rewriting the opportunity row
+        ApplicationCounter.increment({opportunity_id: 1})
+        db.session.commit()
         
-        if existing:
-            return jsonify({'error': 'You have already applied for this opportunity'}), 409
+        student_name = f'{student.first_name} {student.last_name}'
+        dispatcher.submit(_notify_companies_of_applications,
+                          [(opportunity['company_user_id'], application_id, student_name, opportunity['title'])])
         
-        # Check deadline
-        if opportunity.application_deadline and opportunity.application_deadline < datetime.now().date():
-            return jsonify({'error': 'Application deadline has passed'}), 400
-        
-        # Create application
-        application = Application(
-            student_id=profile.id,
-            opportunity_id=opportunity_id,
-            resume_path=profile.resume_path,
-            cover_letter=data.get('cover_letter', ''),
-            status='pending'
-        )
+        return jsonify({
+            'message': 'Application submitted successfully',
+            'application': {
+                'id': application_id,
+                'student_id': student.id,
+                'student_name': student_name,
+                'opportunity_id': opportunity_id,
+                'opportunity_title': opportunity['title'],
+                'resume_path': values['resume_path'],
+                'cover_letter': values['cover_letter'],
+                'status': 'pending',
+                'ai_score': None,
+                'skill_match_percentage': None,
+                'notes': None,
+                'applied_at': now.isoformat()
+            }
+        }), 201
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@applications_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_applications():
+    """
+    Apply to several opportunities at once.
+    Body: {"opportunity_ids": [1, 2, 3], "cover_letter": "..."} or
+    {"applications": [{"opportunity_id": 1, "cover_letter": "..."}, ...]}.
+    Returns a result per requested opportunity.
+    """
+    try:
+        student = _student_for_user(get_user_id())
+        if not student or student.role != 'student':
+            return jsonify({'error': 'Only students can apply'}), 403
+        if student.id is None:
+            return jsonify({'error': 'Profile not found. Please complete your profile first'}), 404
         
-        db.session.add(application)
+        data = request.get_json() or {}
+        if 'applications' in data:
+            items = data['applications']
+        else:
+            items = [{'opportunity_id': opp_id, 'cover_letter': data.get('cover_letter', '')}
+                     for opp_id in data.get('opportunity_ids') or []]
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No opportunities provided'}), 400
+        if len(items) > MAX_BULK_APPLICATIONS:
+            return jsonify({'error': f'At most {MAX_BULK_APPLICATIONS} opportunities per request'}), 400
         
-        # Update opportunity application count
-        opportunity.applications_count += 1
+        # Validate shape and drop repeats, keeping request order for the results
+        results = []
+        requested = {}
+        for item in items:
+            opportunity_id = item.get('opportunity_id') if isinstance(item, dict) else item
+            if isinstance(opportunity_id, bool) or not isinstance(opportunity_id, int):
+                results.append({'opportunity_id': opportunity_id, 'success': False, 'error': 'Invalid opportunity id'})
+            elif opportunity_id in requested:
+                results.append({'opportunity_id': opportunity_id, 'success': False, 'error': 'Duplicate opportunity id'})
+            else:
+                requested[opportunity_id] = {
+                    'opportunity_id': opportunity_id,
+                    'cover_letter': (item.get('cover_letter') if isinstance(item, dict) else None) or ''
+                }
+                results.append(requested[opportunity_id])
         
-        # Create notification for company
-        company_user = opportunity.company.user
-        notification = Notification(
-            user_id=company_user.id,
-            title='New Application',
-            message=f'{profile.first_name} {profile.last_name} applied for "{opportunity.title}"',
-            notification_type='new_application',
-            related_id=application.id
-        )
-        db.session.add(notification)
+        # Eligibility for every requested opportunity in one query
+        opportunities = _eligibility_rows(requested) if requested else {}
+        today = datetime.now().date()
+        now = datetime.utcnow()
+        rows = []
+        for opportunity_id, result in requested.items():
+            error = _ineligible_reason(opportunities.get(opportunity_id), today)
+            if error:
+                result.update({'success': False, 'error': error})
+                result.pop('cover_letter')
+                continue
+            rows.append({
+                'student_id': student.id,
+                'opportunity_id': opportunity_id,
+                'resume_path': student.resume_path,
+                'cover_letter': result.pop('cover_letter'),
+                'status': 'pending',
+                'applied_at': now,
+                'updated_at': now,
+            })
         
+        # One insert per distinct cover letter; it re-checks eligibility and unique_application skips repeats
+        created = _insert_applications(rows, today) if rows else {}
+        ApplicationCounter.increment({opportunity_id: 1 for opportunity_id in created})
         db.session.commit()
         
+        # Rows not inserted were either applied for already or closed since the read above
+        skipped = [row['opportunity_id'] for row in rows if row['opportunity_id'] not in created]
+        current = _eligibility_rows(skipped) if skipped else {}
+        student_name = f'{student.first_name} {student.last_name}'
+        for row in rows:
+            result = requested[row['opportunity_id']]
+            application_id = created.get(row['opportunity_id'])
+            if application_id is None:
+                error = _ineligible_reason(current.get(row['opportunity_id']), today)
+                result.update({'success': False, 'error': error or 'You have already applied for this opportunity'})
+            else:
+                result.update({
+                    'success': True,
+                    'application_id': application_id,
+                    'opportunity_title': opportunities[row['opportunity_id']]['title']
+                })
+        
+        if created:
+            dispatcher.submit(_notify_companies_of_applications, [
+                (opportunities[opportunity_id]['company_user_id'], application_id, student_name,
+                 opportunities[opportunity_id]['title'])
+                for opportunity_id, application_id in created.items()
+            ])
+        
         return jsonify({
-            'message': 'Application submitted successfully',
-            'application': application.to_dict()
-        }), 201
+            'message': f'{len(created)} application(s) submitted',
+            'applied': len(created),
+            'failed': len(results) - len(created),
+            'results': results
+        }), 200
     
     except Exception as e:
         db.session.rollback()
@@ -4,11 +4,62 @@ from models import db, User, CompanyProfile, Opportunity, Application, StudentPr
 from models import Skill, OpportunitySkill
 from datetime import datetime
 import json
-from routes.helpers import get_user_id
+from sqlalchemy import select, update, func, case, tuple_
+from routes.helpers import get_user_id, insert_notifications, user_room
 from skills_matching import SkillsMatchingService
+from opportunity_import import OpportunityImportService, DEFAULT_CHUNK_SIZE
+from view_analytics import ViewAnalyticsService
+from application_counter import ApplicationCounter
 
 company_bp = Blueprint('company', __name__)
 
+APPLICATION_STATUSES = ['pending', 'shortlisted', 'rejected', 'interview', 'accepted', 'withdrawn']
+MAX_PAGE_SIZE = 100
+MAX_BULK_ITEMS = 5000
+MAX_ANALYTICS_PERIODS = 104
+
+# Columns the dashboard cards need (skips description/prerequisites text)
+DASHBOARD_COLUMNS = (
+    Opportunity.id, Opportunity.title, Opportunity.domain, Opportunity.required_skills,
+    Opportunity.duration, Opportunity.stipend, Opportunity.location, Opportunity.work_type,
+    Opportunity.application_deadline, Opportunity.start_date, Opportunity.is_active,
+    Opportunity.is_approved, Opportunity.views_count, Opportunity.applications_count,
+    Opportunity.created_at,
+)
+
+# Applicant list projection; compact mode skips the heavy profile columns
+APPLICANT_COLUMNS = (
+    Application.id, Application.student_id, Application.resume_path, Application.cover_letter,
+    Application.status, Application.ai_score, Application.skill_match_percentage, Application.notes,
+    Application.applied_at,
+    StudentProfile.user_id, StudentProfile.first_name, StudentProfile.last_name, StudentProfile.middle_name,
+    StudentProfile.phone, StudentProfile.date_of_birth, StudentProfile.prn_number, StudentProfile.course,
+    StudentProfile.specialization, StudentProfile.gender, StudentProfile.skills, StudentProfile.interests,
+    StudentProfile.resume_path.label('profile_resume_path'), StudentProfile.profile_picture,
+    StudentProfile.linkedin_url, StudentProfile.github_url, StudentProfile.portfolio_url,
+    StudentProfile.created_at.label('profile_created_at'),
+    User.email,
+)
+APPLICANT_DETAIL_COLUMNS = (StudentProfile.address, StudentProfile.education, StudentProfile.bio)
+
+# sort= value -> (sort key, default direction)
+APPLICANT_SORTS = {
+    'applied_at': (Application.applied_at, 'desc'),
+    'match_score': (func.coalesce(Application.skill_match_percentage, -1.0), 'desc'),
+    'status': (
+        case(
+            {app_status: rank for rank, app_status in enumerate(APPLICATION_STATUSES)},
+            value=Application.status,
+            else_=len(APPLICATION_STATUSES),
+        ),
+        'asc',
+    ),
+}
+# Ascending overrides, so applicants without a match score still sort last
+APPLICANT_ASC_SORTS = {
+    'match_score': func.coalesce(Application.skill_match_percentage, 1000.0),
+}
+
 def get_company_profile():
     user_id = get_user_id()
     user = User.query.get(user_id)
@@ -144,6 +195,47 @@ def create_opportunity():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@company_bp.route('/opportunities/import', methods=['POST'])
+@jwt_required()
+def import_opportunities():
+    """
+    Bulk-create opportunities from an uploaded CSV / JSON / JSON Lines file
+    (multipart field "file") or a JSON body {"opportunities": [...]}.
+    Query params: dry_run=true to only validate, chunk_size= rows per transaction.
+    Returns the import report with per-row errors.
+    """
+    try:
+        profile, error_response, status = get_company_profile()
+        if error_response:
+            return error_response, status
+        
+        dry_run = (request.args.get('dry_run') or '').lower() in ('1', 'true', 'yes')
+        chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+        
+        upload = request.files.get('file')
+        if upload:
+            fmt = OpportunityImportService.detect_format(upload.filename, upload.mimetype)
+            if not fmt:
+                return jsonify({'error': 'Unsupported file type, expected .csv, .json or .jsonl'}), 400
+            records = OpportunityImportService.iter_records(upload.stream, fmt)
+        else:
+            data = request.get_json(silent=True) or {}
+            opportunities = data.get('opportunities') if isinstance(data, dict) else data
+            if not isinstance(opportunities, list) or not opportunities:
+                return jsonify({'error': 'Upload a file or provide an opportunities list'}), 400
+            records = ((row_number, record, None) for row_number, record in enumerate(opportunities, start=1))
+        
+        try:
+            report = OpportunityImportService.import_records(profile.id, records, chunk_size=chunk_size, dry_run=dry_run)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify(report), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @company_bp.route('/opportunities', methods=['GET'])
 @jwt_required()
 def get_opportunities():
@@ -154,7 +246,7 @@ def get_opportunities():
         
         opportunities = Opportunity.query.filter_by(company_id=profile.id).order_by(Opportunity.created_at.desc()).all()
         
-        return jsonify([opp.to_dict() for opp in opportunities]), 200
+        return jsonify(ApplicationCounter.add_pending([opp.to_dict() for opp in opportunities])), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -224,15 +316,71 @@ def update_opportunity(opp_id):
         opportunity.updated_at = datetime.utcnow()
         db.session.commit()
         
-        return jsonify({'message': 'Opportunity updated successfully', 'opportunity': opportunity.to_dict()}), 200
+        opp_dict = ApplicationCounter.add_pending([opportunity.to_dict()])[0]
+        return jsonify({'message': 'Opportunity updated successfully', 'opportunity': opp_dict}), 200
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _applicant_dict(row, opportunity, compact):
+    applicant = {
+        'id': row.id,
+        'student_id': row.student_id,
+        'student_name': f"{row.first_name} {row.last_name}",
+        'opportunity_id': opportunity.id,
+        'opportunity_title': opportunity.title,
+        'resume_path': row.resume_path,
+        'cover_letter': row.cover_letter,
+        'status': row.status,
+        'ai_score': row.ai_score,
+        'skill_match_percentage': row.skill_match_percentage,
+        'notes': row.notes,
+        'applied_at': row.applied_at.isoformat() if row.applied_at else None,
+        'student_profile': {
+            'id': row.student_id,
+            'user_id': row.user_id,
+            'email': row.email,
+            'first_name': row.first_name,
+            'last_name': row.last_name,
+            'middle_name': row.middle_name,
+            'phone': row.phone,
+            'date_of_birth': row.date_of_birth.isoformat() if row.date_of_birth else None,
+            'prn_number': row.prn_number,
+            'course': row.course,
+            'specialization': row.specialization,
+            'gender': row.gender,
+            'skills': json.loads(row.skills) if row.skills else [],
+            'interests': json.loads(row.interests) if row.interests else [],
+            'resume_path': row.profile_resume_path,
+            'profile_picture': row.profile_picture,
+            'linkedin_url': row.linkedin_url,
+            'github_url': row.github_url,
+            'portfolio_url': row.portfolio_url,
+            'created_at': row.profile_created_at.isoformat() if row.profile_created_at else None
+        }
+    }
+    if not compact:
+        applicant['student_profile'].update({
+            'address': row.address,
+            'education': json.loads(row.education) if row.education else [],
+            'bio': row.bio,
+        })
+    return applicant
+
+
 @company_bp.route('/opportunities/<int:opp_id>/applicants', methods=['GET'])
 @jwt_required()
 def get_applicants(opp_id):
+    """
+    Applicants for an opportunity, from one joined query.
+    
+    Query params: status, sort (applied_at | match_score | status), order (asc | desc;
+    unscored applicants come last either way for match_score), compact=true to omit
+    address/education/bio, and limit= / after= (the last application id of the
+    previous page) for keyset pagination. Without limit/after the full list is
+    returned as a plain array.
+    """
     try:
         profile, error_response, status = get_company_profile()
         if error_response:
@@ -243,22 +391,61 @@ def get_applicants(opp_id):
             return jsonify({'error': 'Opportunity not found'}), 404
         
         status_filter = request.args.get('status', None)
-        query = Application.query.filter_by(opportunity_id=opp_id)
+        sort = request.args.get('sort', 'applied_at')
+        if sort not in APPLICANT_SORTS:
+            return jsonify({'error': f"Invalid sort, expected one of: {', '.join(APPLICANT_SORTS)}"}), 400
+        sort_key, order = APPLICANT_SORTS[sort]
+        order = (request.args.get('order') or order).lower()
+        if order not in ('asc', 'desc'):
+            return jsonify({'error': 'Invalid order'}), 400
+        if order == 'asc':
+            sort_key = APPLICANT_ASC_SORTS.get(sort, sort_key)
+        compact = (request.args.get('compact') or '').lower() in ('1', 'true', 'yes')
+        after = request.args.get('after', type=int)
+        limit = request.args.get('limit', type=int)
+        paginated = after is not None or limit is not None
+        
+        conditions = [Application.opportunity_id == opp_id]
         if status_filter:
-            query = query.filter_by(status=status_filter)
-        
-        applications = query.order_by(Application.applied_at.desc()).all()
-        
-        # Get full student details
-        applicants = []
-        for app in applications:
-            student = StudentProfile.query.get(app.student_id)
-            if student:
-                app_dict = app.to_dict()
-                app_dict['student_profile'] = student.to_dict()
-                applicants.append(app_dict)
+            conditions.append(Application.status == status_filter)
+        
+        columns = APPLICANT_COLUMNS if compact else APPLICANT_COLUMNS + APPLICANT_DETAIL_COLUMNS
+        query = (
+            select(*columns)
+            .join(StudentProfile, StudentProfile.id == Application.student_id)
+            .outerjoin(User, User.id == StudentProfile.user_id)
+            .where(*conditions)
+        )
         
-        return jsonify(applicants), 200
+        if after is not None:
+            anchor = db.session.execute(
+                select(sort_key).where(Application.id == after, Application.opportunity_id == opp_id)
+            ).first()
+            if not anchor:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            position = tuple_(sort_key, Application.id)
+            cursor = tuple_(anchor[0], after)
+            query = query.where(position < cursor if order == 'desc' else position > cursor)
+        
+        if order == 'desc':
+            query = query.order_by(sort_key.desc(), Application.id.desc())
+        else:
+            query = query.order_by(sort_key.asc(), Application.id.asc())
+        if paginated:
+            limit = min(max(limit or 20, 1), MAX_PAGE_SIZE)
+            query = query.limit(limit)
+        
+        applicants = [_applicant_dict(row, opportunity, compact) for row in db.session.execute(query)]
+        if not paginated:
+            return jsonify(applicants), 200
+        
+        total = db.session.execute(select(func.count(Application.id)).where(*conditions)).scalar()
+        return jsonify({
+            'rows': applicants,
+            'total': total,
+            'limit': limit,
+            'next_cursor': applicants[-1]['id'] if len(applicants) == limit else None
+        }), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -283,7 +470,7 @@ def update_application_status(app_id):
         data = request.get_json()
         new_status = data.get('status')
         
-        if new_status not in ['pending', 'shortlisted', 'rejected', 'interview', 'accepted', 'withdrawn']:
+        if new_status not in APPLICATION_STATUSES:
             return jsonify({'error': 'Invalid status'}), 400
         
         old_status = application.status
@@ -313,31 +500,237 @@ def update_application_status(app_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@company_bp.route('/dashboard', methods=['GET'])
+@company_bp.route('/applications/status', methods=['PUT'])
 @jwt_required()
-def get_dashboard():
+def bulk_update_application_status():
+    """
+    Change the status of many applications in one request.
+    
+    Body: {"updates": [{"application_id": 1, "status": "shortlisted", "notes": "..."}, ...]}
+    or {"application_ids": [1, 2, ...], "status": "shortlisted", "notes": "..."}.
+    Valid items are applied with one UPDATE and one multi-row notification insert;
+    each affected student gets a single 'application_status_updated' socket event.
+    Returns one result per requested item, in request order.
+    """
     try:
         profile, error_response, status = get_company_profile()
         if error_response:
             return error_response, status
         
-        opportunities = Opportunity.query.filter_by(company_id=profile.id).all()
+        data = request.get_json() or {}
+        if 'updates' in data:
+            items = data['updates']
+        else:
+            shared = {'status': data.get('status')}
+            if 'notes' in data:
+                shared['notes'] = data['notes']
+            items = [dict(shared, application_id=app_id) for app_id in data.get('application_ids') or []]
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No updates provided'}), 400
+        if len(items) > MAX_BULK_ITEMS:
+            return jsonify({'error': f'At most {MAX_BULK_ITEMS} updates per request'}), 400
+        
+        results = [None] * len(items)
+        requested = {}  # application id -> (index, item)
+        for index, item in enumerate(items):
+            app_id = item.get('application_id') if isinstance(item, dict) else None
+            if not isinstance(app_id, int) or isinstance(app_id, bool):
+                results[index] = {'application_id': app_id, 'success': False, 'error': 'Invalid application id'}
+            elif item.get('status') not in APPLICATION_STATUSES:
+                results[index] = {'application_id': app_id, 'success': False, 'error': 'Invalid status'}
+            elif app_id in requested:
+                results[index] = {'application_id': app_id, 'success': False, 'error': 'Duplicate application id'}
+            else:
+                requested[app_id] = (index, item)
+        
+        found = {}
+        if requested:
+            found = {
+                row.id: row
+                for row in db.session.execute(
+                    select(
+                        Application.id, Application.status, Application.opportunity_id,
+                        Opportunity.title, Opportunity.company_id, StudentProfile.user_id,
+                    )
+                    .join(Opportunity, Opportunity.id == Application.opportunity_id)
+                    .join(StudentProfile, StudentProfile.id == Application.student_id)
+                    .where(Application.id.in_(list(requested)))
+                )
+            }
         
-        total_applications = 0
-        pending_applications = 0
-        for opp in opportunities:
-            apps = Application.query.filter_by(opportunity_id=opp.id).all()
-            total_applications += len(apps)
-            pending_applications += len([a for a in apps if a.status == 'pending'])
+        accepted = {}
+        for app_id, (index, item) in requested.items():
+            row = found.get(app_id)
+            if not row:
+                results[index] = {'application_id': app_id, 'success': False, 'error': 'Application not found'}
+            elif row.company_id != profile.id:
+                results[index] = {'application_id': app_id, 'success': False, 'error': 'Unauthorized'}
+            else:
+                accepted[app_id] = (index, item, row)
+        
+        events = {}
+        if accepted:
+            now = datetime.utcnow()
+            status_by_id = {app_id: item['status'] for app_id, (_, item, _) in accepted.items()}
+            notes_by_id = {app_id: item['notes'] for app_id, (_, item, _) in accepted.items() if 'notes' in item}
+            values = {'status': case(status_by_id, value=Application.id), 'updated_at': now}
+            if notes_by_id:
+                values['notes'] = case(notes_by_id, value=Application.id, else_=Application.notes)
+            db.session.execute(
+                update(Application)
+                .where(Application.id.in_(list(accepted)))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            
+            notifications = insert_notifications([
+                {
+                    'user_id': row.user_id,
+                    'title': 'Application Status Updated',
+                    'message': f'Your application for "{row.title}" has been {item["status"]}',
+                    'notification_type': 'application_status',
+                    'related_id': app_id,
+                    'is_read': False,
+                    'created_at': now,
+                }
+                for app_id, (_, item, row) in accepted.items()
+            ])
+            db.session.commit()
+            
+            for app_id, (index, item, row) in accepted.items():
+                results[index] = {
+                    'application_id': app_id,
+                    'success': True,
+                    'old_status': row.status,
+                    'status': item['status']
+                }
+                events.setdefault(row.user_id, {'applications': [], 'notifications': []})['applications'].append(
+                    {'id': app_id, 'opportunity_id': row.opportunity_id, 'status': item['status']}
+                )
+            for notification in notifications:
+                created_at = notification.get('created_at')
+                events[notification['user_id']]['notifications'].append({
+                    'id': notification.get('id'),
+                    'user_id': notification['user_id'],
+                    'title': notification['title'],
+                    'message': notification['message'],
+                    'notification_type': notification['notification_type'],
+                    'related_id': notification['related_id'],
+                    'is_read': notification['is_read'],
+                    'created_at': created_at.isoformat() if created_at else None
+                })
+        
+        # One real-time event per affected student (lazy import to avoid circular dependency)
+        if events:
+            try:
+                from app import get_socketio
+                socketio = get_socketio()
+                for user_id, payload in events.items():
+                    socketio.emit('application_status_updated', dict(payload, user_id=user_id), to=user_room(user_id))
+            except Exception:
+                pass  # SocketIO not available, continue without real-time update
+        
+        updated = len(accepted)
+        return jsonify({
+            'message': f'{updated} application(s) updated',
+            'updated': updated,
+            'failed': len(items) - updated,
+            'results': results
+        }), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _application_status_counts(company_id):
+    """{opportunity_id: {status: count}} for every posting of a company, from one GROUP BY"""
+    rows = db.session.execute(
+        select(Application.opportunity_id, Application.status, func.count(Application.id))
+        .join(Opportunity, Opportunity.id == Application.opportunity_id)
+        .where(Opportunity.company_id == company_id)
+        .group_by(Application.opportunity_id, Application.status)
+    )
+    counts = {}
+    for opportunity_id, app_status, count in rows:
+        counts.setdefault(opportunity_id, {})[app_status or 'pending'] = count
+    return counts
+
+
+@company_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """
+    Company dashboard. Opportunities are newest first; pass limit= (and after=
+    the next_cursor of the previous page) to page through them.
+    """
+    try:
+        profile, error_response, status = get_company_profile()
+        if error_response:
+            return error_response, status
         
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after', type=int)
+        
+        total_opportunities, active_opportunities = db.session.execute(
+            select(
+                func.count(Opportunity.id),
+                func.coalesce(func.sum(case((Opportunity.is_active.is_(True), 1), else_=0)), 0),
+            ).where(Opportunity.company_id == profile.id)
+        ).one()
+        
+        status_counts = _application_status_counts(profile.id)
+        applications_by_status = {app_status: 0 for app_status in APPLICATION_STATUSES}
+        for counts in status_counts.values():
+            for app_status, count in counts.items():
+                applications_by_status[app_status] = applications_by_status.get(app_status, 0) + count
+        
+        query = select(*DASHBOARD_COLUMNS).where(Opportunity.company_id == profile.id)
+        if after is not None:
+            query = query.where(Opportunity.id < after)
+        query = query.order_by(Opportunity.id.desc())
+        if limit is not None:
+            limit = min(max(limit, 1), MAX_PAGE_SIZE)
+            query = query.limit(limit)
+        
+        opportunities = []
+        for row in db.session.execute(query):
+            counts = status_counts.get(row.id, {})
+            opportunities.append({
+                'id': row.id,
+                'company_id': profile.id,
+                'company_name': profile.name,
+                'title': row.title,
+                'domain': row.domain,
+                'required_skills': json.loads(row.required_skills) if row.required_skills else [],
+                'duration': row.duration,
+                'stipend': row.stipend,
+                'location': row.location,
+                'work_type': row.work_type,
+                'application_deadline': row.application_deadline.isoformat() if row.application_deadline else None,
+                'start_date': row.start_date.isoformat() if row.start_date else None,
+                'is_active': row.is_active,
+                'is_approved': row.is_approved,
+                'views_count': row.views_count,
+                'applications_count': row.applications_count,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'status_counts': {app_status: counts.get(app_status, 0) for app_status in APPLICATION_STATUSES},
+            })
+        ApplicationCounter.add_pending(opportunities)
+        
+        total_applications = sum(applications_by_status.values())
         return jsonify({
             'profile': profile.to_dict(),
-            'opportunities': [opp.to_dict() for opp in opportunities],
+            'opportunities': opportunities,
+            'next_cursor': opportunities[-1]['id'] if limit and len(opportunities) == limit else None,
             'stats': {
-                'total_opportunities': len(opportunities),
-                'active_opportunities': len([o for o in opportunities if o.is_active]),
+                'total_opportunities': total_opportunities,
+                'active_opportunities': active_opportunities,
+                'closed_opportunities': total_opportunities - active_opportunities,
                 'total_applications': total_applications,
-                'pending_applications': pending_applications
+                'pending_applications': applications_by_status['pending'],
+                'shortlisted_applications': applications_by_status['shortlisted'],
+                'applications_by_status': applications_by_status
             }
         }), 200
     
@@ -345,6 +738,45 @@ def get_dashboard():
         return jsonify({'error': str(e)}), 500
 
 
+@company_bp.route('/analytics/views', methods=['GET'])
+@jwt_required()
+def get_view_analytics():
+    """
+    Views, applications and view-to-application conversion over time.
+    Query params: period (week | month, default week), periods (default 12),
+    opportunity_id (optional, one posting instead of the whole company).
+    """
+    profile, error_response, status = get_company_profile()
+    if error_response:
+        return error_response, status
+    
+    period = request.args.get('period', 'week')
+    opportunity_id = request.args.get('opportunity_id', type=int)
+    try:
+        periods = int(request.args.get('periods', 12))
+    except ValueError:
+        return jsonify({'error': 'periods must be an integer'}), 400
+    if not 1 <= periods <= MAX_ANALYTICS_PERIODS:
+        return jsonify({'error': f'periods must be between 1 and {MAX_ANALYTICS_PERIODS}'}), 400
+    
+    if opportunity_id is not None:
+        owned = db.session.execute(
+            select(Opportunity.id).where(Opportunity.id == opportunity_id, Opportunity.company_id == profile.id)
+        ).first()
+        if not owned:
+            return jsonify({'error': 'Opportunity not found'}), 404
+    
+    try:
+        return jsonify(ViewAnalyticsService.company_series(
+            profile.id, period=period, periods=periods, opportunity_id=opportunity_id
+        )), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 # ==================== SKILLS MATCHING ENDPOINTS FOR COMPANIES ====================
 
 @company_bp.route('/opportunities/<int:opp_id>/skills', methods=['GET', 'PUT'])
@@ -436,7 +868,7 @@ def get_matching_students(opp_id):
         )
         
         return jsonify({
-            'opportunity': opportunity.to_dict(),
+            'opportunity': ApplicationCounter.add_pending([opportunity.to_dict()])[0],
             'matched_students': matched_students,
             'total': len(matched_students)
         }), 200
@@ -1,8 +1,9 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import csv
 import io
+import zlib
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func
+from sqlalchemy import func, select, cast, literal, union_all, String, Numeric
 from datetime import datetime
 
 from models import (
@@ -12,8 +13,19 @@ from models import (
     StudentInternship,
     StudentOffer,
     CompanyProfile,
+    Skill,
+    StudentSkill,
+    CanonicalCompany,
 )
 from routes.helpers import get_user_id
+from company_resolver import CompanyResolver
+from query_cache import QueryCache
+from faculty_analytics import (
+    CUBE_DIMENSIONS,
+    FacultyAnalyticsService,
+    is_paid_stipend,
+    parse_ctc_to_lpa as _parse_ctc_to_lpa,
+)
 
 
 faculty_bp = Blueprint("faculty", __name__)
@@ -28,109 +40,231 @@ def _ensure_faculty():
     return user, None, None
 
 
-def _parse_ctc_to_lpa(ctc_value: str):
+PLACEMENT_COLUMNS = [
+    "student_name",
+    "prn",
+    "branch",
+    "company",
+    "ctc",
+    "ctc_lpa",
+    "role",
+    "location",
+    "joining_date",
+    "offer_date",
+    "ppo",
+]
+
+INTERNSHIP_COLUMNS = [
+    "student_name",
+    "branch",
+    "organization",
+    "designation",
+    "domain",
+    "stipend",
+    "internship_type",
+    "start_date",
+    "end_date",
+    "is_paid",
+]
+
+# Rows fetched per round trip when streaming from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+
+# Keyset pagination bounds for /placements/all and /internships/all
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Cached totals per filter combination (invalidated when the underlying tables change)
+_totals_cache = QueryCache(default_ttl=60)
+
+# Branch as displayed in tables: course, falling back to specialization
+BRANCH_EXPR = func.coalesce(func.nullif(StudentProfile.course, ""), StudentProfile.specialization)
+
+
+def _execute_rows(stmt, stream=False):
+    """Execute a projected select, optionally through a server-side cursor."""
+    if stream:
+        stmt = stmt.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+    return db.session.execute(stmt)
+
+
+def _count_rows(cache_key, stmt, tables):
+    """Cached COUNT(*) over a filtered select."""
+    return _totals_cache.get_or_set(
+        cache_key,
+        lambda: db.session.execute(select(func.count()).select_from(stmt.order_by(None).subquery())).scalar() or 0,
+        tables=tables,
+    )
+
+
+def _page_args():
+    """Parse keyset pagination args; returns (after, limit, paginated)."""
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", type=int)
+    paginated = after is not None or limit is not None
+    if paginated:
+        limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    return after, limit, paginated
+
+
+def _company_predicate(id_column, name_column, company):
     """
-    Best-effort parsing of CTC strings to numeric LPA for analytics.
-    Accepts formats like '6', '6 LPA', '6.5 LPA', '600000', etc.
-    Returns a float in LPA or None if parsing fails.
+    Match a company filter by canonical company id (indexed integer lookup),
+    falling back to the raw name when no canonical company matches.
     """
-    if not ctc_value:
-        return None
-
-    try:
-        text = str(ctc_value).lower().replace("lpa", "").strip()
-        # If looks like a big number (e.g. 600000), convert to LPA assuming per annum INR
-        if text.isdigit() and len(text) >= 6:
-            value = float(text) / 100000.0
-        else:
-            # Extract first float-like segment
-            import re
-
-            match = re.search(r"\\d+(?:\\.\\d+)?", text)
-            if not match:
-                return None
-            value = float(match.group(0))
-        return value
-    except Exception:
-        return None
+    company_id = CompanyResolver.lookup(company)
+    if company_id:
+        return id_column == company_id
+    return func.lower(name_column) == company.strip().lower()
 
 
-def _fetch_placements(filters=None):
-    """Reusable placement query returning structured rows."""
+def _placements_stmt(filters=None):
+    """Accepted offers with student context; every filter is a SQL predicate."""
     filters = filters or {}
-    branch = filters.get("branch")
-    company = filters.get("company")
+    branch = (filters.get("branch") or "").strip().lower()
+    company = (filters.get("company") or "").strip().lower()
     min_ctc = filters.get("min_ctc")
     max_ctc = filters.get("max_ctc")
 
-    query = (
-        db.session.query(StudentOffer, StudentProfile)
+    stmt = (
+        select(
+            StudentOffer.id,
+            StudentProfile.first_name,
+            StudentProfile.last_name,
+            StudentProfile.prn_number,
+            StudentProfile.course,
+            StudentProfile.specialization,
+            StudentOffer.company_name,
+            StudentOffer.ctc,
+            StudentOffer.ctc_lpa,
+            StudentOffer.role,
+            StudentOffer.location,
+            StudentOffer.joining_date,
+            StudentOffer.offer_date,
+        )
         .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
-        .filter(StudentOffer.status == "accepted")
+        .where(StudentOffer.status == "accepted")
     )
 
     if branch:
-        query = query.filter(
-            (func.lower(StudentProfile.course) == branch.lower())
-            | (func.lower(StudentProfile.specialization) == branch.lower())
-        )
+        # Same predicate as the internship report, served by ix_student_profiles_lower_branch
+        stmt = stmt.where(func.lower(BRANCH_EXPR) == branch)
     if company:
-        query = query.filter(func.lower(StudentOffer.company_name) == company.lower())
+        stmt = stmt.where(_company_predicate(StudentOffer.company_id, StudentOffer.company_name, company))
+    if min_ctc is not None:
+        stmt = stmt.where(StudentOffer.ctc_lpa >= min_ctc)
+    if max_ctc is not None:
+        stmt = stmt.where(StudentOffer.ctc_lpa <= max_ctc)
+    return stmt
+
+
+def _iter_placements(filters=None, stream=False, after=None, limit=None):
+    """Yield placement rows (accepted offers with student context) one at a time."""
+    stmt = _placements_stmt(filters)
+    if after is not None:
+        stmt = stmt.where(StudentOffer.id > after)
+    stmt = stmt.order_by(StudentOffer.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    for row in _execute_rows(stmt, stream):
+        yield {
+            "id": row.id,
+            "student_name": f"{row.first_name} {row.last_name}".strip(),
+            "prn": row.prn_number,
+            "branch": row.course or row.specialization,
+            "company": row.company_name,
+            "ctc": row.ctc,
+            "ctc_lpa": row.ctc_lpa,
+            "role": row.role,
+            "location": row.location,
+            "joining_date": row.joining_date.isoformat() if row.joining_date else None,
+            "offer_date": row.offer_date.isoformat() if row.offer_date else None,
+            "ppo": False,
+        }
 
-    rows = []
-    for offer, profile in query.all():
-        ctc_lpa = _parse_ctc_to_lpa(offer.ctc)
-        if min_ctc is not None and (ctc_lpa is None or ctc_lpa < min_ctc):
-            continue
-        if max_ctc is not None and (ctc_lpa is None or ctc_lpa > max_ctc):
-            continue
 
-        rows.append(
-            {
-                "student_name": f"{profile.first_name} {profile.last_name}".strip(),
-                "prn": getattr(profile, "prn_number", None),
-                "branch": profile.course or profile.specialization,
-                "company": offer.company_name,
-                "ctc": offer.ctc,
-                "ctc_lpa": ctc_lpa,
-                "role": offer.role,
-                "location": offer.location,
-                "joining_date": offer.joining_date.isoformat()
-                if offer.joining_date
-                else None,
-                "offer_date": offer.offer_date.isoformat() if offer.offer_date else None,
-                "ppo": False,
-            }
-        )
-    return rows
+def _fetch_placements(filters=None):
+    """Reusable placement query returning structured rows."""
+    return list(_iter_placements(filters))
 
 
-def _collect_internship_rows():
-    """Return all internships with student context."""
-    query = (
-        db.session.query(StudentInternship, StudentProfile)
+def _internships_stmt(filters=None):
+    """Internships with student context; every filter is a SQL predicate."""
+    filters = filters or {}
+    branch = (filters.get("branch") or "").strip().lower()
+    domain = (filters.get("domain") or "").strip().lower()
+    company = (filters.get("company") or "").strip().lower()
+    internship_type = (filters.get("type") or "").strip().lower()
+    paid_filter = filters.get("paid")
+
+    stmt = (
+        select(
+            StudentInternship.id,
+            StudentProfile.first_name,
+            StudentProfile.last_name,
+            StudentProfile.course,
+            StudentProfile.specialization,
+            StudentInternship.organization,
+            StudentInternship.designation,
+            StudentInternship.industry_sector,
+            StudentInternship.stipend,
+            StudentInternship.internship_type,
+            StudentInternship.start_date,
+            StudentInternship.end_date,
+            StudentInternship.technologies,
+        )
         .join(StudentProfile, StudentProfile.id == StudentInternship.student_id)
     )
 
-    rows = []
-    for internship, profile in query.all():
-        rows.append(
-            {
-                "student_name": f"{profile.first_name} {profile.last_name}".strip(),
-                "branch": profile.course or profile.specialization,
-                "organization": internship.organization,
-                "designation": internship.designation,
-                "domain": internship.industry_sector,
-                "stipend": internship.stipend,
-                "internship_type": internship.internship_type,
-                "start_date": internship.start_date.isoformat()
-                if internship.start_date
-                else None,
-                "end_date": internship.end_date.isoformat() if internship.end_date else None,
-                "is_paid": bool(internship.stipend and internship.stipend.strip()),
-            }
-        )
-    return rows
+    if branch:
+        stmt = stmt.where(func.lower(BRANCH_EXPR) == branch)
+    if domain:
+        stmt = stmt.where(func.lower(StudentInternship.industry_sector) == domain)
+    if company:
+        stmt = stmt.where(_company_predicate(StudentInternship.company_id, StudentInternship.organization, company))
+    if internship_type:
+        stmt = stmt.where(func.lower(StudentInternship.internship_type) == internship_type)
+
+    is_paid = StudentInternship.stipend.isnot(None) & (func.trim(StudentInternship.stipend) != "")
+    if paid_filter == "paid":
+        stmt = stmt.where(is_paid)
+    elif paid_filter == "unpaid":
+        stmt = stmt.where(~is_paid)
+    return stmt
+
+
+def _iter_internship_rows(filters=None, stream=False, after=None, limit=None, with_technologies=False):
+    """Yield internships with student context one at a time."""
+    stmt = _internships_stmt(filters)
+    if after is not None:
+        stmt = stmt.where(StudentInternship.id > after)
+    stmt = stmt.order_by(StudentInternship.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    for row in _execute_rows(stmt, stream):
+        item = {
+            "id": row.id,
+            "student_name": f"{row.first_name} {row.last_name}".strip(),
+            "branch": row.course or row.specialization,
+            "organization": row.organization,
+            "designation": row.designation,
+            "domain": row.industry_sector,
+            "stipend": row.stipend,
+            "internship_type": row.internship_type,
+            "start_date": row.start_date.isoformat() if row.start_date else None,
+            "end_date": row.end_date.isoformat() if row.end_date else None,
+            "is_paid": is_paid_stipend(row.stipend),
+        }
+        if with_technologies:
+            item["technologies"] = row.technologies.split(",") if row.technologies else []
+        yield item
+
+
+def _collect_internship_rows():
+    """Return all internships with student context."""
+    return list(_iter_internship_rows())
 
 
 @faculty_bp.route("/login", methods=["POST"])
@@ -178,130 +312,8 @@ def faculty_login():
 
 
 def _build_dashboard_payload():
-    """Utility that aggregates dashboard statistics + chart data."""
-    # Total students
-    total_students = StudentProfile.query.count()
-
-    # Placements based on accepted offers
-    accepted_offers = StudentOffer.query.filter_by(status="accepted").all()
-    placed_student_ids = {offer.student_id for offer in accepted_offers}
-    total_placed = len(placed_student_ids)
-    total_unplaced = max(total_students - total_placed, 0)
-
-    # Internships
-    total_internships = StudentInternship.query.count()
-
-    # Package analytics
-    ctc_values = []
-    for offer in accepted_offers:
-        value = _parse_ctc_to_lpa(offer.ctc)
-        if value is not None:
-            ctc_values.append(value)
-
-    highest_package = max(ctc_values) if ctc_values else 0
-    average_package = (sum(ctc_values) / len(ctc_values)) if ctc_values else 0
-
-    # Companies visited (from offers)
-    total_companies = (
-        db.session.query(func.count(func.distinct(StudentOffer.company_name)))
-        .filter(StudentOffer.status == "accepted")
-        .scalar()
-        or 0
-    )
-
-    # Company-wise placements (bar chart)
-    company_data = (
-        db.session.query(StudentOffer.company_name, func.count(StudentOffer.id))
-        .filter(StudentOffer.status == "accepted")
-        .group_by(StudentOffer.company_name)
-        .order_by(func.count(StudentOffer.id).desc())
-        .limit(15)
-        .all()
-    )
-    company_wise = [
-        {"company": name, "placed": count} for name, count in company_data if name
-    ]
-
-    # Branch-wise placement percentage (donut)
-    branch_totals = (
-        db.session.query(StudentProfile.course, func.count(StudentProfile.id))
-        .group_by(StudentProfile.course)
-        .all()
-    )
-    branch_placed = (
-        db.session.query(StudentProfile.course, func.count(func.distinct(StudentOffer.student_id)))
-        .join(StudentOffer, StudentOffer.student_id == StudentProfile.id)
-        .filter(StudentOffer.status == "accepted")
-        .group_by(StudentProfile.course)
-        .all()
-    )
-    branch_totals_dict = {branch or "Unknown": total for branch, total in branch_totals}
-    branch_placed_dict = {branch or "Unknown": placed for branch, placed in branch_placed}
-
-    branch_wise = []
-    for branch, total in branch_totals_dict.items():
-        placed = branch_placed_dict.get(branch, 0)
-        percentage = (placed / total * 100) if total else 0
-        branch_wise.append(
-            {"branch": branch or "Unknown", "placed": placed, "total": total, "percentage": round(percentage, 1)}
-        )
-
-    # Package distribution buckets
-    buckets = {
-        "0-3": 0,
-        "3-5": 0,
-        "5-7": 0,
-        "7-10": 0,
-        "10+": 0,
-    }
-    for value in ctc_values:
-        if value < 3:
-            buckets["0-3"] += 1
-        elif value < 5:
-            buckets["3-5"] += 1
-        elif value < 7:
-            buckets["5-7"] += 1
-        elif value < 10:
-            buckets["7-10"] += 1
-        else:
-            buckets["10+"] += 1
-    package_distribution = [
-        {"range": key, "count": count} for key, count in buckets.items()
-    ]
-
-    # Simple year-wise (batch) trends based on joining_date year
-    year_counts = {}
-    for offer in accepted_offers:
-        if offer.joining_date:
-            year = offer.joining_date.year
-        elif offer.offer_date:
-            year = offer.offer_date.year
-        else:
-            continue
-        year_counts[year] = year_counts.get(year, 0) + 1
-
-    batch_trends = [
-        {"year": str(year), "placed": count}
-        for year, count in sorted(year_counts.items())
-    ]
-
-    return {
-        "stats": {
-            "total_students": total_students,
-            "placed_students": total_placed,
-            "unplaced_students": total_unplaced,
-            "total_internships": total_internships,
-            "highest_package_lpa": round(highest_package, 2),
-            "average_package_lpa": round(average_package, 2),
-            "total_companies": total_companies,
-        },
-        "charts": {
-            "company_wise": company_wise,
-            "branch_wise": branch_wise,
-            "package_distribution": package_distribution,
-            "batch_trends": batch_trends,
-        },
-    }
+    """Dashboard statistics + chart data, read from the incrementally maintained snapshot."""
+    return FacultyAnalyticsService.get_dashboard_payload()
 
 
 @faculty_bp.route("/stats", methods=["GET"])
@@ -385,10 +397,18 @@ def get_placement_stats():
     return jsonify(_build_dashboard_payload()), 200
 
 
+def _include_students():
+    """Drill-downs list individual students unless called with students=false."""
+    return (request.args.get("students") or "true").lower() != "false"
+
+
 @faculty_bp.route("/placements/company/<company_name>", methods=["GET"])
 @jwt_required()
 def get_company_breakdown(company_name):
-    """Detailed analytics for a specific company."""
+    """
+    Detailed analytics for a specific company. The summary is a placement cube
+    rollup; pass students=false to skip the per-student listing.
+    """
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
@@ -397,15 +417,21 @@ def get_company_breakdown(company_name):
     if not normalized:
         return jsonify({"error": "Company name is required"}), 400
 
-    rows = (
-        db.session.query(StudentOffer, StudentProfile)
-        .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
-        .filter(StudentOffer.status == "accepted")
-        .filter(func.lower(StudentOffer.company_name) == normalized)
-        .all()
-    )
+    company_id = CompanyResolver.lookup(normalized)
+    include_students = _include_students()
 
-    if not rows:
+    overall = FacultyAnalyticsService.cube_rollup({"company": company_id}) if company_id else []
+    rows = []
+    if include_students or not company_id:
+        rows = (
+            db.session.query(StudentOffer, StudentProfile)
+            .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
+            .filter(StudentOffer.status == "accepted")
+            .filter(_company_predicate(StudentOffer.company_id, StudentOffer.company_name, normalized))
+            .all()
+        )
+
+    if not rows and not overall:
         return jsonify({"error": "No placements found for this company"}), 404
 
     packages = []
@@ -436,15 +462,47 @@ def get_company_breakdown(company_name):
             }
         )
 
-    summary = {
-        "company": company_name,
-        "total_students": len(rows),
-        "min_package_lpa": min(packages) if packages else None,
-        "max_package_lpa": max(packages) if packages else None,
-        "avg_package_lpa": round(sum(packages) / len(packages), 2) if packages else None,
-        "roles": sorted(list(roles)),
-        "branch_breakdown": [{"branch": k, "count": v} for k, v in branch_breakdown.items()],
-    }
+    if overall:
+        cube = overall[0]
+        canonical = db.session.get(CanonicalCompany, company_id)
+        if not include_students:
+            roles = {
+                role
+                for (role,) in db.session.execute(
+                    select(StudentOffer.role)
+                    .where(
+                        StudentOffer.status == "accepted",
+                        StudentOffer.company_id == company_id,
+                        StudentOffer.role.isnot(None),
+                    )
+                    .distinct()
+                )
+            }
+        summary = {
+            "company": canonical.name if canonical else company_name,
+            "company_id": company_id,
+            "total_students": cube["offers"],
+            "min_package_lpa": cube["min_package_lpa"],
+            "max_package_lpa": cube["max_package_lpa"],
+            "avg_package_lpa": cube["avg_package_lpa"],
+            "roles": sorted(list(roles)),
+            "branch_breakdown": [
+                {"branch": row["branch"], "count": row["offers"]}
+                for row in FacultyAnalyticsService.cube_rollup({"company": company_id}, ("branch",))
+            ],
+        }
+    else:
+        # Name never resolved to a canonical company: summarize the raw-name matches
+        summary = {
+            "company": company_name,
+            "company_id": None,
+            "total_students": len(rows),
+            "min_package_lpa": min(packages) if packages else None,
+            "max_package_lpa": max(packages) if packages else None,
+            "avg_package_lpa": round(sum(packages) / len(packages), 2) if packages else None,
+            "roles": sorted(list(roles)),
+            "branch_breakdown": [{"branch": k, "count": v} for k, v in branch_breakdown.items()],
+        }
 
     return jsonify({"summary": summary, "students": students}), 200
 
@@ -454,28 +512,50 @@ def get_company_breakdown(company_name):
 def get_all_placements():
     """
     Full table of placed students (based on offers).
-    Supports basic filters via query params.
+    Supports basic filters via query params. Passing limit= and/or after=
+    (the last row id of the previous page) returns a keyset-paginated page.
     """
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
 
-    rows = _fetch_placements(
-        {
-            "branch": request.args.get("branch"),
-            "company": request.args.get("company"),
-            "min_ctc": request.args.get("min_ctc", type=float),
-            "max_ctc": request.args.get("max_ctc", type=float),
-        }
+    filters = {
+        "branch": request.args.get("branch"),
+        "company": request.args.get("company"),
+        "min_ctc": request.args.get("min_ctc", type=float),
+        "max_ctc": request.args.get("max_ctc", type=float),
+    }
+    after, limit, paginated = _page_args()
+    if not paginated:
+        return jsonify(_fetch_placements(filters)), 200
+
+    rows = list(_iter_placements(filters, after=after, limit=limit))
+    total = _count_rows(
+        ("placements", tuple(sorted(filters.items()))),
+        _placements_stmt(filters),
+        tables=(StudentOffer.__tablename__, StudentProfile.__tablename__),
+    )
+    return (
+        jsonify(
+            {
+                "rows": rows,
+                "total": total,
+                "limit": limit,
+                "next_cursor": rows[-1]["id"] if len(rows) == limit else None,
+            }
+        ),
+        200,
     )
-
-    return jsonify(rows), 200
 
 
 @faculty_bp.route("/placements/branch/<branch_name>", methods=["GET"])
 @jwt_required()
 def get_branch_breakdown(branch_name):
-    """Analytics for all placements in a branch."""
+    """
+    Analytics for all placements in a branch (course, falling back to
+    specialization). The summary is a placement cube rollup; pass
+    students=false to skip the per-student listing.
+    """
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
@@ -484,55 +564,71 @@ def get_branch_breakdown(branch_name):
     if not normalized:
         return jsonify({"error": "Branch name is required"}), 400
 
-    rows = (
-        db.session.query(StudentOffer, StudentProfile)
-        .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
-        .filter(StudentOffer.status == "accepted")
-        .filter(
-            (func.lower(StudentProfile.course) == normalized)
-            | (func.lower(StudentProfile.specialization) == normalized)
-        )
-        .all()
-    )
-
-    if not rows:
+    overall = FacultyAnalyticsService.cube_rollup({"branch": normalized})
+    if not overall:
         return jsonify({"error": "No placements found for this branch"}), 404
 
-    packages = []
-    companies = {}
     students = []
-
-    for offer, profile in rows:
-        ctc_value = _parse_ctc_to_lpa(offer.ctc)
-        if ctc_value is not None:
-            packages.append(ctc_value)
-        comp_key = offer.company_name or "Unknown"
-        companies[comp_key] = companies.get(comp_key, 0) + 1
-
-        students.append(
-            {
-                "student_name": f"{profile.first_name} {profile.last_name}".strip(),
-                "company": offer.company_name,
-                "role": offer.role,
-                "package_lpa": ctc_value,
-                "location": offer.location,
-                "joining_date": offer.joining_date.isoformat()
-                if offer.joining_date
-                else None,
-            }
+    if _include_students():
+        rows = (
+            db.session.query(StudentOffer, StudentProfile)
+            .join(StudentProfile, StudentProfile.id == StudentOffer.student_id)
+            .filter(StudentOffer.status == "accepted")
+            .filter(func.lower(BRANCH_EXPR) == normalized)
+            .all()
         )
-
+        for offer, profile in rows:
+            students.append(
+                {
+                    "student_name": f"{profile.first_name} {profile.last_name}".strip(),
+                    "company": offer.company_name,
+                    "role": offer.role,
+                    "package_lpa": _parse_ctc_to_lpa(offer.ctc),
+                    "location": offer.location,
+                    "joining_date": offer.joining_date.isoformat()
+                    if offer.joining_date
+                    else None,
+                }
+            )
+
+    cube = overall[0]
     summary = {
         "branch": branch_name,
-        "total_students": len(rows),
-        "companies": [{"company": k, "count": v} for k, v in companies.items()],
-        "avg_package_lpa": round(sum(packages) / len(packages), 2) if packages else None,
-        "max_package_lpa": max(packages) if packages else None,
+        "total_students": cube["offers"],
+        "companies": [
+            {"company": row["company"], "count": row["offers"]}
+            for row in FacultyAnalyticsService.cube_rollup({"branch": normalized}, ("company",))
+        ],
+        "avg_package_lpa": cube["avg_package_lpa"],
+        "max_package_lpa": cube["max_package_lpa"],
     }
 
     return jsonify({"summary": summary, "students": students}), 200
 
 
+@faculty_bp.route("/placements/cube", methods=["GET"])
+@jwt_required()
+def get_placement_cube():
+    """
+    Placement rollup for any combination of filters (branch, company, batch,
+    gender, ctc_bucket), broken down by the comma-separated group_by dimensions.
+    """
+    user, error_response, status = _ensure_faculty()
+    if error_response:
+        return error_response, status
+
+    filters = {dim: request.args.get(dim) for dim in CUBE_DIMENSIONS if request.args.get(dim)}
+    group_by = tuple(
+        dim.strip() for dim in (request.args.get("group_by") or "").split(",") if dim.strip()
+    )
+    try:
+        rows = FacultyAnalyticsService.cube_rollup(filters, group_by)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"filters": filters, "group_by": list(group_by), "rows": rows}), 200
+
+
 @faculty_bp.route("/placements/student/<prn>", methods=["GET"])
 @jwt_required()
 def get_student_placement(prn):
@@ -565,33 +661,8 @@ def get_student_placement(prn):
 
 
 def _build_internship_stats_payload():
-    """Shared internship stats builder."""
-    total_internships = StudentInternship.query.count()
-
-    domain_counts = (
-        db.session.query(StudentInternship.industry_sector, func.count(StudentInternship.id))
-        .group_by(StudentInternship.industry_sector)
-        .all()
-    )
-    domain_wise = [
-        {"domain": domain or "Unknown", "count": count}
-        for domain, count in domain_counts
-    ]
-
-    paid_count = (
-        StudentInternship.query.filter(
-            StudentInternship.stipend.isnot(None),
-            StudentInternship.stipend != "",
-        ).count()
-    )
-    unpaid_count = total_internships - paid_count
-
-    return {
-        "total_internships": total_internships,
-        "domain_wise": domain_wise,
-        "paid": paid_count,
-        "unpaid": unpaid_count,
-    }
+    """Shared internship stats builder, read from the analytics snapshot."""
+    return FacultyAnalyticsService.get_internship_stats_payload()
 
 
 @faculty_bp.route("/internships/stats", methods=["GET"])
@@ -610,64 +681,133 @@ def get_internship_stats():
 @faculty_bp.route("/internships/all", methods=["GET"])
 @jwt_required()
 def get_all_internships():
-    """Detailed internship table with filters."""
+    """
+    Detailed internship table with filters. Passing limit= and/or after=
+    (the last row id of the previous page) returns a keyset-paginated page.
+    """
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
 
-    branch = (request.args.get("branch") or "").strip().lower()
-    domain = (request.args.get("domain") or "").strip().lower()
-    company = (request.args.get("company") or "").strip().lower()
-    internship_type = (request.args.get("type") or "").strip().lower()
-    paid_filter = request.args.get("paid")
+    filters = {
+        "branch": request.args.get("branch"),
+        "domain": request.args.get("domain"),
+        "company": request.args.get("company"),
+        "type": request.args.get("type"),
+        "paid": request.args.get("paid"),
+    }
+    after, limit, paginated = _page_args()
+    rows = list(_iter_internship_rows(filters, after=after, limit=limit, with_technologies=True))
+    if not paginated:
+        return jsonify(rows), 200
+
+    total = _count_rows(
+        ("internships", tuple(sorted(filters.items()))),
+        _internships_stmt(filters),
+        tables=(StudentInternship.__tablename__, StudentProfile.__tablename__),
+    )
+    return (
+        jsonify(
+            {
+                "rows": rows,
+                "total": total,
+                "limit": limit,
+                "next_cursor": rows[-1]["id"] if len(rows) == limit else None,
+            }
+        ),
+        200,
+    )
+
 
-    query = (
-        db.session.query(StudentInternship, StudentProfile)
-        .join(StudentProfile, StudentProfile.id == StudentInternship.student_id)
+FACET_TABLES = (
+    StudentProfile.__tablename__,
+    StudentOffer.__tablename__,
+    StudentInternship.__tablename__,
+    StudentSkill.__tablename__,
+    Skill.__tablename__,
+    CanonicalCompany.__tablename__,
+)
+
+# Facets change rarely; in-process writes invalidate immediately via table versions
+_facets_cache = QueryCache(default_ttl=300)
+
+
+def _facet_select(facet, value, count, *where):
+    stmt = select(
+        literal(facet).label("facet"),
+        cast(value, String).label("value"),
+        count.label("count"),
+    )
+    for clause in where:
+        stmt = stmt.where(clause)
+    return stmt.group_by(value)
+
+
+def _compute_facets():
+    """All faculty filter facets with counts, grouped in a single UNION ALL round trip."""
+    batch_year = func.extract("year", func.coalesce(StudentOffer.joining_date, StudentOffer.offer_date))
+    package = func.round(cast(StudentOffer.ctc_lpa, Numeric), 1)
+
+    stmt = union_all(
+        _facet_select("branches", StudentProfile.course, func.count(StudentProfile.id),
+                      StudentProfile.course.isnot(None)),
+        _facet_select("genders", StudentProfile.gender, func.count(StudentProfile.id),
+                      StudentProfile.gender.isnot(None)),
+        select(
+            literal("companies").label("facet"),
+            cast(CanonicalCompany.name, String).label("value"),
+            func.count(StudentOffer.id).label("count"),
+        )
+        .join(CanonicalCompany, CanonicalCompany.id == StudentOffer.company_id)
+        .group_by(StudentOffer.company_id, CanonicalCompany.name),
+        _facet_select("packages", package, func.count(StudentOffer.id),
+                      StudentOffer.ctc_lpa.isnot(None)),
+        _facet_select("batches", batch_year, func.count(StudentOffer.id),
+                      StudentOffer.status == "accepted",
+                      func.coalesce(StudentOffer.joining_date, StudentOffer.offer_date).isnot(None)),
+        _facet_select("domains", StudentInternship.industry_sector, func.count(StudentInternship.id),
+                      StudentInternship.industry_sector.isnot(None)),
+        select(
+            literal("skills").label("facet"),
+            cast(Skill.name, String).label("value"),
+            func.count(func.distinct(StudentSkill.student_id)).label("count"),
+        )
+        .join(Skill, Skill.id == StudentSkill.skill_id)
+        .group_by(Skill.name),
     )
 
-    rows = []
-    for internship, profile in query.all():
-        branch_value = (profile.course or profile.specialization or "").lower()
-        domain_value = (internship.industry_sector or "").lower()
-        company_value = (internship.organization or "").lower()
-        type_value = (internship.internship_type or "").lower()
-        is_paid = bool(internship.stipend and internship.stipend.strip())
-
-        if branch and branch_value != branch:
-            continue
-        if domain and domain_value != domain:
-            continue
-        if company and company_value != company:
-            continue
-        if internship_type and type_value != internship_type:
-            continue
-        if paid_filter == "paid" and not is_paid:
-            continue
-        if paid_filter == "unpaid" and is_paid:
+    facets = {name: [] for name in ["branches", "companies", "packages", "skills", "batches", "genders", "domains"]}
+    for facet, value, count in db.session.execute(stmt):
+        if value in (None, ""):
             continue
+        if facet == "packages":
+            value = float(value)
+        elif facet == "batches":
+            value = str(int(float(value)))
+        facets[facet].append({"value": value, "count": count})
 
-        rows.append(
-            {
-                "student_name": f"{profile.first_name} {profile.last_name}".strip(),
-                "branch": profile.course or profile.specialization,
-                "organization": internship.organization,
-                "designation": internship.designation,
-                "domain": internship.industry_sector,
-                "stipend": internship.stipend,
-                "internship_type": internship.internship_type,
-                "start_date": internship.start_date.isoformat()
-                if internship.start_date
-                else None,
-                "end_date": internship.end_date.isoformat() if internship.end_date else None,
-                "is_paid": is_paid,
-                "technologies": internship.technologies.split(",")
-                if internship.technologies
-                else [],
-            }
-        )
+    for values in facets.values():
+        values.sort(key=lambda item: item["value"])
+    return facets
 
-    return jsonify(rows), 200
+
+def _get_facets():
+    return _facets_cache.get_or_set("facets", _compute_facets, tables=FACET_TABLES)
+
+
+def _facet_values(name):
+    return [item["value"] for item in _get_facets()[name]]
+
+
+@faculty_bp.route("/filters", methods=["GET"])
+@jwt_required()
+def get_filter_facets():
+    """Every filter facet (branches, companies, packages, skills, batches, genders, domains) with counts."""
+    user, error_response, status = _ensure_faculty()
+    if error_response:
+        return error_response, status
+
+    return jsonify(_get_facets()), 200
 
 
 @faculty_bp.route("/filters/branches", methods=["GET"])
@@ -677,13 +817,7 @@ def get_filter_branches():
     if error_response:
         return error_response, status
 
-    branches = (
-        db.session.query(StudentProfile.course)
-        .filter(StudentProfile.course.isnot(None))
-        .distinct()
-        .all()
-    )
-    return jsonify(sorted([b[0] for b in branches if b[0]])), 200
+    return jsonify(_facet_values("branches")), 200
 
 
 @faculty_bp.route("/filters/companies", methods=["GET"])
@@ -693,13 +827,7 @@ def get_filter_companies():
     if error_response:
         return error_response, status
 
-    companies = (
-        db.session.query(StudentOffer.company_name)
-        .filter(StudentOffer.company_name.isnot(None))
-        .distinct()
-        .all()
-    )
-    return jsonify(sorted([c[0] for c in companies if c[0]])), 200
+    return jsonify(_facet_values("companies")), 200
 
 
 @faculty_bp.route("/filters/packages", methods=["GET"])
@@ -709,27 +837,19 @@ def get_filter_packages():
     if error_response:
         return error_response, status
 
-    ctc_values = []
-    for (ctc,) in db.session.query(StudentOffer.ctc).distinct().all():
-        value = _parse_ctc_to_lpa(ctc)
-        if value is not None:
-            ctc_values.append(value)
-    # Return sorted unique band edges
-    return jsonify(sorted(list(set(round(v, 1) for v in ctc_values)))), 200
+    # Sorted unique band edges
+    return jsonify(_facet_values("packages")), 200
 
 
 @faculty_bp.route("/filters/skills", methods=["GET"])
 @jwt_required()
 def get_filter_skills():
-    """
-    Placeholder endpoint - skills would typically come from a normalized skills table.
-    For now, return an empty list to keep the API contract.
-    """
+    """Skills held by at least one student, from the normalized StudentSkill table."""
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
 
-    return jsonify([]), 200
+    return jsonify(_facet_values("skills")), 200
 
 
 @faculty_bp.route("/filters/batches", methods=["GET"])
@@ -739,17 +859,7 @@ def get_filter_batches():
     if error_response:
         return error_response, status
 
-    years = set()
-    for offer in StudentOffer.query.filter(StudentOffer.status == "accepted").all():
-        year = None
-        if offer.joining_date:
-            year = offer.joining_date.year
-        elif offer.offer_date:
-            year = offer.offer_date.year
-        if year:
-            years.add(str(year))
-
-    return jsonify(sorted(list(years))), 200
+    return jsonify(_facet_values("batches")), 200
 
 
 @faculty_bp.route("/filters/genders", methods=["GET"])
@@ -759,13 +869,7 @@ def get_filter_genders():
     if error_response:
         return error_response, status
 
-    genders = (
-        db.session.query(StudentProfile.gender)
-        .filter(StudentProfile.gender.isnot(None))
-        .distinct()
-        .all()
-    )
-    return jsonify(sorted([g[0] for g in genders if g[0]])), 200
+    return jsonify(_facet_values("genders")), 200
 
 
 @faculty_bp.route("/filters/domains", methods=["GET"])
@@ -775,96 +879,130 @@ def get_filter_domains():
     if error_response:
         return error_response, status
 
-    domains = (
-        db.session.query(StudentInternship.industry_sector)
-        .filter(StudentInternship.industry_sector.isnot(None))
-        .distinct()
-        .all()
-    )
-    return jsonify(sorted([d[0] for d in domains if d[0]])), 200
+    return jsonify(_facet_values("domains")), 200
 
 
-def _build_report_payload(report_type: str):
-    """Compose structured report data for different report types."""
+def _placement_report_summary():
     dashboard = _build_dashboard_payload()
-    placements = _fetch_placements()
-    internships = _collect_internship_rows()
+    return {"summary": dashboard["stats"], "charts": dashboard["charts"]}
 
-    base = {
-        "generated_at": datetime.utcnow().isoformat(),
-        "report_type": report_type,
-    }
 
-    if report_type == "placement":
-        base["summary"] = dashboard["stats"]
-        base["charts"] = dashboard["charts"]
-        base["table"] = placements
-    elif report_type == "internship":
-        internship_stats = _build_internship_stats_payload()
-        base["summary"] = internship_stats
-        base["table"] = internships
-    elif report_type == "branch":
-        base["summary"] = {
+def _internship_report_summary():
+    return {"summary": _build_internship_stats_payload()}
+
+
+def _branch_report_summary():
+    dashboard = _build_dashboard_payload()
+    return {
+        "summary": {
             "branch_wise": dashboard["charts"]["branch_wise"],
             "total_students": dashboard["stats"]["total_students"],
         }
-        base["table"] = placements
-    elif report_type == "company":
-        base["summary"] = {
+    }
+
+
+def _company_report_summary():
+    dashboard = _build_dashboard_payload()
+    return {
+        "summary": {
             "company_wise": dashboard["charts"]["company_wise"],
             "total_companies": dashboard["stats"]["total_companies"],
         }
-        base["table"] = placements
-    elif report_type == "yearly":
-        base["summary"] = {
+    }
+
+
+def _yearly_report_summary():
+    dashboard = _build_dashboard_payload()
+    return {
+        "summary": {
             "batch_trends": dashboard["charts"]["batch_trends"],
             "placed_students": dashboard["stats"]["placed_students"],
         }
-        base["table"] = placements
-    else:
-        base["summary"] = dashboard["stats"]
-        base["table"] = placements
+    }
+
 
+# report_type -> (summary builder, row iterator, CSV columns). Each report only
+# computes its own summary, and the table is only materialized for JSON output.
+REPORT_BUILDERS = {
+    "placement": (_placement_report_summary, _iter_placements, PLACEMENT_COLUMNS),
+    "internship": (_internship_report_summary, _iter_internship_rows, INTERNSHIP_COLUMNS),
+    "branch": (_branch_report_summary, _iter_placements, PLACEMENT_COLUMNS),
+    "company": (_company_report_summary, _iter_placements, PLACEMENT_COLUMNS),
+    "yearly": (_yearly_report_summary, _iter_placements, PLACEMENT_COLUMNS),
+}
+
+
+def _build_report_payload(report_type: str):
+    """Compose structured report data for different report types."""
+    build_summary, iter_rows, _ = REPORT_BUILDERS[report_type]
+
+    base = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "report_type": report_type,
+    }
+    base.update(build_summary())
+    base["table"] = list(iter_rows())
     return base
 
 
-def _table_to_csv(rows, headers):
+def _stream_csv(rows, headers, compress=False):
+    """
+    Generate CSV text chunk by chunk. The header goes out before the query runs,
+    rows are pulled from a server-side cursor and flushed every few KB.
+    """
     output = io.StringIO()
     writer = csv.DictWriter(output, fieldnames=headers)
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip container
+
+    def drain():
+        data = output.getvalue().encode("utf-8")
+        output.seek(0)
+        output.truncate(0)
+        return compressor.compress(data) if compressor else data
+
     writer.writeheader()
+    yield drain()
+
     for row in rows:
         writer.writerow({key: row.get(key, "") for key in headers})
-    return output.getvalue()
+        if output.tell() >= 64 * 1024:
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
 
 
 @faculty_bp.route("/reports/<report_type>", methods=["GET"])
 @jwt_required()
 def generate_report(report_type):
-    """Return structured report data or downloadable CSV for the requested type."""
+    """
+    Return structured report data, or stream the report table as CSV
+    (format=csv) or gzip-compressed CSV (format=csv.gz).
+    """
     user, error_response, status = _ensure_faculty()
     if error_response:
         return error_response, status
 
     report_type = (report_type or "").lower()
-    if report_type not in {"placement", "internship", "branch", "company", "yearly"}:
+    if report_type not in REPORT_BUILDERS:
         return jsonify({"error": "Unsupported report type"}), 400
 
-    payload = _build_report_payload(report_type)
     export_format = (request.args.get("format") or "json").lower()
 
-    if export_format == "csv":
-        table = payload.get("table", [])
-        if not table:
-            return jsonify({"error": "No table data available for CSV export"}), 400
-        headers = list(table[0].keys())
-        csv_data = _table_to_csv(table, headers)
-        filename = f"{report_type}_report.csv"
+    if export_format in {"csv", "csv.gz"}:
+        _, iter_rows, headers = REPORT_BUILDERS[report_type]
+        compress = export_format == "csv.gz"
+        filename = f"{report_type}_report.{export_format}"
+        body = _stream_csv(iter_rows(stream=True), headers, compress=compress)
         return Response(
-            csv_data,
-            mimetype="text/csv",
+            stream_with_context(body),
+            mimetype="application/gzip" if compress else "text/csv",
             headers={"Content-Disposition": f"attachment; filename={filename}"},
         )
 
-    return jsonify(payload), 200
-
-
+    return jsonify(_build_report_payload(report_type)), 200
@@ -1,4 +1,8 @@
-from flask_jwt_extended import get_jwt_identity
+from flask import request
+from flask_jwt_extended import get_jwt_identity, decode_token
+from models import db, Notification
+
+NOTIFICATION_INSERT_CHUNK = 500  # Rows per multi-row INSERT (keeps bind params under driver limits)
 
 
 def get_user_id():
@@ -13,3 +17,50 @@ def get_user_id():
     except (TypeError, ValueError):
         return identity
 
+
+def user_room(user_id):
+    """Socket.IO room holding every connection of one user (real-time events are emitted to it)"""
+    return f'user:{user_id}'
+
+
+def socket_user_id(auth=None):
+    """
+    User id from the JWT a Socket.IO client connects with, or None when missing/invalid.
+    The token is read from the connect auth payload ({"token": ...}), a ``token`` query
+    parameter or a Bearer Authorization header.
+    """
+    token = auth.get('token') if isinstance(auth, dict) else None
+    if not token:
+        token = request.args.get('token')
+    if not token:
+        header = request.headers.get('Authorization', '')
+        token = header[7:] if header.startswith('Bearer ') else None
+    if not token:
+        return None
+    try:
+        identity = decode_token(token)['sub']
+    except Exception:
+        return None
+    try:
+        return int(identity)
+    except (TypeError, ValueError):
+        return identity
+
+
+def insert_notifications(rows):
+    """
+    Insert notification rows with multi-row INSERTs in the current transaction.
+    Returns the created rows as dicts (with ids where the dialect supports RETURNING).
+    """
+    table = Notification.__table__
+    returning = db.engine.dialect.insert_returning
+    created = []
+    for start in range(0, len(rows), NOTIFICATION_INSERT_CHUNK):
+        chunk = rows[start:start + NOTIFICATION_INSERT_CHUNK]
+        stmt = table.insert().values(chunk)
+        if returning:
+            created.extend(dict(row._mapping) for row in db.session.execute(stmt.returning(*table.c)))
+        else:
+            db.session.execute(stmt)
+            created.extend(chunk)
+    return created
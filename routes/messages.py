@@ -2,37 +2,87 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from models import db, Message, User, Application
 from datetime import datetime
-from routes.helpers import get_user_id
+from routes.helpers import get_user_id, user_room
+from sqlalchemy import select, func, case, and_, or_, tuple_
+from sqlalchemy.orm import joinedload
 
 messages_bp = Blueprint('messages', __name__)
 
+DEFAULT_MESSAGES = 50
+MAX_MESSAGES = 100
+DEFAULT_CONVERSATIONS = 50
+MAX_CONVERSATIONS = 100
+
+def _message_cursor(user_id, message_id):
+    """(created_at, id) of one of the user's messages, or None when it is not theirs"""
+    row = db.session.execute(
+        select(Message.created_at).where(
+            Message.id == message_id, or_(Message.sender_id == user_id, Message.receiver_id == user_id)
+        )
+    ).first()
+    return (row[0], message_id) if row else None
+
 @messages_bp.route('', methods=['GET'])
 @jwt_required()
 def get_messages():
+    """
+    Message history, at most ``limit`` messages per call (default 50, max 100).
+    With conversation_with the page is oldest first, otherwise newest first; by default it
+    holds the newest messages. before=<message id> pages to older messages and
+    after=<message id> to newer ones; since=<ISO datetime> returns messages created after
+    that time, for clients that only need what arrived since their last sync.
+    """
     try:
         user_id = get_user_id()
         
         # Get query parameters
-        conversation_with = request.args.get('conversation_with', None)
         message_type = request.args.get('type', None)
+        try:
+            conversation_with, before, after = (
+                int(request.args[name]) if request.args.get(name) else None
+                for name in ('conversation_with', 'before', 'after')
+            )
+            limit = min(max(int(request.args.get('limit', DEFAULT_MESSAGES)), 1), MAX_MESSAGES)
+        except ValueError:
+            return jsonify({'error': 'conversation_with, before, after and limit must be integers'}), 400
+        since = None
+        if request.args.get('since'):
+            try:
+                since = datetime.fromisoformat(request.args['since'])
+            except ValueError:
+                return jsonify({'error': 'since must be an ISO datetime'}), 400
         
         if conversation_with:
             # Get conversation between two users
-            messages = Message.query.filter(
-                ((Message.sender_id == user_id) & (Message.receiver_id == conversation_with)) |
-                ((Message.sender_id == conversation_with) & (Message.receiver_id == user_id))
-            )
-            if message_type:
-                messages = messages.filter_by(message_type=message_type)
-            messages = messages.order_by(Message.created_at.asc()).all()
+            stmt = select(Message).where(or_(
+                and_(Message.sender_id == user_id, Message.receiver_id == conversation_with),
+                and_(Message.sender_id == conversation_with, Message.receiver_id == user_id)
+            ))
         else:
             # Get all messages for user
-            messages = Message.query.filter(
-                (Message.sender_id == user_id) | (Message.receiver_id == user_id)
-            )
-            if message_type:
-                messages = messages.filter_by(message_type=message_type)
-            messages = messages.order_by(Message.created_at.desc()).all()
+            stmt = select(Message).where(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+        if message_type:
+            stmt = stmt.where(Message.message_type == message_type)
+        
+        position = tuple_(Message.created_at, Message.id)
+        forward = after is not None or since is not None
+        for message_id, newer in ((before, False), (after, True)):
+            if message_id is None:
+                continue
+            cursor = _message_cursor(user_id, message_id)
+            if cursor is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            stmt = stmt.where(position > tuple_(*cursor) if newer else position < tuple_(*cursor))
+        if since is not None:
+            stmt = stmt.where(Message.created_at > since)
+        
+        order = (Message.created_at.asc(), Message.id.asc()) if forward else (Message.created_at.desc(), Message.id.desc())
+        messages = db.session.execute(
+            stmt.options(joinedload(Message.sender), joinedload(Message.receiver)).order_by(*order).limit(limit)
+        ).scalars().all()
+        # Conversations read oldest first, the inbox newest first
+        if forward != bool(conversation_with):
+            messages.reverse()
         
         return jsonify([msg.to_dict() for msg in messages]), 200
     
@@ -88,7 +138,7 @@ def send_message():
             socketio.emit('new_message', {
                 'message': message.to_dict(),
                 'receiver_id': receiver_id
-            })
+            }, to=user_room(receiver_id))
         except Exception:
             pass  # SocketIO not available, continue without real-time update
         
@@ -126,45 +176,58 @@ def mark_as_read(msg_id):
 @messages_bp.route('/conversations', methods=['GET'])
 @jwt_required()
 def get_conversations():
+    """
+    Inbox: one entry per conversation partner, most recent conversation first.
+    Pages with limit=N&before=<last_message.id of the last conversation seen>.
+    """
     try:
         user_id = get_user_id()
-        
-        # Get unique conversations
-        sent_messages = db.session.query(Message.receiver_id).filter_by(sender_id=user_id).distinct().all()
-        received_messages = db.session.query(Message.sender_id).filter_by(receiver_id=user_id).distinct().all()
-        
-        user_ids = set()
-        for msg in sent_messages:
-            user_ids.add(msg[0])
-        for msg in received_messages:
-            user_ids.add(msg[0])
+        try:
+            limit = min(max(int(request.args.get('limit', DEFAULT_CONVERSATIONS)), 1), MAX_CONVERSATIONS)
+            before = int(request.args['before']) if request.args.get('before') else None
+        except ValueError:
+            return jsonify({'error': 'limit and before must be integers'}), 400
+        
+        # Number each conversation's messages newest first; a conversation is the unordered
+        # (least, greatest) participant pair, and unread counts come from the same window
+        low = case((Message.sender_id < Message.receiver_id, Message.sender_id), else_=Message.receiver_id)
+        high = case((Message.sender_id < Message.receiver_id, Message.receiver_id), else_=Message.sender_id)
+        unread = case((and_(Message.receiver_id == user_id, Message.is_read.is_(False)), 1), else_=0)
+        ranked = select(
+            Message.id,
+            Message.created_at,
+            func.row_number().over(
+                partition_by=(low, high), order_by=(Message.created_at.desc(), Message.id.desc())
+            ).label('position'),
+            func.sum(unread).over(partition_by=(low, high)).label('unread_count'),
+        ).where(or_((Message.sender_id == user_id), (Message.receiver_id == user_id))).subquery()
+        
+        stmt = (
+            select(Message, ranked.c.unread_count)
+            .join(ranked, ranked.c.id == Message.id)
+            .where(ranked.c.position == 1)
+            .options(joinedload(Message.sender), joinedload(Message.receiver))
+        )
+        if before is not None:
+            cursor = _message_cursor(user_id, before)
+            if cursor is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            stmt = stmt.where(tuple_(ranked.c.created_at, ranked.c.id) < tuple_(*cursor))
+        rows = db.session.execute(
+            stmt.order_by(ranked.c.created_at.desc(), ranked.c.id.desc()).limit(limit)
+        ).all()
         
         conversations = []
-        for other_user_id in user_ids:
-            other_user = User.query.get(other_user_id)
+        for last_message, unread_count in rows:
+            other_user = last_message.receiver if last_message.sender_id == user_id else last_message.sender
             if other_user:
-                last_message = Message.query.filter(
-                    ((Message.sender_id == user_id) & (Message.receiver_id == other_user_id)) |
-                    ((Message.sender_id == other_user_id) & (Message.receiver_id == user_id))
-                ).order_by(Message.created_at.desc()).first()
-                
-                unread_count = Message.query.filter_by(
-                    sender_id=other_user_id,
-                    receiver_id=user_id,
-                    is_read=False
-                ).count()
-                
                 conversations.append({
                     'user': other_user.to_dict(),
-                    'last_message': last_message.to_dict() if last_message else None,
-                    'unread_count': unread_count
+                    'last_message': last_message.to_dict(),
+                    'unread_count': int(unread_count or 0)
                 })
         
-        # Sort by last message time
-        conversations.sort(key=lambda x: x['last_message']['created_at'] if x['last_message'] else '', reverse=True)
-        
         return jsonify(conversations), 200
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from models import db, Notification, User
 from datetime import datetime, timedelta
-from routes.helpers import get_user_id
+from routes.helpers import get_user_id, user_room
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -48,7 +48,7 @@ def mark_notification_read(notif_id):
         try:
             from app import get_socketio
             socketio = get_socketio()
-            socketio.emit('notification_read', {'notification_id': notif_id, 'user_id': user_id})
+            socketio.emit('notification_read', {'notification_id': notif_id, 'user_id': user_id}, to=user_room(user_id))
         except Exception:
             pass  # SocketIO not available, continue without real-time update
         
@@ -71,7 +71,7 @@ def mark_all_read():
         try:
             from app import get_socketio
             socketio = get_socketio()
-            socketio.emit('all_notifications_read', {'user_id': user_id})
+            socketio.emit('all_notifications_read', {'user_id': user_id}, to=user_room(user_id))
         except Exception:
             pass  # SocketIO not available, continue without real-time update
         
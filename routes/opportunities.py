@@ -1,12 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
-from models import db, Opportunity, Application, StudentProfile, User
+from models import db, Opportunity, Application, StudentProfile, User, OpportunityCounterShard
 from datetime import datetime
 import json
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import joinedload
 from routes.helpers import get_user_id
+from opportunity_search import OpportunitySearchService
+from view_counter import opportunity_views
+from query_cache import QueryCache
+from response_cache import cached_response, ANONYMOUS
+from application_counter import ApplicationCounter
 
 opportunities_bp = Blueprint('opportunities', __name__)
 
+MAX_PAGE_SIZE = 100
+
+# Cached listing totals per filter combination (invalidated when opportunities change)
+_listing_totals = QueryCache(default_ttl=60)
+
+# How long another worker's opportunity writes can go unnoticed by the HTTP validators
+STATE_TTL_SECONDS = 5
+# Writes to these tables in this process drop cached response bodies immediately
+CACHED_RESPONSE_TABLES = ('opportunities', 'company_profiles', 'opportunity_counter_shards')
+
 def get_optional_user_id():
     """Helper function to get user ID from JWT token if present, returns None if not"""
     try:
@@ -24,8 +41,65 @@ def get_optional_user_id():
         # If token is invalid or missing, return None (anonymous user)
         return None
 
+def _student_profile_id(user_id):
+    """Student profile id for a student user, else None (one query, no ORM loads)"""
+    if not user_id:
+        return None
+    return db.session.execute(
+        select(StudentProfile.id)
+        .join(User, User.id == StudentProfile.user_id)
+        .where(User.id == user_id, User.role == 'student')
+    ).scalar()
+
+def _opportunity_state():
+    """
+    (max updated_at, row count, unfolded application count, flushed view count)
+    of the opportunities, cached until they change
+    """
+    def load():
+        last_modified, count, views = db.session.execute(
+            select(func.max(Opportunity.updated_at), func.count(Opportunity.id), func.sum(Opportunity.views_count))
+        ).one()
+        applications = db.session.execute(select(func.sum(OpportunityCounterShard.applications))).scalar() or 0
+        return last_modified, count, applications, views or 0
+    return _listing_totals.get_or_set(
+        ('state',), load, ttl=STATE_TTL_SECONDS, tables=('opportunities', 'opportunity_counter_shards'),
+    )
+
+def _response_variant():
+    """Anonymous requests share one cached variant; authenticated users get their own"""
+    user_id = get_optional_user_id()
+    return str(user_id) if user_id else ANONYMOUS
+
+def _response_validator(variant):
+    """
+    Last-Modified and version token for opportunity responses. Students' variants
+    also track their own applications, which drive has_applied.
+    """
+    last_modified, count, applications, views = _opportunity_state()
+    # View flushes keep updated_at, so bodies carrying views_count are versioned by the
+    # flushed view total plus this process's recorded views (both only grow)
+    token = (f"{last_modified.isoformat() if last_modified else ''}:{count}:{applications}"
+             f":{views}:{opportunity_views.recorded()}")
+    if variant != ANONYMOUS:
+        student_id = _student_profile_id(int(variant))
+        if student_id:
+            applied, applied_updated_at = db.session.execute(
+                select(func.count(Application.id), func.max(Application.updated_at))
+                .where(Application.student_id == student_id)
+            ).one()
+            token += f":{applied}:{applied_updated_at.isoformat() if applied_updated_at else ''}"
+            last_modified = max(filter(None, (last_modified, applied_updated_at)), default=None)
+    return last_modified, token
+
 @opportunities_bp.route('', methods=['GET'])
+@cached_response(_response_validator, variant=_response_variant, tables=CACHED_RESPONSE_TABLES)
 def get_opportunities():
+    """
+    Public listing, newest first. Pages either by page/per_page or, for deep
+    scrolling, by keyset: limit=N&after=<id of the last item seen>, following
+    pagination.next_cursor.
+    """
     try:
         # Get user ID if authenticated (optional)
         user_id = get_optional_user_id()
@@ -34,52 +108,98 @@ def get_opportunities():
         domain = request.args.get('domain', None)
         work_type = request.args.get('work_type', None)
         search = request.args.get('search', None)
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
+        # sort=relevance orders full-text matches by rank instead of recency
+        ranked = bool(search) and request.args.get('sort') == 'relevance'
+        keyset = 'after' in request.args or 'limit' in request.args
+        try:
+            page = max(int(request.args.get('page', 1)), 1)
+            per_page = int(request.args.get('limit' if keyset else 'per_page', 20))
+            after = request.args.get('after', type=int) if keyset else None
+        except ValueError:
+            return jsonify({'error': 'page, per_page and limit must be integers'}), 400
+        per_page = min(max(per_page, 1), MAX_PAGE_SIZE)
         
         # Base query - only approved and active opportunities
-        query = Opportunity.query.filter_by(is_active=True, is_approved=True)
+        conditions = [Opportunity.is_active.is_(True), Opportunity.is_approved.is_(True)]
         
         # Apply filters
         if domain:
-            query = query.filter_by(domain=domain)
+            conditions.append(Opportunity.domain == domain)
         if work_type:
-            query = query.filter_by(work_type=work_type)
+            conditions.append(Opportunity.work_type == work_type)
+        matches = None
+        search_terms = ()
         if search:
-            query = query.filter(
-                (Opportunity.title.contains(search)) |
-                (Opportunity.description.contains(search))
-            )
-        
-        # Pagination
-        pagination = query.order_by(Opportunity.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+            search_terms = tuple(OpportunitySearchService.parse_terms(search))
+            # Full-text index (prefix match on every term); LIKE when the index is unavailable
+            matches = OpportunitySearchService.matches(search, ranked=ranked)
+            if matches is None:
+                condition = OpportunitySearchService.like_condition(search)
+                if condition is not None:
+                    conditions.append(condition)
+        ranked = ranked and matches is not None
+        
+        stmt = select(Opportunity).where(*conditions)
+        if matches is not None:
+            stmt = stmt.join(matches, matches.c.id == Opportunity.id)
+        
+        # Total per filter combination, cached until the opportunities table changes
+        total = _listing_totals.get_or_set(
+            ('opportunities', domain, work_type, search_terms),
+            lambda: db.session.execute(select(func.count()).select_from(stmt.subquery())).scalar() or 0,
+            tables=('opportunities',),
         )
         
-        opportunities = pagination.items
+        sort_key = matches.c.rank if ranked else Opportunity.created_at
+        if after is not None:
+            anchor = select(sort_key).where(Opportunity.id == after)
+            if ranked:
+                anchor = select(matches.c.rank).where(matches.c.id == after)
+            anchor_value = db.session.execute(anchor).first()
+            if anchor_value is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            stmt = stmt.where(tuple_(sort_key, Opportunity.id) < tuple_(anchor_value[0], after))
         
-        # Check if user has applied (if authenticated)
+        stmt = stmt.options(joinedload(Opportunity.company)).order_by(sort_key.desc(), Opportunity.id.desc())
+        if ranked:
+            stmt = stmt.add_columns(matches.c.rank)
+        if not keyset:
+            stmt = stmt.offset((page - 1) * per_page)
+        rows = db.session.execute(stmt.limit(per_page)).all()
+        opportunities = [row[0] for row in rows]
+        ranks = {row[0].id: row[1] for row in rows} if ranked else None
+        
+        # Check if user has applied (if authenticated) - only for the ids on this page
         applied_opp_ids = set()
-        if user_id:
-            user = User.query.get(user_id)
-            if user and user.role == 'student' and user.student_profile:
-                applications = Application.query.filter_by(student_id=user.student_profile.id).all()
-                applied_opp_ids = {app.opportunity_id for app in applications}
+        student_id = _student_profile_id(user_id)
+        if student_id and opportunities:
+            applied_opp_ids = set(db.session.execute(
+                select(Application.opportunity_id).where(
+                    Application.student_id == student_id,
+                    Application.opportunity_id.in_([opp.id for opp in opportunities])
+                )
+            ).scalars())
         
         result = []
         for opp in opportunities:
             opp_dict = opp.to_dict()
             opp_dict['has_applied'] = opp.id in applied_opp_ids
+            if ranks is not None:
+                opp_dict['search_rank'] = round(float(ranks[opp.id] or 0), 4)
             result.append(opp_dict)
+        ApplicationCounter.add_pending(result)
         
+        pagination = {
+            'per_page': per_page,
+            'total': total,
+            'pages': -(-total // per_page),
+            'next_cursor': opportunities[-1].id if len(opportunities) == per_page else None
+        }
+        if not keyset:
+            pagination['page'] = page
         return jsonify({
             'opportunities': result,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
-            }
+            'pagination': pagination
         }), 200
     
     except Exception as e:
@@ -87,6 +207,14 @@ def get_opportunities():
 
 @opportunities_bp.route('/<int:opp_id>', methods=['GET'])
 def get_opportunity(opp_id):
+    response = _opportunity_detail(opp_id)
+    # Cached and 304 responses are still views; count only postings that exist
+    if response.status_code in (200, 304):
+        opportunity_views.record(opp_id)
+    return response
+
+@cached_response(_response_validator, variant=_response_variant, tables=CACHED_RESPONSE_TABLES)
+def _opportunity_detail(opp_id):
     try:
         # Get user ID if authenticated (optional)
         user_id = get_optional_user_id()
@@ -98,11 +226,9 @@ def get_opportunity(opp_id):
         if not opportunity.is_active or not opportunity.is_approved:
             return jsonify({'error': 'Opportunity not available'}), 404
         
-        # Increment view count
-        opportunity.views_count += 1
-        db.session.commit()
-        
         opp_dict = opportunity.to_dict()
+        opp_dict['views_count'] = (opportunity.views_count or 0) + opportunity_views.pending(opp_id)
+        ApplicationCounter.add_pending([opp_dict])
         
         # Check if user has applied (if authenticated)
         if user_id:
@@ -126,6 +252,7 @@ def get_opportunity(opp_id):
         return jsonify({'error': str(e)}), 500
 
 @opportunities_bp.route('/domains', methods=['GET'])
+@cached_response(_response_validator, tables=CACHED_RESPONSE_TABLES)
 def get_domains():
     try:
         domains = db.session.query(Opportunity.domain).distinct().filter_by(is_approved=True).all()
@@ -29,6 +29,7 @@ import json
 from routes.helpers import get_user_id
 from supabase_storage import is_supabase_configured, upload_file_to_supabase
 from skills_matching import SkillsMatchingService
+from application_counter import ApplicationCounter
 from models import Skill, StudentSkill, OpportunitySkill, ExternalJob, ExternalJobSkill
 
 student_bp = Blueprint('student', __name__)
@@ -1162,7 +1163,7 @@ def get_dashboard():
         return jsonify({
             'profile': profile.to_dict(),
             'applications': [app.to_dict() for app in applications],
-            'recommended_opportunities': [opp.to_dict() for opp in recommended],
+            'recommended_opportunities': ApplicationCounter.add_pending([opp.to_dict() for opp in recommended]),
             'notifications': [notif.to_dict() for notif in notifications],
             'stats': {
                 'total_applications': len(applications),
@@ -1564,7 +1565,7 @@ def get_opportunity_match(opportunity_id):
         match_data = SkillsMatchingService.calculate_match_score(profile.id, opportunity_id)
         
         return jsonify({
-            'opportunity': opportunity.to_dict(),
+            'opportunity': ApplicationCounter.add_pending([opportunity.to_dict()])[0],
             'match_data': match_data,
             'can_apply': match_data['match_percentage'] >= 70.0
         }), 200
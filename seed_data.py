@@ -4,6 +4,7 @@ Run this after setting up the database: python seed_data.py
 """
 from app import app, db
 from models import User, StudentProfile, CompanyProfile, Opportunity, Application, Notification
+from application_counter import ApplicationCounter
 from datetime import datetime, timedelta
 import json
 import random
@@ -254,7 +255,7 @@ def create_dummy_data():
                         ai_score=random.uniform(70, 95)
                     )
                     db.session.add(application)
-                    opp.applications_count += 1
+                    ApplicationCounter.increment({opp.id: 1})
                     print(f"✓ Created application: {student_profile.first_name} applied to {opp.title}")
 
         db.session.commit()
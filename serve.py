@@ -0,0 +1,95 @@
+"""
+Serve - production run mode with several eventlet workers
+
+Starts --workers processes, each running the app under eventlet on its own port
+(--port, --port + 1, ...). Socket.IO emits travel through the message queue in
+SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0; any URL Flask-SocketIO
+accepts), so an event emitted by one worker reaches the rooms of clients
+connected to any other. Without a queue URL, several workers share the local
+stand-in from socket_queue. Put the workers behind a proxy with sticky sessions
+(e.g. nginx ip_hash), which Socket.IO long-polling requires.
+
+Usage: python serve.py [--workers 4] [--host 0.0.0.0] [--port 5000] [--queue-port 6390]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+
+def run_worker(host, port):
+    """One worker process: eventlet must patch the standard library before the app is imported"""
+    import eventlet
+    eventlet.monkey_patch()
+
+    from app import app, socketio
+    from background_tasks import maintenance
+    maintenance.start(app)
+    socketio.run(app, host=host, port=port, debug=False, use_reloader=False, log_output=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the portal with several eventlet workers')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000, help='Port of the first worker')
+    parser.add_argument('--queue-port', type=int, default=6390, help='Port of the local message queue stand-in')
+    parser.add_argument('--worker-port', type=int, help=argparse.SUPPRESS)  # Set for the worker processes
+    args = parser.parse_args()
+    os.environ.setdefault('EVENTLET_NO_GREENDNS', 'yes')  # See app.py; workers import eventlet before the app
+
+    if args.worker_port:
+        run_worker(args.host, args.worker_port)
+        return 0
+
+    env = dict(os.environ)
+    local_queue = None
+    if not env.get('SOCKETIO_MESSAGE_QUEUE') and args.workers > 1:
+        from socket_queue import LocalMessageQueue
+        local_queue = LocalMessageQueue(port=args.queue_port).start()
+        env['SOCKETIO_MESSAGE_QUEUE'] = local_queue.url
+        print(f"⚠️  SOCKETIO_MESSAGE_QUEUE not set, using the local message queue at {local_queue.url}")
+
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+
+    workers = []
+    for index in range(args.workers):
+        port = args.port + index
+        workers.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--host', args.host, '--worker-port', str(port)], env=env
+        ))
+        print(f"✅ Worker {index} (pid {workers[-1].pid}) on {args.host}:{port}")
+
+    def stop(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    exit_code = 0
+    try:
+        # A worker that dies takes the others down so a supervisor can restart the whole set
+        while all(worker.poll() is None for worker in workers):
+            time.sleep(1)
+        exit_code = next(worker.returncode for worker in workers if worker.returncode is not None) or 1
+        print(f"❌ A worker exited with code {exit_code}, stopping")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+        if local_queue:
+            local_queue.stop()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,11 @@ from models import (
     db, StudentProfile, Opportunity, ExternalJob,
     Skill, StudentSkill, OpportunitySkill, ExternalJobSkill
 )
-from typing import List, Dict, Tuple, Optional
-from sqlalchemy import func, and_, or_
+from typing import List, Dict, Tuple, Optional, Iterable
+from datetime import datetime
+import json
+from sqlalchemy import func, and_, or_, select
+from db_utils import dialect_insert, supports_on_conflict
 
 
 class SkillsMatchingService:
@@ -79,6 +82,105 @@ class SkillsMatchingService:
         
         return skill
     
+    @staticmethod
+    def resolve_skills(skill_names: Iterable[str]) -> Dict[str, int]:
+        """
+        Resolve many skill names to skill ids in a fixed number of queries,
+        creating the missing skills with one multi-row insert. Matching follows
+        get_or_create_skill. Keys are the stripped input names.
+        """
+        names = {name.strip() for name in skill_names if name and name.strip()}
+        if not names:
+            return {}
+        
+        normalized = {name: SkillsMatchingService.normalize_skill_name(name) for name in names}
+        keys = set(normalized.values()) | {name.lower() for name in names}
+        
+        def lookup():
+            by_normalized, by_name = {}, {}
+            for skill_id, name, normalized_name in db.session.execute(
+                select(Skill.id, func.lower(Skill.name), func.lower(Skill.normalized_name))
+                .where(or_(func.lower(Skill.normalized_name).in_(keys), func.lower(Skill.name).in_(keys)))
+            ):
+                if normalized_name:
+                    by_normalized.setdefault(normalized_name, skill_id)
+                by_name.setdefault(name, skill_id)
+            resolved = {}
+            for name in names:
+                skill_id = (by_normalized.get(normalized[name]) or by_name.get(normalized[name])
+                            or by_name.get(name.lower()))
+                if skill_id:
+                    resolved[name] = skill_id
+            return resolved
+        
+        resolved = lookup()
+        missing = {}
+        for name in sorted(names - set(resolved)):
+            missing.setdefault(name.lower(), name)  # One new skill per case-insensitive name
+        if not missing:
+            return resolved
+        
+        now = datetime.utcnow()
+        rows = [
+            {'name': name, 'normalized_name': Skill._normalize_skill_name(name), 'created_at': now}
+            for name in missing.values()
+        ]
+        bind = db.session.connection()
+        stmt = dialect_insert(Skill.__table__, bind).values(rows)
+        if supports_on_conflict(bind):
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Skill.__table__.c.name])
+        db.session.execute(stmt)
+        return lookup()
+    
+    @staticmethod
+    def backfill_opportunity_skills(batch_size: int = 500) -> int:
+        """
+        Create OpportunitySkill rows for opportunities that only have the legacy
+        required_skills JSON. Returns the number of opportunities backfilled.
+        """
+        backfilled = 0
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(Opportunity.id, Opportunity.required_skills)
+                .where(
+                    Opportunity.id > last_id,
+                    Opportunity.required_skills.isnot(None),
+                    ~select(OpportunitySkill.id).where(OpportunitySkill.opportunity_id == Opportunity.id).exists(),
+                )
+                .order_by(Opportunity.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return backfilled
+            last_id = rows[-1].id
+            
+            skills_by_opportunity = {}
+            for opportunity_id, required_skills in rows:
+                try:
+                    names = json.loads(required_skills) or []
+                except ValueError:
+                    continue
+                if isinstance(names, list):
+                    skills_by_opportunity[opportunity_id] = [str(name).strip() for name in names if name]
+            
+            skill_ids = SkillsMatchingService.resolve_skills(
+                name for names in skills_by_opportunity.values() for name in names
+            )
+            now = datetime.utcnow()
+            links = []
+            for opportunity_id, names in skills_by_opportunity.items():
+                linked = {skill_ids[name] for name in names if name in skill_ids}
+                links.extend(
+                    {'opportunity_id': opportunity_id, 'skill_id': skill_id,
+                     'is_required': True, 'priority': 1, 'created_at': now}
+                    for skill_id in linked
+                )
+                backfilled += bool(linked)
+            if links:
+                db.session.execute(OpportunitySkill.__table__.insert(), links)
+            db.session.commit()
+    
     @staticmethod
     def update_student_skills(student_id: int, skill_names: List[str], 
                              proficiency_levels: Dict[str, str] = None) -> List[StudentSkill]:
@@ -0,0 +1,191 @@
+"""
+Socket Queue - local stand-in for the Socket.IO message queue
+
+With several workers, Flask-SocketIO publishes every emit on a message queue
+(SOCKETIO_MESSAGE_QUEUE) and each worker delivers it to the clients connected to
+it. Production points that at Redis. LocalMessageQueue speaks the subset of the
+Redis protocol, RESP2 and RESP3, that the Socket.IO Redis manager uses (HELLO,
+PING, SUBSCRIBE, UNSUBSCRIBE, PUBLISH), so the same redis:// URL works in
+development, tests and benchmarks without a Redis server. It keeps nothing:
+messages go to current subscribers only.
+
+Usage: python socket_queue.py [--host 127.0.0.1] [--port 6390]
+"""
+import argparse
+import socketserver
+import sys
+import threading
+
+
+DEFAULT_PORT = 6390
+
+
+def _bulk(value):
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, str):
+        value = value.encode()
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _array(*items, kind=b'*'):
+    parts = [kind + b'%d\r\n' % len(items)]
+    for item in items:
+        parts.append(b':%d\r\n' % item if isinstance(item, int) else _bulk(item))
+    return b''.join(parts)
+
+
+def _map(pairs, protocol):
+    """RESP3 map, or the flat key/value array RESP2 uses instead"""
+    flat = [item for pair in pairs for item in pair]
+    if protocol == 3:
+        return b'%%%d\r\n' % len(pairs) + _array(*flat)[len(b'*%d\r\n' % len(flat)):]
+    return _array(*flat)
+
+
+class _Connection(socketserver.StreamRequestHandler):
+    """One client connection; subscribed connections also receive published messages"""
+
+    def setup(self):
+        super().setup()
+        self.channels = set()
+        self.write_lock = threading.Lock()
+        self.protocol = 2
+
+    def push(self, *items):
+        """Pub/sub frame: an array in RESP2, a push in RESP3"""
+        return _array(*items, kind=b'>' if self.protocol == 3 else b'*')
+
+    def send(self, data):
+        with self.write_lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def read_command(self):
+        """Next command as a list of bytes arguments (RESP array or inline), None at EOF"""
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        queue = self.server.queue
+        try:
+            while True:
+                args = self.read_command()
+                if args is None:
+                    break
+                if not args:
+                    continue
+                command = args[0].upper()
+                if command == b'HELLO':
+                    if len(args) > 1:
+                        self.protocol = 3 if args[1] == b'3' else 2
+                    self.send(_map([(b'server', b'redis'), (b'version', b'7.0.0'), (b'proto', self.protocol),
+                                    (b'mode', b'standalone')], self.protocol))
+                elif command == b'PING':
+                    self.send(self.push(b'pong', b'') if self.channels and self.protocol == 2 else b'+PONG\r\n')
+                elif command == b'SUBSCRIBE':
+                    for channel in args[1:]:
+                        self.channels.add(channel)
+                        queue.subscribe(channel, self)
+                        self.send(self.push(b'subscribe', channel, len(self.channels)))
+                elif command == b'UNSUBSCRIBE':
+                    for channel in args[1:] or sorted(self.channels) or [None]:
+                        if channel is not None:
+                            self.channels.discard(channel)
+                            queue.unsubscribe(channel, self)
+                        self.send(self.push(b'unsubscribe', channel, len(self.channels)))
+                elif command == b'PUBLISH' and len(args) == 3:
+                    self.send(b':%d\r\n' % queue.publish(args[1], args[2]))
+                elif command == b'QUIT':
+                    self.send(b'+OK\r\n')
+                    break
+                elif command in (b'SELECT', b'CLIENT', b'AUTH'):
+                    self.send(b'+OK\r\n')  # Connection setup sent by redis clients
+                else:
+                    self.send(b'-ERR unknown command\r\n')
+        except (OSError, ValueError):
+            pass  # Client went away or sent something that is not RESP
+        finally:
+            for channel in self.channels:
+                queue.unsubscribe(channel, self)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalMessageQueue:
+    """In-process Redis-compatible pub/sub broker (see module docstring)"""
+
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return f'redis://{self.host}:{self.port}/0'
+
+    def start(self):
+        """Listen in a daemon thread (port 0 picks a free port); returns self"""
+        self._server = _Server((self.host, self.port), _Connection)
+        self._server.queue = self
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='socket-queue', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def subscribe(self, channel, connection):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(connection)
+
+    def unsubscribe(self, channel, connection):
+        with self._lock:
+            self._subscribers.get(channel, set()).discard(connection)
+
+    def publish(self, channel, message):
+        """Deliver to every current subscriber of ``channel``; returns how many received it"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        delivered = 0
+        for connection in subscribers:
+            try:
+                connection.send(connection.push(b'message', channel, message))
+                delivered += 1
+            except OSError:
+                self.unsubscribe(channel, connection)
+        return delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Redis-compatible message queue for Socket.IO workers')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    queue = LocalMessageQueue(args.host, args.port).start()
+    print(f"Socket.IO message queue listening on {queue.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        queue.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
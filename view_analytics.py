@@ -0,0 +1,241 @@
+"""
+View Analytics - daily opportunity views and their weekly / monthly rollups
+
+The view counter flush adds each batch of detail page views to
+``opportunity_views_daily`` with one upsert. A compaction job, run from the
+maintenance thread (background_tasks.py) every VIEW_ROLLUP_COMPACT_SECONDS,
+folds the recent daily rows and application counts into
+``opportunity_view_rollups``; analytics reads never compact. Company analytics read a bounded
+number of rollup rows through the (company_id, period, period_start) index.
+"""
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from models import db, Opportunity, Application, OpportunityViewDaily, OpportunityViewRollup
+from db_utils import dialect_insert, supports_on_conflict
+
+
+PERIODS = ('week', 'month')
+DEFAULT_COMPACT_SECONDS = 300
+COMPACT_LOOKBACK_DAYS = 7  # Late views and applications are folded in for this long
+UPSERT_CHUNK = 500
+
+_last_compacted = {'at': 0.0}
+
+
+def period_start(day: date, period: str) -> date:
+    """First day of the week (Monday) or month containing ``day``"""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def previous_period_start(start: date, period: str, count: int = 1) -> date:
+    """Start of the period ``count`` periods before the one starting at ``start``"""
+    if period == 'week':
+        return start - timedelta(weeks=count)
+    months = start.year * 12 + start.month - 1 - count
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _as_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _upsert(connection, table, rows, index_elements, columns, increment=False):
+    """Multi-row INSERT that, on conflict, overwrites ``columns`` (or adds to them when ``increment``)"""
+    if not rows:
+        return
+    if supports_on_conflict(connection):
+        for start in range(0, len(rows), UPSERT_CHUNK):
+            stmt = dialect_insert(table, connection).values(rows[start:start + UPSERT_CHUNK])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={
+                    name: table.c[name] + stmt.excluded[name] if increment else stmt.excluded[name]
+                    for name in columns
+                },
+            )
+            connection.execute(stmt)
+        return
+    for row in rows:
+        key = [table.c[name] == row[name] for name in index_elements]
+        existing = connection.execute(select(table.c.id).where(*key)).first()
+        if existing is None:
+            connection.execute(table.insert().values(row))
+        else:
+            connection.execute(table.update().where(table.c.id == existing.id).values({
+                name: table.c[name] + row[name] if increment else row[name] for name in columns
+            }))
+
+
+class ViewAnalyticsService:
+    """Daily view storage, rollup compaction and company view/conversion series"""
+
+    @staticmethod
+    def record_daily(connection, day_counts: Dict[Tuple[int, date], int]):
+        """Add {(opportunity id, day): views} to the daily table in one upsert per chunk"""
+        rows = [
+            {'opportunity_id': opportunity_id, 'day': day, 'views': views}
+            for (opportunity_id, day), views in day_counts.items()
+        ]
+        _upsert(connection, OpportunityViewDaily.__table__, rows, ['opportunity_id', 'day'], ['views'], increment=True)
+
+    @staticmethod
+    def _compact_interval():
+        try:
+            return float(current_app.config.get('VIEW_ROLLUP_COMPACT_SECONDS', DEFAULT_COMPACT_SECONDS))
+        except (TypeError, ValueError):
+            return DEFAULT_COMPACT_SECONDS
+
+    @staticmethod
+    def compact_if_due() -> Optional[int]:
+        """Run compact() when the last run in this process is older than the compaction interval"""
+        if time.monotonic() - _last_compacted['at'] < ViewAnalyticsService._compact_interval():
+            return None
+        return ViewAnalyticsService.compact()
+
+    @staticmethod
+    def compact(full: bool = False, today: date = None) -> int:
+        """
+        Recompute week and month rollups for every period overlapping the last
+        COMPACT_LOOKBACK_DAYS (or all history when ``full``). Idempotent; returns
+        the number of rollup rows written.
+        """
+        today = today or datetime.utcnow().date()
+        if full:
+            earliest = [
+                db.session.execute(select(func.min(OpportunityViewDaily.day))).scalar(),
+                db.session.execute(select(func.min(Application.applied_at))).scalar(),
+            ]
+            earliest = [_as_date(value) for value in earliest if value is not None]
+            since = min(earliest) if earliest else today
+        else:
+            since = today - timedelta(days=COMPACT_LOOKBACK_DAYS)
+        # Each period is rebuilt from its own first whole period; reading from the
+        # earliest of them would start a week bucket mid-week when the month
+        # start is earlier, and its partial sum would overwrite the full row
+        period_since = {period: period_start(since, period) for period in PERIODS}
+        since = min(period_since.values())
+
+        buckets = {}  # (opportunity id, period, period start) -> [views, applications]
+
+        def add(opportunity_id, day, index, amount):
+            for period in PERIODS:
+                start = period_start(day, period)
+                if start >= period_since[period]:
+                    buckets.setdefault((opportunity_id, period, start), [0, 0])[index] += amount
+
+        for opportunity_id, day, views in db.session.execute(
+            select(OpportunityViewDaily.opportunity_id, OpportunityViewDaily.day, OpportunityViewDaily.views)
+            .where(OpportunityViewDaily.day >= since)
+        ):
+            add(opportunity_id, _as_date(day), 0, views)
+
+        applied_day = func.date(Application.applied_at)
+        for opportunity_id, day, count in db.session.execute(
+            select(Application.opportunity_id, applied_day, func.count(Application.id))
+            .where(Application.applied_at >= datetime.combine(since, datetime.min.time()))
+            .group_by(Application.opportunity_id, applied_day)
+        ):
+            add(opportunity_id, _as_date(day), 1, count)
+
+        opportunity_ids = sorted({key[0] for key in buckets})
+        companies = {}
+        for start in range(0, len(opportunity_ids), UPSERT_CHUNK):
+            companies.update(db.session.execute(
+                select(Opportunity.id, Opportunity.company_id)
+                .where(Opportunity.id.in_(opportunity_ids[start:start + UPSERT_CHUNK]))
+            ).all())
+
+        now = datetime.utcnow()
+        rows = [
+            {'opportunity_id': opportunity_id, 'company_id': companies[opportunity_id], 'period': period,
+             'period_start': start, 'views': views, 'applications': applications, 'updated_at': now}
+            for (opportunity_id, period, start), (views, applications) in buckets.items()
+            if opportunity_id in companies
+        ]
+        _upsert(db.session.connection(), OpportunityViewRollup.__table__, rows,
+                ['opportunity_id', 'period', 'period_start'],
+                ['company_id', 'views', 'applications', 'updated_at'])
+        db.session.commit()
+        _last_compacted['at'] = time.monotonic()
+        return len(rows)
+
+    @staticmethod
+    def company_series(company_id: int, period: str = 'week', periods: int = 12,
+                       opportunity_id: int = None, today: date = None) -> dict:
+        """
+        Views, applications and view-to-application conversion for a company's
+        last ``periods`` weeks or months, read from the rollups only.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of: {', '.join(PERIODS)}")
+        today = today or datetime.utcnow().date()
+        current = period_start(today, period)
+        first = previous_period_start(current, period, periods - 1)
+
+        conditions = [
+            OpportunityViewRollup.company_id == company_id,
+            OpportunityViewRollup.period == period,
+            OpportunityViewRollup.period_start >= first,
+        ]
+        if opportunity_id is not None:
+            conditions.append(OpportunityViewRollup.opportunity_id == opportunity_id)
+
+        by_period = {
+            _as_date(start): (views or 0, applications or 0)
+            for start, views, applications in db.session.execute(
+                select(OpportunityViewRollup.period_start, func.sum(OpportunityViewRollup.views),
+                       func.sum(OpportunityViewRollup.applications))
+                .where(*conditions)
+                .group_by(OpportunityViewRollup.period_start)
+            )
+        }
+        as_of = db.session.execute(select(func.max(OpportunityViewRollup.updated_at)).where(*conditions)).scalar()
+
+        series = []
+        start = first
+        for _ in range(periods):
+            views, applications = by_period.get(start, (0, 0))
+            series.append(ViewAnalyticsService._conversion(
+                {'period_start': start.isoformat(), 'views': views, 'applications': applications}))
+            start = previous_period_start(start, period, -1)
+
+        result = {
+            'period': period,
+            'series': series,
+            'totals': ViewAnalyticsService._conversion({
+                'views': sum(row['views'] for row in series),
+                'applications': sum(row['applications'] for row in series),
+            }),
+            'as_of': as_of.isoformat() if as_of else None,
+        }
+        if opportunity_id is None:
+            result['opportunities'] = [
+                ViewAnalyticsService._conversion({
+                    'opportunity_id': row_id, 'title': title, 'views': views or 0, 'applications': applications or 0,
+                })
+                for row_id, title, views, applications in db.session.execute(
+                    select(OpportunityViewRollup.opportunity_id, Opportunity.title,
+                           func.sum(OpportunityViewRollup.views), func.sum(OpportunityViewRollup.applications))
+                    .join(Opportunity, Opportunity.id == OpportunityViewRollup.opportunity_id)
+                    .where(*conditions)
+                    .group_by(OpportunityViewRollup.opportunity_id, Opportunity.title)
+                    .order_by(func.sum(OpportunityViewRollup.views).desc())
+                )
+            ]
+        return result
+
+    @staticmethod
+    def _conversion(row: dict) -> dict:
+        row['conversion_rate'] = round(row['applications'] * 100.0 / row['views'], 2) if row['views'] else None
+        return row
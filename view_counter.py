@@ -0,0 +1,145 @@
+"""
+View Counter - buffered opportunity view counts
+
+Detail page views are accumulated in an in-process buffer and written by a
+background thread every VIEW_COUNT_FLUSH_SECONDS as one batched
+``UPDATE opportunities SET views_count = views_count + :delta`` (executemany,
+one parameter set per opportunity). Reads never write, concurrent views of a
+popular posting no longer contend on its row, and a crash loses at most one
+flush interval of views. Each worker process keeps its own buffer; deltas are
+additive, so any number of workers can flush safely. The same flush adds the
+views to the per-day table behind company view analytics (view_analytics.py).
+Periodic maintenance runs separately (background_tasks.maintenance).
+"""
+import atexit
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import bindparam, func, update
+
+from models import db, Opportunity
+from view_analytics import ViewAnalyticsService
+
+
+DEFAULT_FLUSH_SECONDS = 5
+MAX_PENDING = 10000  # Distinct opportunities buffered before a flush is forced
+
+
+class ViewCounter:
+    """Thread-safe buffer of per-opportunity view deltas"""
+
+    def __init__(self, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self._pending = {}
+        self._daily = {}  # (opportunity id, UTC day) -> views
+        self._recorded = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def flush_interval():
+        """Seconds between flushes; 0 or less writes every view through immediately"""
+        try:
+            return float(current_app.config.get('VIEW_COUNT_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS))
+        except (TypeError, ValueError):
+            return DEFAULT_FLUSH_SECONDS
+
+    def record(self, opportunity_id, count=1):
+        """Buffer ``count`` views of an opportunity (requires an app context)"""
+        day_key = (opportunity_id, datetime.utcnow().date())
+        with self._lock:
+            self._pending[opportunity_id] = self._pending.get(opportunity_id, 0) + count
+            self._daily[day_key] = self._daily.get(day_key, 0) + count
+            self._recorded += count
+            overflow = len(self._pending) >= self.max_pending
+        interval = self.flush_interval()
+        if interval <= 0 or overflow:
+            self.flush()
+        else:
+            self._ensure_worker(current_app._get_current_object(), interval)
+
+    def pending(self, opportunity_id):
+        """Views of an opportunity buffered in this process but not yet written"""
+        with self._lock:
+            return self._pending.get(opportunity_id, 0)
+
+    def recorded(self):
+        """Views recorded by this process since it started; only ever grows"""
+        return self._recorded
+
+    def flush(self):
+        """Write buffered deltas in one batched UPDATE plus one daily upsert; returns the number of views written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            daily, self._daily = self._daily, {}
+        if not pending:
+            return 0
+
+        table = Opportunity.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('opportunity_id'))
+            .values(
+                views_count=func.coalesce(table.c.views_count, 0) + bindparam('delta'),
+                updated_at=table.c.updated_at,  # A view is not an edit
+            )
+        )
+        try:
+            # Own connection, outside the request session, so query caches keyed
+            # on the opportunities table are not invalidated by view traffic
+            with db.engine.begin() as connection:
+                connection.execute(stmt, [
+                    {'opportunity_id': opportunity_id, 'delta': delta}
+                    for opportunity_id, delta in pending.items()
+                ])
+                ViewAnalyticsService.record_daily(connection, daily)
+        except Exception:
+            # Keep the views for the next attempt
+            with self._lock:
+                for opportunity_id, delta in pending.items():
+                    self._pending[opportunity_id] = self._pending.get(opportunity_id, 0) + delta
+                for day_key, delta in daily.items():
+                    self._daily[day_key] = self._daily.get(day_key, 0) + delta
+            raise
+        return sum(pending.values())
+
+    def _ensure_worker(self, app, interval):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(app, interval),
+                                            name='view-counter-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self._flush_at_exit, app)
+
+    def _run(self, app, interval):
+        while not self._stop.wait(interval):
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f'View count flush failed: {e}')
+
+    def _flush_at_exit(self, app):
+        self._stop.set()
+        with app.app_context():
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def stop(self):
+        """Stop the background flusher (buffered views stay pending until flush())"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+opportunity_views = ViewCounter()